@@ -20,6 +20,14 @@ load_dotenv()  # Load from .env file
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
+# Leave reason grammar correction (leave/grammar.py); use
+# "leave.grammar.EchoProvider" to run without the network
+LEAVE_GRAMMAR_PROVIDER = os.getenv("LEAVE_GRAMMAR_PROVIDER", "leave.grammar.OpenRouterProvider")
+LEAVE_GRAMMAR_TIMEOUT = 10  # seconds
+
+# Who counts as eating on a day (meal/projection.py): CutoffPolicy (punch /
+# leave / 08:00 cutoff rules) or HeadcountPolicy (everyone not on leave)
+MEAL_PROJECTION_POLICY = "meal.projection.CutoffPolicy"
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -75,7 +83,14 @@ INSTALLED_APPS = [
 
 CRONJOBS = [
     # Run every minute
-    ('*/1 * * * *', 'signin_mail.services.send_first_signin_emails'),
+    # Fold new punches + notify subscribers (sign-in mailer, seat plan)
+    ('*/1 * * * *', 'employee.services.publish_new_punches'),
+    # Deliver queued leave notification mails
+    ('*/1 * * * *', 'leave.mailer.send_queued_emails'),
+    # Grammar-correct reasons of recent leaves (last 7 days, 3 attempts each)
+    ('*/5 * * * *', 'leave.grammar.correct_pending_reasons'),
+    # Regenerate upcoming meal report CookRecords that are missing or dirty
+    ('*/1 * * * *', 'mealreport.services.refresh_cook_records'),
 ]
 
 MIDDLEWARE = [
@@ -149,6 +164,22 @@ DATABASES = {
 }
 
 
+# Cache
+# Shared by the Passenger workers and the cron jobs (separate processes),
+# so it lives on disk rather than in process memory.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('DJANGO_CACHE_DIR', str(BASE_DIR / 'django_cache')),
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'MAX_ENTRIES': 5000,
+        },
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -237,3 +268,22 @@ SIGNIN_EMAIL_HOST_PASSWORD = 'm!8eYFBTJI));,n}'
 
 SIGNIN_MAIL_FROM = 'attendance@atpldhaka.com'
 
+
+# =========================
+# LOGGING
+# =========================
+# Per-run stats and failures of the cron / watcher jobs (sign-in mailer,
+# punch publisher) to stderr
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'signin_mail': {'handlers': ['console'], 'level': 'INFO'},
+        'employee': {'handlers': ['console'], 'level': 'INFO'},
+    },
+}
+
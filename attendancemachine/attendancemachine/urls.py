@@ -17,7 +17,7 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from myapp.views import RegisterView, LoginView, DashboardView, LogoutView, ChangePasswordView
-from seatplan.views import SeatPlanView
+from seatplan.views import SeatPlanView, seat_plan_stream
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
@@ -54,6 +54,7 @@ urlpatterns = [
 
     path("seatplan/", include("seatplan.urls")),      # HTML
     path("api/seatplan/", SeatPlanView.as_view()),  # optional (see note)
+    path("api/seatplan/stream/", seat_plan_stream),  # SSE live updates
 
 ]
 
@@ -0,0 +1,139 @@
+# employee/attendance_logs.py
+"""
+The only place that talks SQL to the machine's attendance_logs table
+(DB alias 'logs', columns user_id = emp_code, timestamp = naive local time).
+
+Every predicate on 'timestamp' is a half-open range
+    timestamp >= start AND timestamp < end
+so MySQL can range-scan an index instead of evaluating DATE(timestamp) for
+every row: (user_id, timestamp) when the query names employees,
+(timestamp, user_id) otherwise (and for MIN / MAX past the high-water mark).
+The daily aggregates select only (user_id, timestamp), so the scan is
+answered from the index alone. The rows are bucketed per employee per day in
+Python, which avoids a GROUP BY on DATE(timestamp) that no index can serve.
+"""
+from datetime import datetime, time, timedelta
+
+from django.db import connections
+from django.utils.dateparse import parse_datetime
+
+LOGS_DB = "logs"
+LOGS_TABLE = "attendance_logs"
+FETCH_SIZE = 5000
+
+LOGS_INDEXES = {
+    # user_id IN (...) AND timestamp range
+    "idx_attendance_logs_user_ts": ["user_id", "timestamp"],
+    # timestamp range / MIN(timestamp), MAX(timestamp) WHERE timestamp > mark
+    "idx_attendance_logs_ts_user": ["timestamp", "user_id"],
+}
+
+
+def day_bounds(start_date, end_date=None):
+    """
+    Half-open [start, end) datetimes covering the inclusive date range
+    start_date..end_date (a single day when end_date is omitted).
+    """
+    end_date = end_date or start_date
+    return (
+        datetime.combine(start_date, time.min),
+        datetime.combine(end_date + timedelta(days=1), time.min),
+    )
+
+
+def _emp_code_clause(emp_codes, params):
+    if emp_codes is None:
+        return ""
+    emp_codes = [str(c) for c in emp_codes]
+    params.extend(emp_codes)
+    return f" AND user_id IN ({', '.join(['%s'] * len(emp_codes))})"
+
+
+def _as_datetime(value):
+    # SQLite (local development, tests) returns MIN / MAX of a DATETIME as text
+    return parse_datetime(value) if isinstance(value, str) else value
+
+
+def timestamp_bounds(after=None, since=None):
+    """
+    (MIN(timestamp), MAX(timestamp)) of the rows strictly newer than 'after',
+    or at/after 'since', or of the whole table when neither is given.
+    Both are (None, None) when no row matches.
+    """
+    sql = f"SELECT MIN(timestamp), MAX(timestamp) FROM {LOGS_TABLE}"
+    params = []
+    if after is not None:
+        sql += " WHERE timestamp > %s"
+        params.append(after)
+    elif since is not None:
+        sql += " WHERE timestamp >= %s"
+        params.append(since)
+
+    with connections[LOGS_DB].cursor() as cursor:
+        cursor.execute(sql, params)
+        return tuple(_as_datetime(v) for v in cursor.fetchone())
+
+
+def daily_punch_aggregates(start_date, end_date=None, emp_codes=None):
+    """
+    [(emp_code, first_punch, last_punch, punch_count), ...] — one row per
+    employee per day in the inclusive date range. Punches are naive datetimes.
+    """
+    if emp_codes is not None and not emp_codes:
+        return []
+
+    start, end = day_bounds(start_date, end_date)
+    params = [start, end]
+    sql = f"SELECT user_id, timestamp FROM {LOGS_TABLE} WHERE timestamp >= %s AND timestamp < %s"
+    sql += _emp_code_clause(emp_codes, params)
+
+    buckets = {}   # (emp_code, date) -> [first, last, count]
+    with connections[LOGS_DB].cursor() as cursor:
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(FETCH_SIZE)
+            if not rows:
+                break
+            for emp_code, ts in rows:
+                bucket = buckets.get((emp_code, ts.date()))
+                if bucket is None:
+                    buckets[(emp_code, ts.date())] = [ts, ts, 1]
+                    continue
+                if ts < bucket[0]:
+                    bucket[0] = ts
+                elif ts > bucket[1]:
+                    bucket[1] = ts
+                bucket[2] += 1
+
+    return [
+        (str(emp_code), first_punch, last_punch, punch_count)
+        for (emp_code, _day), (first_punch, last_punch, punch_count) in buckets.items()
+    ]
+
+
+def find_logs_index(columns):
+    """
+    Name of an index on attendance_logs whose leading columns are 'columns',
+    or None if there is none.
+    """
+    connection = connections[LOGS_DB]
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, LOGS_TABLE)
+
+    for name, info in constraints.items():
+        found = [c.lower() for c in (info.get("columns") or [])]
+        if info.get("index") and found[:len(columns)] == columns:
+            return name
+    return None
+
+
+def create_logs_index(name, columns):
+    """
+    CREATE INDEX <name> ON attendance_logs (<columns>)
+    """
+    connection = connections[LOGS_DB]
+    qn = connection.ops.quote_name
+    cols = ", ".join(qn(c) for c in columns)
+    with connection.cursor() as cursor:
+        cursor.execute(f"CREATE INDEX {qn(name)} ON {qn(LOGS_TABLE)} ({cols})")
+    return name
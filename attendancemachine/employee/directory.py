@@ -0,0 +1,123 @@
+# employee/directory.py
+"""
+emp_code ↔ user directory shared by every app.
+
+Two cache layers:
+  - process-local copy, reused while the shared version token is unchanged
+  - Django cache (shared by the Passenger workers and cron jobs), keyed by
+    the same version token
+
+invalidate_directory() (wired to post_save / post_delete of User and Profile
+in employee/signals.py) writes a new version token, so every process drops
+its local copy on its next lookup.
+"""
+import threading
+import uuid
+from typing import NamedTuple, Optional
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+DIRECTORY_VERSION_KEY = "employee:directory:version"
+DIRECTORY_CACHE_KEY = "employee:directory:{version}"
+DIRECTORY_CACHE_SECONDS = 60 * 60
+
+_lock = threading.Lock()
+_local = {"version": None, "directory": None}
+
+
+class Employee(NamedTuple):
+    user_id: int
+    username: str
+    first_name: str
+    last_name: str
+    email: str
+    emp_code: Optional[str]
+
+    @property
+    def name(self):
+        """'First Last', falling back to the username."""
+        return f"{self.first_name} {self.last_name}".strip() or self.username
+
+
+class Directory:
+    """
+    Every user (ordered by id) with lookups by emp_code, user id and email.
+    """
+
+    def __init__(self, employees):
+        self.employees = employees
+        self.by_code = {e.emp_code: e for e in employees if e.emp_code}
+        self.by_user_id = {e.user_id: e for e in employees}
+        self.by_email = {}
+        for e in employees:
+            email = (e.email or "").strip().lower()
+            if email:
+                self.by_email.setdefault(email, []).append(e.user_id)
+
+    def get(self, emp_code):
+        return self.by_code.get(str(emp_code)) if emp_code is not None else None
+
+    def user_ids_for_email(self, email):
+        """Ids of the users with this email (case-insensitive)."""
+        return self.by_email.get((email or "").strip().lower(), [])
+
+    def for_codes(self, emp_codes):
+        """{ emp_code: Employee } for the codes that belong to a user."""
+        return {str(c): self.by_code[str(c)] for c in emp_codes if str(c) in self.by_code}
+
+    def reportable(self):
+        """Employees that appear in attendance reports (have a code, not "00")."""
+        return [e for e in self.employees if e.emp_code and e.emp_code != "00"]
+
+
+def _load_employees():
+    User = get_user_model()
+    rows = (User.objects
+            .order_by("id")
+            .values_list("id", "username", "first_name", "last_name", "email", "profile__emp_code"))
+    return [
+        Employee(uid, username, first_name, last_name, email, str(code) if code is not None else None)
+        for uid, username, first_name, last_name, email, code in rows
+    ]
+
+
+def _current_version():
+    version = cache.get(DIRECTORY_VERSION_KEY)
+    if version is None:
+        cache.add(DIRECTORY_VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(DIRECTORY_VERSION_KEY)
+    return version
+
+
+def directory_version():
+    """Current version token; changes whenever the directory is invalidated."""
+    return _current_version()
+
+
+def get_directory():
+    version = _current_version()
+    if _local["version"] == version and _local["directory"] is not None:
+        return _local["directory"]
+
+    with _lock:
+        if _local["version"] == version and _local["directory"] is not None:
+            return _local["directory"]
+
+        key = DIRECTORY_CACHE_KEY.format(version=version)
+        employees = cache.get(key)
+        if employees is None:
+            employees = _load_employees()
+            cache.set(key, employees, DIRECTORY_CACHE_SECONDS)
+
+        directory = Directory(employees)
+        _local["version"] = version
+        _local["directory"] = directory
+        return directory
+
+
+def invalidate_directory():
+    cache.set(DIRECTORY_VERSION_KEY, uuid.uuid4().hex, None)
+    with _lock:
+        _local["version"] = None
+        _local["directory"] = None
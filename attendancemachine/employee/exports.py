@@ -0,0 +1,117 @@
+# employee/exports.py
+"""
+Streaming CSV exports.
+
+Rows are written one at a time into a StreamingHttpResponse and read from
+DailyPunchSummary in fixed-size keyset batches, so an export's memory use
+does not grow with the date range (MySQL drivers buffer the whole result of
+a plain .iterator(), batching keeps each fetch small).
+"""
+import csv
+
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer
+
+from .reports import employee_summary, punch_columns
+
+EXPORT_BATCH_SIZE = 2000
+SUMMARY_EMPLOYEE_BATCH = 50
+
+PUNCH_HISTORY_COLUMNS = [
+    "emp_code", "first_name", "last_name", "date",
+    "first_punch_time", "last_punch_time", "total_hour", "status",
+]
+
+ATTENDANCE_SUMMARY_COLUMNS = [
+    "serial_no", "emp_code", "employee_name",
+    "total_working_hours", "total_working_days", "avg_hours_per_day",
+    "avg_sign_in", "avg_sign_out", "total_vacation",
+    "less_8_30", "between_8_30_and_9_00", "greater_9_00",
+    "before_7am", "between_7_and_7_15_59", "after_7_15_59",
+]
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    Lets DRF accept ?format=csv. Successful exports bypass it (they return a
+    StreamingHttpResponse); it only renders error payloads as key,value rows.
+    """
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        buffer = _Echo()
+        writer = csv.writer(buffer)
+        items = data.items() if isinstance(data, dict) else [("detail", data)]
+        return "".join(writer.writerow([k, v]) for k, v in items).encode(self.charset)
+
+
+class _Echo:
+    """File-like object whose write() hands the CSV line straight back."""
+
+    def write(self, value):
+        return value
+
+
+def csv_response(filename, header, rows):
+    """
+    StreamingHttpResponse writing 'header' then every dict in 'rows'.
+    """
+    writer = csv.writer(_Echo())
+
+    def stream():
+        yield writer.writerow(header)
+        for row in rows:
+            yield writer.writerow([row.get(col, "") for col in header])
+
+    response = StreamingHttpResponse(stream(), content_type="text/csv; charset=utf-8")
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+def iter_punch_history(qs, batch_size=EXPORT_BATCH_SIZE):
+    """
+    Yield DailyPunchSummary rows of 'qs' in (date DESC, emp_code) order,
+    batch_size rows per query, continuing each batch after the last
+    (date, emp_code) seen.
+    """
+    qs = qs.order_by("-date", "emp_code")
+    after = None
+    while True:
+        batch_qs = qs
+        if after is not None:
+            after_date, after_code = after
+            batch_qs = qs.filter(Q(date__lt=after_date) | Q(date=after_date, emp_code__gt=after_code))
+
+        rows = list(batch_qs[:batch_size])
+        yield from rows
+
+        if len(rows) < batch_size:
+            return
+        after = (rows[-1].date, rows[-1].emp_code)
+
+
+def iter_attendance_summary(employees, summary_qs, working_days, batch_size=SUMMARY_EMPLOYEE_BATCH):
+    """
+    Yield report entries (with serial_no) for 'employees' [(emp_code, name)],
+    loading punch rows for batch_size employees at a time.
+    """
+    n_days = len(working_days)
+    serial_no = 0
+
+    for i in range(0, len(employees), batch_size):
+        batch = employees[i:i + batch_size]
+        rows = (summary_qs.filter(emp_code__in=[code for code, _ in batch])
+                .order_by("emp_code", "date")
+                .values_list("emp_code", "date", "first_punch", "last_punch"))
+        columns = punch_columns(rows, working_days)
+
+        for emp_code, name in batch:
+            serial_no += 1
+            entry = {"serial_no": serial_no}
+            entry.update(employee_summary(emp_code, name, columns.get(emp_code), n_days))
+            yield entry
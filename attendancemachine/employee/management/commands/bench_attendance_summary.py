@@ -0,0 +1,54 @@
+# employee/management/commands/bench_attendance_summary.py
+import random
+import time as time_mod
+from datetime import date, time, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from employee.reports import attendance_summary
+
+
+class Command(BaseCommand):
+    help = "Benchmark the attendance summary engine on synthetic punches (no DB access)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employees', type=int, default=100)
+        parser.add_argument('--days', type=int, default=365)
+        parser.add_argument('--budget-ms', type=float, default=500.0, help='Fail if the best run is slower than this')
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rnd = random.Random(options['seed'])
+        start = date(2025, 1, 1)
+        all_dates = [start + timedelta(days=i) for i in range(options['days'])]
+        working_days = [d for d in all_dates if d.weekday() not in (5, 6)]
+
+        employees = [(f"{1000 + i}", f"Employee {i}") for i in range(options['employees'])]
+        rows = []
+        for emp_code, _name in employees:
+            for d in all_dates:
+                if rnd.random() < 0.1:
+                    continue  # absent
+                first = 6 * 3600 + 30 * 60 + rnd.randint(0, 75 * 60)
+                last = first + rnd.randint(7 * 3600, 10 * 3600)
+                rows.append((
+                    emp_code, d,
+                    time(first // 3600, (first // 60) % 60, first % 60, rnd.randint(0, 999999)),
+                    time(last // 3600, (last // 60) % 60, last % 60),
+                ))
+
+        timings = []
+        for _ in range(options['repeat']):
+            t0 = time_mod.perf_counter()
+            report = attendance_summary(employees, rows, working_days)
+            timings.append((time_mod.perf_counter() - t0) * 1000)
+
+        best = min(timings)
+        self.stdout.write(
+            f"{len(employees)} employees × {len(all_dates)} days ({len(rows)} punch rows, "
+            f"{len(report)} report rows): best {best:.1f} ms, worst {max(timings):.1f} ms"
+        )
+        if best > options['budget_ms']:
+            raise CommandError(f"Attendance summary took {best:.1f} ms (budget {options['budget_ms']:.0f} ms)")
+        self.stdout.write(self.style.SUCCESS(f"Within budget ({options['budget_ms']:.0f} ms)"))
@@ -0,0 +1,38 @@
+# employee/management/commands/ensure_attendance_log_index.py
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError
+
+from employee.attendance_logs import (
+    LOGS_DB, LOGS_INDEXES, LOGS_TABLE, create_logs_index, find_logs_index,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Check the logs DB for the (user_id, timestamp) and (timestamp, user_id) "
+        "indexes on attendance_logs and create any that are missing."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help='Only report; do not create indexes')
+
+    def handle(self, *args, **options):
+        for name, index_columns in LOGS_INDEXES.items():
+            columns = ", ".join(index_columns)
+
+            existing = find_logs_index(index_columns)
+            if existing:
+                self.stdout.write(self.style.SUCCESS(f"{LOGS_TABLE} ({columns}) is indexed by '{existing}'."))
+                continue
+
+            if options['check']:
+                self.stderr.write(self.style.WARNING(f"{LOGS_TABLE} has no ({columns}) index on DB '{LOGS_DB}'."))
+                continue
+
+            try:
+                create_logs_index(name, index_columns)
+            except DatabaseError as e:
+                self.stderr.write(self.style.ERROR(f"Could not create index on {LOGS_TABLE}: {e}"))
+                continue
+
+            self.stdout.write(self.style.SUCCESS(f"Created index '{name}' on {LOGS_TABLE} ({columns})."))
@@ -0,0 +1,25 @@
+# employee/management/commands/refresh_punch_summary.py
+from django.core.management.base import BaseCommand
+from django.utils.dateparse import parse_date
+
+from employee.services import refresh_daily_punch_summary
+
+
+class Command(BaseCommand):
+    help = "Fold new attendance_logs rows into the DailyPunchSummary table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help='Re-fold every log row from this date (YYYY-MM-DD)', default=None)
+        parser.add_argument('--rebuild', action='store_true', help='Ignore the high-water mark and re-fold all logs')
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            since = parse_date(options['since'])
+            if not since:
+                self.stderr.write(self.style.ERROR("Invalid --since date. Use YYYY-MM-DD."))
+                return
+
+        keys = refresh_daily_punch_summary(since=since, rebuild=options['rebuild'])
+        days = len({d for _code, d in keys})
+        self.stdout.write(self.style.SUCCESS(f"Punch summary refreshed: {len(keys)} rows across {days} day(s)"))
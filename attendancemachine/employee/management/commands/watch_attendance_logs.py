@@ -0,0 +1,46 @@
+# employee/management/commands/watch_attendance_logs.py
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, DatabaseError
+
+from employee.services import publish_new_punches
+
+
+class Command(BaseCommand):
+    help = (
+        "Tail attendance_logs: every few seconds fold new and late-synced rows "
+        "into DailyPunchSummary and publish punches_recorded to in-process "
+        "subscribers (sign-in mailer, seat plan cache). Long-running; keep it "
+        "alive with the host's process manager. The per-minute cron job does "
+        "the same and stays as a fallback."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=5, help='Seconds between polls (default 5)')
+        parser.add_argument('--once', action='store_true', help='Poll a single time and exit')
+
+    def handle(self, *args, **options):
+        interval = options['interval']
+        self.stdout.write(f"Watching attendance_logs every {interval}s")
+
+        try:
+            while True:
+                self.poll()
+                if options['once']:
+                    return
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            self.stdout.write("Stopped.")
+
+    def poll(self):
+        # Long-running process: drop connections the server has timed out
+        close_old_connections()
+        try:
+            keys, _failures = publish_new_punches(sender=self.__class__)
+        except DatabaseError as e:
+            self.stderr.write(self.style.ERROR(f"Refresh failed: {e}"))
+            return
+
+        if keys:
+            self.stdout.write(f"{len(keys)} punch summary row(s) updated")
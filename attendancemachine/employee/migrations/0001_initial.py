@@ -0,0 +1,41 @@
+# Generated by Django 5.2.4 on 2026-10-16 23:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PunchSummaryState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(default='default', max_length=32, unique=True)),
+                ('high_water_mark', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyPunchSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('emp_code', models.CharField(max_length=50)),
+                ('date', models.DateField()),
+                ('first_punch', models.TimeField()),
+                ('last_punch', models.TimeField()),
+                ('punch_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['-date', 'emp_code'],
+                'indexes': [models.Index(fields=['date', 'emp_code'], name='employee_da_date_040815_idx')],
+                'constraints': [models.UniqueConstraint(fields=('emp_code', 'date'), name='uniq_punch_summary_emp_date')],
+            },
+        ),
+    ]
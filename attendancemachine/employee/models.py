@@ -1,3 +1,47 @@
 from django.db import models
 
-# Create your models here.
+
+class DailyPunchSummary(models.Model):
+    """
+    One row per (emp_code, date) aggregated from the machine's attendance_logs.
+    Kept up to date by employee.services.refresh_daily_punch_summary so reports
+    read an indexed range instead of re-aggregating the raw logs.
+
+    first_punch / last_punch are wall-clock times exactly as the machine
+    stored them (naive, same day as 'date').
+    """
+
+    emp_code = models.CharField(max_length=50)
+    date = models.DateField()
+    first_punch = models.TimeField()
+    last_punch = models.TimeField()
+    punch_count = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-date", "emp_code"]
+        constraints = [
+            models.UniqueConstraint(fields=["emp_code", "date"], name="uniq_punch_summary_emp_date"),
+        ]
+        indexes = [
+            models.Index(fields=["date", "emp_code"]),
+        ]
+
+    def __str__(self):
+        return f"{self.emp_code} @ {self.date}: {self.first_punch} → {self.last_punch} ({self.punch_count})"
+
+
+class PunchSummaryState(models.Model):
+    """
+    Singleton row holding the high-water mark of attendance_logs.timestamp
+    already folded into DailyPunchSummary.
+    """
+
+    key = models.CharField(max_length=32, unique=True, default="default")
+    high_water_mark = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.key}: {self.high_water_mark}"
@@ -0,0 +1,126 @@
+# employee/reports.py
+"""
+Attendance summary engine.
+
+Works column-wise: punch rows are split into one array per employee
+(durations, sign-in / sign-out seconds), and the duration / arrival buckets
+are counted by sorting each column once and bisecting at the precomputed
+thresholds (the pure-Python equivalent of numpy.searchsorted).
+"""
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import time
+
+US = 10 ** 6
+
+
+def _time_us(t: time) -> int:
+    """Microseconds since midnight."""
+    return ((t.hour * 60 + t.minute) * 60 + t.second) * US + t.microsecond
+
+
+# Duration buckets (hours):  < 8.5  |  8.5 .. 9 (inclusive)  |  > 9
+DURATION_LOW = 8.5
+DURATION_HIGH = 9
+
+# Arrival buckets (µs of day): < 07:00:00  |  07:00:00 .. 07:15:59  |  later
+ARRIVAL_EARLY = _time_us(time(7, 0, 0))
+ARRIVAL_LATE = _time_us(time(7, 15, 59))
+
+
+def format_duration(minutes):
+    h = int(minutes // 60)
+    m = int(minutes % 60)
+    return f"{h:02}:{m:02}"
+
+
+def format_avg_time(seconds, days):
+    if days == 0:
+        return "00:00:00"
+    avg = int(seconds / days)
+    h = avg // 3600
+    m = (avg % 3600) // 60
+    s = avg % 60
+    return f"{h:02}:{m:02}:{s:02}"
+
+
+def _bucket_counts(column, low, high):
+    """
+    (count < low, count in [low, high], count > high) for one column.
+    """
+    ordered = sorted(column)
+    below = bisect_left(ordered, low)
+    upto_high = bisect_right(ordered, high)
+    return below, upto_high - below, len(ordered) - upto_high
+
+
+def punch_columns(rows, working_days):
+    """
+    Split (emp_code, date, first_punch, last_punch) rows — punches as
+    datetime.time — into per-employee columns, keeping only working days.
+    Rows must be in date order per employee.
+    """
+    working = set(working_days)
+    columns = defaultdict(lambda: {"duration": [], "first": [], "first_us": [], "last": []})
+
+    for emp_code, d, first_punch, last_punch in rows:
+        if d not in working:
+            continue
+        first_us = _time_us(first_punch)
+        col = columns[emp_code]
+        col["duration"].append((_time_us(last_punch) - first_us) / US)
+        col["first_us"].append(first_us)
+        col["first"].append(first_punch.hour * 3600 + first_punch.minute * 60 + first_punch.second)
+        col["last"].append(last_punch.hour * 3600 + last_punch.minute * 60 + last_punch.second)
+
+    return columns
+
+
+def employee_summary(emp_code, name, col, working_day_count):
+    """
+    One report entry (without serial_no) from an employee's punch columns.
+    """
+    durations = col["duration"] if col else []
+    total_days = len(durations)
+    total_minutes = sum(secs / 60 for secs in durations)
+
+    less_8_30, between_8_30_and_9_00, greater_9_00 = _bucket_counts(
+        [secs / 3600 for secs in durations], DURATION_LOW, DURATION_HIGH
+    )
+    before_7am, between_7_and_7_15_59, after_7_15_59 = _bucket_counts(
+        col["first_us"] if col else [], ARRIVAL_EARLY, ARRIVAL_LATE
+    )
+
+    return {
+        "emp_code": emp_code,
+        "employee_name": name,
+        "total_working_hours": format_duration(total_minutes),
+        "total_working_days": total_days,
+        "avg_hours_per_day": format_duration(total_minutes / total_days if total_days else 0),
+        "avg_sign_in": format_avg_time(sum(col["first"]) if col else 0, total_days),
+        "avg_sign_out": format_avg_time(sum(col["last"]) if col else 0, total_days),
+        "total_vacation": working_day_count - total_days,
+        "less_8_30": less_8_30,
+        "between_8_30_and_9_00": between_8_30_and_9_00,
+        "greater_9_00": greater_9_00,
+        "before_7am": before_7am,
+        "between_7_and_7_15_59": between_7_and_7_15_59,
+        "after_7_15_59": after_7_15_59,
+    }
+
+
+def attendance_summary(employees, rows, working_days):
+    """
+    employees:    [(emp_code, name), ...] in report order
+    rows:         (emp_code, date, first_punch, last_punch) with time punches
+    working_days: dates that count (weekends already removed)
+    """
+    columns = punch_columns(rows, working_days)
+    n_days = len(working_days)
+
+    results = []
+    for serial_no, (emp_code, name) in enumerate(employees, start=1):
+        entry = {"serial_no": serial_no}
+        entry.update(employee_summary(emp_code, name, columns.get(emp_code), n_days))
+        results.append(entry)
+    return results
@@ -0,0 +1,172 @@
+# employee/services.py
+import logging
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db import connections, router, transaction
+
+from .attendance_logs import daily_punch_aggregates, day_bounds, timestamp_bounds
+from .models import DailyPunchSummary, PunchSummaryState
+from .signals import punches_recorded
+
+logger = logging.getLogger(__name__)
+
+# Days before the high-water mark's day that every refresh re-folds, for
+# devices that sync their punches late
+LATE_SYNC_DAYS = 1
+
+
+def _naive(dt):
+    """
+    attendance_logs stores naive wall-clock timestamps; the high-water mark is
+    persisted in a DateTimeField, so strip the tzinfo Django attaches on read.
+    """
+    if dt is None:
+        return None
+    return dt.replace(tzinfo=None)
+
+
+def upsert_kwargs(model, unique_fields, update_fields):
+    """
+    bulk_create(update_conflicts=True) options that work on MySQL (which rejects
+    unique_fields) as well as on backends that require them.
+    """
+    features = connections[router.db_for_write(model)].features
+    kwargs = {"update_conflicts": True, "update_fields": update_fields}
+    if features.supports_update_conflicts_with_target:
+        kwargs["unique_fields"] = unique_fields
+    return kwargs
+
+
+def refresh_daily_punch_summary(since=None, rebuild=False):
+    """
+    Fold attendance_logs into DailyPunchSummary.
+
+    A regular run re-aggregates every day from LATE_SYNC_DAYS before the
+    high-water mark's day through the newest row. Devices that sync late
+    insert rows older than the mark, which 'timestamp > mark' alone would
+    never pick up. Only summary rows whose punches actually changed are
+    written, so re-folding the window every minute is cheap and idempotent.
+
+    - since:   re-fold everything from this date on (older late syncs)
+    - rebuild: ignore the high-water mark and re-fold the whole log table
+
+    Returns the list of (emp_code, date) keys that were written.
+    """
+    state, _ = PunchSummaryState.objects.get_or_create(key="default")
+
+    mark = _naive(state.high_water_mark)
+    if rebuild or (since is None and mark is None):
+        first_new, last_new = timestamp_bounds()
+        start = first_new.date() if first_new else None
+    elif since is not None:
+        first_new, last_new = timestamp_bounds(since=day_bounds(since)[0])
+        start = since if last_new else None
+    else:
+        _first_new, last_new = timestamp_bounds(after=mark)
+        start = mark.date() - timedelta(days=LATE_SYNC_DAYS)
+
+    if start is None:
+        return []
+    end = max(ts for ts in (last_new, mark) if ts is not None).date()
+
+    stored = {
+        (code, d): (first, last, count)
+        for code, d, first, last, count in (
+            punch_summary_queryset(start, end)
+            .values_list("emp_code", "date", "first_punch", "last_punch", "punch_count")
+        )
+    }
+    objs = []
+    for emp_code, first_punch, last_punch, punch_count in daily_punch_aggregates(start, end):
+        key = (emp_code, first_punch.date())
+        values = (first_punch.time(), last_punch.time(), punch_count)
+        if stored.get(key) != values:
+            objs.append(DailyPunchSummary(
+                emp_code=emp_code,
+                date=key[1],
+                first_punch=values[0],
+                last_punch=values[1],
+                punch_count=punch_count,
+            ))
+
+    with transaction.atomic():
+        if objs:
+            DailyPunchSummary.objects.bulk_create(
+                objs,
+                batch_size=1000,
+                **upsert_kwargs(
+                    DailyPunchSummary,
+                    unique_fields=["emp_code", "date"],
+                    update_fields=["first_punch", "last_punch", "punch_count", "updated_at"],
+                ),
+            )
+
+        # Only ever move the mark forward
+        if last_new is not None and (mark is None or last_new > mark):
+            PunchSummaryState.objects.filter(pk=state.pk).update(
+                high_water_mark=last_new.replace(tzinfo=dt_timezone.utc)
+            )
+
+    return [(o.emp_code, o.date) for o in objs]
+
+
+def publish_new_punches(sender=None):
+    """
+    refresh_daily_punch_summary() + punches_recorded for whatever it wrote, so
+    the sign-in mailer and seat plan react. Run by the per-minute cron job and
+    by `manage.py watch_attendance_logs`.
+
+    Returns (keys, [(receiver, exception), ...] for receivers that failed).
+    """
+    keys = refresh_daily_punch_summary()
+    if not keys:
+        return keys, []
+
+    results = punches_recorded.send_robust(sender=sender, keys=keys)
+    failures = [(receiver, result) for receiver, result in results if isinstance(result, Exception)]
+    for receiver, error in failures:
+        # send_robust() caught it: hand the exception over for the traceback
+        logger.exception(
+            "punches_recorded receiver %s.%s failed", receiver.__module__, receiver.__name__,
+            exc_info=error,
+        )
+    return keys, failures
+
+
+# -------------------------------------------------
+# Readers
+# -------------------------------------------------
+
+def punch_summary_queryset(start_date=None, end_date=None, emp_codes=None):
+    """
+    DailyPunchSummary rows for an inclusive date range (either end optional),
+    optionally restricted to a set of employee codes.
+    """
+    qs = DailyPunchSummary.objects.all()
+    if start_date is not None:
+        qs = qs.filter(date__gte=start_date)
+    if end_date is not None:
+        qs = qs.filter(date__lte=end_date)
+    if emp_codes is not None:
+        qs = qs.filter(emp_code__in=[str(c) for c in emp_codes])
+    return qs
+
+
+def punch_times(row):
+    """
+    (first_punch, last_punch) of a summary row as naive datetimes,
+    matching what MIN/MAX(timestamp) used to return from the logs DB.
+    """
+    return (
+        datetime.combine(row.date, row.first_punch),
+        datetime.combine(row.date, row.last_punch),
+    )
+
+
+def first_punch_map(for_date, emp_codes=None):
+    """
+    { emp_code (str) : earliest punch (naive datetime) } for a single day.
+    """
+    rows = (punch_summary_queryset(for_date, for_date, emp_codes)
+            .values_list("emp_code", "first_punch"))
+    return {code: datetime.combine(for_date, first) for code, first in rows}
@@ -0,0 +1,21 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from profiles.models import Profile
+from .directory import invalidate_directory
+
+# Sent by `manage.py watch_attendance_logs` after new attendance_logs rows are
+# folded into DailyPunchSummary.
+#   keys: [(emp_code, date), ...] summary rows written by that refresh
+punches_recorded = Signal()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_employee_directory(sender, instance, **kwargs):
+    # After commit, so no process re-caches the directory from pre-commit rows
+    transaction.on_commit(invalidate_directory)
@@ -1,3 +1,427 @@
-from django.test import TestCase
+import csv
+import io
+from collections import defaultdict
+from unittest import mock
+from datetime import date, datetime, time, timedelta
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connections
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from leave.models import Leave
+from . import attendance_logs
+from .attendance_logs import LOGS_DB, LOGS_TABLE, daily_punch_aggregates
+from . import directory as directory_module
+from .directory import Employee, get_directory
+from .exports import iter_attendance_summary, iter_punch_history
+from .models import DailyPunchSummary
+from .reports import attendance_summary
+from .services import LATE_SYNC_DAYS, punch_summary_queryset, refresh_daily_punch_summary
+from .views import report_employees, report_working_days
+
+
+class AttendanceLogsTestCase(TestCase):
+    """
+    TestCase with the machine's attendance_logs table (not a Django model) in
+    the test 'logs' database; punch() inserts a row.
+    """
+    databases = {"default", LOGS_DB}
+
+    @classmethod
+    def setUpClass(cls):
+        # Before the class transaction: DDL commits implicitly on MySQL
+        with connections[LOGS_DB].cursor() as cursor:
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {LOGS_TABLE} "
+                f"(user_id VARCHAR(20) NOT NULL, timestamp DATETIME NOT NULL)"
+            )
+        super().setUpClass()
+
+    @staticmethod
+    def punch(emp_code, ts):
+        with connections[LOGS_DB].cursor() as cursor:
+            cursor.execute(f"INSERT INTO {LOGS_TABLE} (user_id, timestamp) VALUES (%s, %s)", [emp_code, ts])
+
+
+# -------------------------------------------------
+# Daily punches pagination
+# -------------------------------------------------
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class DailyPunchesPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("frahman", "frahman@ampec.com.au", "pw")
+        day = date(2025, 3, 3)
+        DailyPunchSummary.objects.bulk_create([
+            DailyPunchSummary(emp_code=str(100 + i), date=day - timedelta(days=i % 2),
+                              first_punch=time(9, 0), last_punch=time(18, 0), punch_count=2)
+            for i in range(5)
+        ])
+
+    def get(self, **params):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        return client.get("/api/employee/daily-punches/", params)
+
+    def test_cursor_pages_cover_every_row_once(self):
+        seen, params = [], {"cursor": "", "per_page": 2}
+        while True:
+            response = self.get(**params)
+            self.assertEqual(response.status_code, 200)
+            seen += [(r["date"], r["emp_code"]) for r in response.data["results"]]
+            cursor = response.data["pagination"]["next_cursor"]
+            if not cursor:
+                break
+            params["cursor"] = cursor
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(len(set(seen)), 5)
+
+    def test_out_of_range_per_page_falls_back_to_default(self):
+        for per_page in ("0", "-3", "abc"):
+            for extra in ({"cursor": ""}, {}):
+                response = self.get(per_page=per_page, **extra)
+                self.assertEqual(response.status_code, 200, (per_page, extra))
+                self.assertEqual(response.data["pagination"]["per_page"], 10)
+                self.assertEqual(len(response.data["results"]), 5)
+
+    def test_per_page_is_capped(self):
+        response = self.get(cursor="", per_page=10_000)
+        self.assertEqual(response.data["pagination"]["per_page"], 200)
+
+
+# -------------------------------------------------
+# Attendance summary: engine vs the original loop
+# -------------------------------------------------
+def _baseline_report(start_date, end_date):
+    """The pre-engine AttendanceSummaryReport loop, fed from DailyPunchSummary."""
+    all_dates = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+    working_days = [d for d in all_dates if d.weekday() not in (5, 6)]
+
+    employee_map = {
+        u.profile.emp_code: {'name': f"{u.first_name} {u.last_name}"}
+        for u in User.objects.select_related('profile').order_by('id')
+        if hasattr(u, 'profile') and u.profile.emp_code
+    }
+
+    punch_map = defaultdict(dict)
+    for p in DailyPunchSummary.objects.filter(date__gte=start_date, date__lte=end_date):
+        punch_map[p.emp_code][p.date] = (datetime.combine(p.date, p.first_punch),
+                                         datetime.combine(p.date, p.last_punch))
+
+    def format_duration(minutes):
+        return f"{int(minutes // 60):02}:{int(minutes % 60):02}"
+
+    results = []
+    for emp_code, info in employee_map.items():
+        if emp_code == "00":
+            continue
+        total_minutes = total_days = first_secs = last_secs = vacation = 0
+        buckets = dict.fromkeys(["less_8_30", "between_8_30_and_9_00", "greater_9_00",
+                                 "before_7am", "between_7_and_7_15_59", "after_7_15_59"], 0)
+        for d in working_days:
+            punch = punch_map[emp_code].get(d)
+            if not punch:
+                vacation += 1
+                continue
+            first_punch, last_punch = punch
+            seconds = (last_punch - first_punch).total_seconds()
+            total_minutes += seconds / 60
+            total_days += 1
+            first_secs += first_punch.hour * 3600 + first_punch.minute * 60 + first_punch.second
+            last_secs += last_punch.hour * 3600 + last_punch.minute * 60 + last_punch.second
+
+            hours = seconds / 3600
+            if hours < 8.5:
+                buckets["less_8_30"] += 1
+            elif hours <= 9:
+                buckets["between_8_30_and_9_00"] += 1
+            else:
+                buckets["greater_9_00"] += 1
+
+            if first_punch.time() < time(7, 0, 0):
+                buckets["before_7am"] += 1
+            elif first_punch.time() <= time(7, 15, 59):
+                buckets["between_7_and_7_15_59"] += 1
+            else:
+                buckets["after_7_15_59"] += 1
+
+        def format_avg_time(seconds):
+            if total_days == 0:
+                return "00:00:00"
+            avg = int(seconds / total_days)
+            return f"{avg // 3600:02}:{(avg % 3600) // 60:02}:{avg % 60:02}"
+
+        results.append({
+            "serial_no": len(results) + 1,
+            "emp_code": emp_code,
+            "employee_name": info['name'],
+            "total_working_hours": format_duration(total_minutes),
+            "total_working_days": total_days,
+            "avg_hours_per_day": format_duration(total_minutes / total_days if total_days else 0),
+            "avg_sign_in": format_avg_time(first_secs),
+            "avg_sign_out": format_avg_time(last_secs),
+            "total_vacation": vacation,
+            **buckets,
+        })
+    return results
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class AttendanceSummaryEquivalenceTests(TestCase):
+    START = date(2025, 3, 3)    # Monday
+    END = date(2025, 3, 9)      # Sunday
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = cls._user("frahman", "00", "Admin", "User")
+        ann = cls._user("ann", "101", "Ann", "Early")
+        cls._user("bob", "102", "Bob", "First")
+        cls._user("cid", "103", "Cid", "Absent")
+        cls._user("nocode", "", "No", "Code")
+
+        mon = cls.START
+        cls._punch("101", mon, time(6, 55), time(15, 30))                   # early, 8:35
+        cls._punch("101", mon + timedelta(1), time(7, 15, 59), time(16, 30))  # edge of on-time, > 9h
+        # Wednesday: absent
+        # Thursday: on leave (the report counts it like any day without punches)
+        Leave.objects.create(user=ann, leave_type="full_day", reason="sick",
+                             date=[(mon + timedelta(3)).isoformat()], status="approved", is_approved=True)
+        cls._punch("101", mon + timedelta(4), time(7, 40), time(15, 0))      # late, short
+        cls._punch("101", mon + timedelta(5), time(9, 0), time(12, 0))       # Saturday: ignored
+        cls._punch("102", mon, time(7, 10), time(16, 10))                    # exactly 9h
+        cls._punch("102", mon + timedelta(1), time(7, 0), time(15, 30))      # exactly 8.5h
+        cls._punch("00", mon, time(8, 0), time(17, 0))
+
+    @staticmethod
+    def _user(username, emp_code, first, last):
+        u = User.objects.create_user(username, f"{username}@example.com", "pw", first_name=first, last_name=last)
+        u.profile.emp_code = emp_code
+        u.profile.save()
+        return u
+
+    @staticmethod
+    def _punch(emp_code, d, first, last):
+        DailyPunchSummary.objects.create(emp_code=emp_code, date=d, first_punch=first,
+                                         last_punch=last, punch_count=2)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_matches_the_original_loop(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        response = client.post("/api/employee/attendance-summary/",
+                               {"start_date": str(self.START), "end_date": str(self.END)}, format="json")
+        self.assertEqual(response.status_code, 200)
+
+        expected = _baseline_report(self.START, self.END)
+        self.assertEqual(response.data["report"], expected)
+        self.assertEqual(response.data["report_count"], len(expected))
+
+        by_code = {r["emp_code"]: r for r in expected}
+        self.assertEqual([r["emp_code"] for r in expected], ["101", "102", "103"])
+        self.assertEqual(by_code["102"]["employee_name"], "Bob First")
+        self.assertEqual(by_code["101"]["total_vacation"], 2)
+        self.assertEqual(by_code["101"]["after_7_15_59"], 1)
+        self.assertEqual(by_code["103"]["total_vacation"], 5)
+
+
+class ReportEmployeesTests(SimpleTestCase):
+    def test_shared_emp_code_keeps_first_position_and_last_name(self):
+        # profiles.emp_code is unique, so the directory is stubbed to hold the
+        # duplicate the old employee_map dict used to collapse
+        employees = [
+            Employee(1, "bob", "Bob", "First", "", "102"),
+            Employee(2, "ann", "Ann", "Early", "", "101"),
+            Employee(3, "bob2", "Bob", "Second", "", "102"),
+            Employee(4, "frahman", "Admin", "User", "", "00"),
+            Employee(5, "nocode", "No", "Code", "", None),
+        ]
+        directory = mock.Mock(**{"reportable.return_value": [e for e in employees if e.emp_code not in (None, "00")]})
+        with mock.patch("employee.views.get_directory", return_value=directory):
+            self.assertEqual(report_employees(), [("102", "Bob Second"), ("101", "Ann Early")])
+
+
+# -------------------------------------------------
+# attendance_logs → DailyPunchSummary
+# -------------------------------------------------
+class DailyPunchAggregatesTests(AttendanceLogsTestCase):
+    def setUp(self):
+        for emp_code, ts in [
+            ("101", datetime(2025, 3, 10, 0, 0)),      # midnight belongs to its own day
+            ("101", datetime(2025, 3, 10, 17, 5)),
+            ("101", datetime(2025, 3, 10, 7, 10)),
+            ("102", datetime(2025, 3, 10, 8, 0)),
+            ("101", datetime(2025, 3, 11, 7, 0)),
+            ("101", datetime(2025, 3, 12, 0, 0)),      # outside 10..11
+        ]:
+            self.punch(emp_code, ts)
+
+    def test_buckets_per_employee_per_day(self):
+        with mock.patch.object(attendance_logs, "FETCH_SIZE", 2):
+            rows = sorted(daily_punch_aggregates(date(2025, 3, 10), date(2025, 3, 11)))
+        self.assertEqual(rows, [
+            ("101", datetime(2025, 3, 10, 0, 0), datetime(2025, 3, 10, 17, 5), 3),
+            ("101", datetime(2025, 3, 11, 7, 0), datetime(2025, 3, 11, 7, 0), 1),
+            ("102", datetime(2025, 3, 10, 8, 0), datetime(2025, 3, 10, 8, 0), 1),
+        ])
+
+    def test_emp_code_filter(self):
+        self.assertEqual([r[0] for r in daily_punch_aggregates(date(2025, 3, 10), emp_codes=["102"])], ["102"])
+        self.assertEqual(daily_punch_aggregates(date(2025, 3, 10), emp_codes=[]), [])
+
+
+class RefreshDailyPunchSummaryTests(AttendanceLogsTestCase):
+    def summary(self):
+        return {
+            (p.emp_code, p.date): (p.first_punch, p.last_punch, p.punch_count)
+            for p in DailyPunchSummary.objects.all()
+        }
+
+    def test_incremental_refresh_and_late_sync_window(self):
+        self.punch("101", datetime(2025, 3, 10, 7, 0))
+        self.punch("101", datetime(2025, 3, 11, 7, 5))
+        self.assertEqual(len(refresh_daily_punch_summary()), 2)
+
+        # Nothing new: nothing written
+        self.assertEqual(refresh_daily_punch_summary(), [])
+
+        # A device syncs yesterday's punch after today's: older than the
+        # high-water mark, but inside the re-folded window
+        late_day = date(2025, 3, 11) - timedelta(days=LATE_SYNC_DAYS)
+        self.punch("102", datetime.combine(late_day, time(12, 0)))
+        self.punch("101", datetime(2025, 3, 11, 18, 0))
+        written = refresh_daily_punch_summary()
+        self.assertEqual(sorted(written), [("101", date(2025, 3, 11)), ("102", late_day)])
+        self.assertEqual(self.summary()[("101", date(2025, 3, 11))], (time(7, 5), time(18, 0), 2))
+
+    def test_older_late_syncs_need_since(self):
+        self.punch("101", datetime(2025, 3, 11, 7, 5))
+        refresh_daily_punch_summary()
+
+        old = date(2025, 3, 11) - timedelta(days=LATE_SYNC_DAYS + 2)
+        self.punch("103", datetime.combine(old, time(7, 0)))
+        self.assertEqual(refresh_daily_punch_summary(), [])
+        self.assertEqual(refresh_daily_punch_summary(since=old), [("103", old)])
+
+
+# -------------------------------------------------
+# CSV exports
+# -------------------------------------------------
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class CsvExportTests(TestCase):
+    START, END = date(2025, 3, 3), date(2025, 3, 7)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user("frahman", "frahman@ampec.com.au", "pw")
+        for i in range(5):
+            u = User.objects.create_user(f"user{i}", f"user{i}@example.com", "pw", first_name=f"U{i}")
+            u.profile.emp_code = str(100 + i)
+            u.profile.save()
+            for day in range(i + 1):
+                DailyPunchSummary.objects.create(
+                    emp_code=str(100 + i), date=cls.START + timedelta(days=day),
+                    first_punch=time(7, 5 * i), last_punch=time(16, 10 * i), punch_count=2,
+                )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def csv_rows(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return list(csv.DictReader(io.StringIO(b"".join(response.streaming_content).decode())))
+
+    def test_punch_history_batches_cover_every_row_in_order(self):
+        qs = punch_summary_queryset()
+        expected = [(p.date, p.emp_code) for p in qs.order_by("-date", "emp_code")]
+        self.assertEqual(len(expected), 15)
+        for batch_size in (1, 4, 15, 100):
+            rows = [(p.date, p.emp_code) for p in iter_punch_history(qs, batch_size=batch_size)]
+            self.assertEqual(rows, expected, batch_size)
+
+    def test_punch_history_csv_matches_the_json_endpoint(self):
+        rows = self.csv_rows(self.client.get("/api/employee/daily-punches/export/", {"format": "csv"}))
+        page = self.client.get("/api/employee/daily-punches/", {"per_page": 100}).data["results"]
+        self.assertEqual(len(rows), 15)
+        self.assertEqual(
+            [(r["date"], r["emp_code"], r["first_punch_time"], r["status"]) for r in rows],
+            [(str(r["date"]), str(r["emp_code"]), str(r["first_punch_time"]), str(r["status"])) for r in page],
+        )
+
+    def test_attendance_summary_batches_match_the_report(self):
+        employees = report_employees()
+        working_days = report_working_days(self.START, self.END)
+        rows = (punch_summary_queryset(self.START, self.END).order_by("emp_code", "date")
+                .values_list("emp_code", "date", "first_punch", "last_punch"))
+        expected = attendance_summary(employees, rows, working_days)
+        for batch_size in (1, 2, 50):
+            streamed = list(iter_attendance_summary(
+                employees, punch_summary_queryset(self.START, self.END), working_days, batch_size=batch_size,
+            ))
+            self.assertEqual(streamed, expected, batch_size)
+
+    def test_attendance_summary_csv(self):
+        response = self.client.get("/api/employee/attendance-summary/export/",
+                                   {"start_date": str(self.START), "end_date": str(self.END), "format": "csv"})
+        self.assertIn("attendance-summary_2025-03-03_2025-03-07.csv", response["Content-Disposition"])
+        rows = self.csv_rows(response)
+        self.assertEqual([r["emp_code"] for r in rows], ["100", "101", "102", "103", "104"])
+        self.assertEqual([r["total_vacation"] for r in rows], ["4", "3", "2", "1", "0"])
+
+    def test_invalid_dates_are_a_400(self):
+        response = self.client.get("/api/employee/attendance-summary/export/",
+                                   {"start_date": "2025-03-07", "end_date": "2025-03-03", "format": "csv"})
+        self.assertEqual(response.status_code, 400)
+
+
+# -------------------------------------------------
+# Employee directory
+# -------------------------------------------------
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class DirectoryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.ann = User.objects.create_user("ann", "Ann@Example.com", "pw", first_name="Ann", last_name="Early")
+        cls.ann.profile.emp_code = "101"
+        cls.ann.profile.save()
+        cls.bob = User.objects.create_user("bob", "ann@example.com", "pw")
+
+    def setUp(self):
+        cache.clear()
+        directory_module.invalidate_directory()
+
+    def test_lookups(self):
+        directory = get_directory()
+        self.assertEqual(directory.get(101).user_id, self.ann.pk)
+        self.assertIsNone(directory.get("999"))
+        self.assertIsNone(directory.get(None))
+        self.assertEqual(list(directory.for_codes(["101", "999"])), ["101"])
+        self.assertEqual(sorted(directory.user_ids_for_email(" ANN@example.com ")), [self.ann.pk, self.bob.pk])
+        self.assertEqual(directory.by_user_id[self.ann.pk].name, "Ann Early")
+        self.assertEqual(directory.by_user_id[self.bob.pk].name, "bob")
+        self.assertEqual([e.emp_code for e in directory.reportable()], ["101"])
+
+    def test_cached_per_process_and_shared_across_processes(self):
+        get_directory()
+        with self.assertNumQueries(0):
+            get_directory()
+
+        # Another worker: no local copy yet, served from the Django cache
+        directory_module._local.update(version=None, directory=None)
+        with self.assertNumQueries(0):
+            self.assertIsNotNone(get_directory().get("101"))
+
+    def test_profile_change_is_visible_after_commit(self):
+        get_directory()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ann.profile.emp_code = "201"
+            self.ann.profile.save()
+            self.assertIsNotNone(get_directory().get("101"))    # not committed yet
+        self.assertIsNone(get_directory().get("101"))
+        self.assertEqual(get_directory().get("201").user_id, self.ann.pk)
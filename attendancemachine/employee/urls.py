@@ -1,9 +1,14 @@
 # employee/urls.py
 from django.urls import path
-from .views import EmployeeInfoView, DailyFirstPunchesView, AttendanceSummaryReport
+from .views import (
+    EmployeeInfoView, DailyFirstPunchesView, AttendanceSummaryReport,
+    DailyPunchesExportView, AttendanceSummaryExportView,
+)
 
 urlpatterns = [
     path('info/', EmployeeInfoView.as_view()),
     path('daily-punches/', DailyFirstPunchesView.as_view()),
     path('attendance-summary/', AttendanceSummaryReport.as_view()),  # ✅ New function
+    path('daily-punches/export/', DailyPunchesExportView.as_view()),
+    path('attendance-summary/export/', AttendanceSummaryExportView.as_view()),
 ]
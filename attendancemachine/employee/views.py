@@ -1,14 +1,27 @@
 # employee/views.py
-from django.db import connections
+import base64
+import binascii
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.db.models import Q
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from datetime import datetime, timedelta
 from urllib.parse import urlencode
 from corsheaders.defaults import default_headers
-from collections import defaultdict
 from django.contrib.auth.models import User
 
+from .directory import get_directory
+from .exports import (
+    ATTENDANCE_SUMMARY_COLUMNS, PUNCH_HISTORY_COLUMNS, CSVRenderer,
+    csv_response, iter_attendance_summary, iter_punch_history,
+)
+from .reports import attendance_summary
+from .services import punch_summary_queryset, punch_times
+
 
 class EmployeeInfoView(APIView):
     permission_classes = [IsAuthenticated]
@@ -47,138 +60,195 @@ class EmployeeInfoView(APIView):
 
 
 
+# -------------------------------------------------
+# Punch row formatting (shared by page + cursor modes)
+# -------------------------------------------------
+
+DAY_START = datetime.strptime('07:00:00', '%H:%M:%S').time()
+LATE_AFTER = datetime.strptime('07:15:59', '%H:%M:%S').time()
+EARLY_LEAVE_BELOW = timedelta(hours=8, minutes=30)
+FULL_DAY = timedelta(hours=9)
+
+
+def format_time(dt):
+    return dt.strftime('%H:%M:%S') if isinstance(dt, datetime) else str(dt)
+
+
+def calculate_duration(start, end):
+    if isinstance(start, datetime) and isinstance(end, datetime):
+        total_minutes = int((end - start).total_seconds() // 60)
+        return f"{total_minutes // 60:02}:{total_minutes % 60:02}"
+    return "00:00"
+
+
+def check_arrival_status(first_punch):
+    if isinstance(first_punch, datetime):
+        if first_punch.time() > LATE_AFTER:
+            base_time = datetime.combine(first_punch.date(), DAY_START)
+            delta = first_punch - base_time
+            minutes_late = int(delta.total_seconds() // 60)
+            return f"Late ({minutes_late} mins)"
+    return ""
+
+
+def check_leave_status(first_punch, last_punch):
+    if isinstance(first_punch, datetime) and isinstance(last_punch, datetime):
+        actual_duration = last_punch - first_punch
+        if actual_duration < EARLY_LEAVE_BELOW:
+            minutes_short = int((FULL_DAY - actual_duration).total_seconds() // 60)
+            return f"Early Leave ({minutes_short} mins)"
+    return ""
+
+
+def employee_name_map():
+    """
+    emp_code → (first_name, last_name)
+    """
+    return {
+        code: (e.first_name, e.last_name)
+        for code, e in get_directory().by_code.items()
+    }
+
+
+def punch_result(row, user_map):
+    """
+    API dict for one DailyPunchSummary row.
+    user_map: emp_code -> (first_name, last_name)
+    """
+    first_punch_dt, last_punch_dt = punch_times(row)
+    arrival_status = check_arrival_status(first_punch_dt)
+    leave_status = check_leave_status(first_punch_dt, last_punch_dt)
+    first_name, last_name = user_map.get(row.emp_code, ("", ""))
+
+    return {
+        "emp_code": row.emp_code,
+        "first_name": first_name,
+        "last_name": last_name,
+        "date": str(row.date),
+        "first_punch_time": format_time(first_punch_dt),
+        "last_punch_time": format_time(last_punch_dt),
+        "total_hour": calculate_duration(first_punch_dt, last_punch_dt),
+        "status": " + ".join(filter(None, [arrival_status, leave_status])),
+    }
+
+
+def encode_punch_cursor(row):
+    raw = json.dumps({"d": row.date.isoformat(), "e": row.emp_code}).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_punch_cursor(token):
+    """
+    (date, emp_code) of the last row of the previous page; ValueError if malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        data = json.loads(raw)
+        return datetime.strptime(data["d"], "%Y-%m-%d").date(), str(data["e"])
+    except (TypeError, KeyError, binascii.Error, json.JSONDecodeError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor.")
+
+
+def filtered_punch_history(request):
+    """
+    DailyPunchSummary queryset for the punch-history endpoints, ordered
+    newest first, honouring ?emp_code= / ?date= / ?start_date= / ?end_date=.
+    Non-admin users only ever see their own emp_code.
+
+    Returns (queryset, None) or (None, error Response).
+    """
+    user = request.user
+    emp_code = request.query_params.get('emp_code')
+    user_email = user.email.lower()
+    is_admin_user = user_email == "frahman@ampec.com.au"
+
+    # For regular user, get emp_code from profile
+    if not is_admin_user:
+        emp_code = getattr(user.profile, 'emp_code', None)
+        if not emp_code:
+            return None, Response({"error": "Employee code not found for this user."}, status=404)
+
+    specific_date = request.query_params.get('date')
+    start_date = request.query_params.get('start_date')
+    end_date = request.query_params.get('end_date')
+
+    try:
+        if start_date and end_date:
+            qs = punch_summary_queryset(
+                datetime.strptime(start_date, "%Y-%m-%d").date(),
+                datetime.strptime(end_date, "%Y-%m-%d").date(),
+            )
+        elif start_date:
+            qs = punch_summary_queryset(
+                datetime.strptime(start_date, "%Y-%m-%d").date(),
+                datetime.now().date(),
+            )
+        elif specific_date:
+            d = datetime.strptime(specific_date, "%Y-%m-%d").date()
+            qs = punch_summary_queryset(d, d)
+        else:
+            qs = punch_summary_queryset()
+    except ValueError:
+        return None, Response({"error": "Invalid date format. Use YYYY-MM-DD."}, status=400)
+
+    if emp_code:
+        qs = qs.filter(emp_code=str(emp_code))
+
+    return qs.order_by("-date", "emp_code"), None
+
+
+PUNCH_COUNT_CACHE_SECONDS = 300
+PUNCHES_PER_PAGE = 10
+MAX_PUNCHES_PER_PAGE = 200
+
+
+def _positive_int(value, default, cap=None):
+    """Like the leave pagination: missing / invalid / < 1 → default, then capped."""
+    try:
+        n = int(value)
+    except (TypeError, ValueError):
+        return default
+    if n < 1:
+        return default
+    return min(n, cap) if cap else n
+
+
 class DailyFirstPunchesView(APIView):
+    """
+    GET /api/employee/daily-punches/
+
+    Page mode (default):  ?page=&per_page=
+    Cursor mode:          ?cursor=&per_page=   (empty cursor = first page)
+        - keyset pagination on (date DESC, emp_code) → constant cost per page
+        - follow pagination.next_cursor / next_page_url until it is null
+        - total is only included with ?include_total=1 and is a cached
+          approximation (refreshed every few minutes)
+    """
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        user = request.user
-        emp_code = request.query_params.get('emp_code')
-        user_email = user.email.lower()
-        is_admin_user = user_email == "frahman@ampec.com.au"
-
-        # For regular user, get emp_code from profile
-        if not is_admin_user:
-            emp_code = getattr(user.profile, 'emp_code', None)
-            if not emp_code:
-                return Response({"error": "Employee code not found for this user."}, status=404)
-
-        specific_date = request.query_params.get('date')
-        start_date = request.query_params.get('start_date')
-        end_date = request.query_params.get('end_date')
-        per_page = int(request.query_params.get('per_page', 10))
-        page = int(request.query_params.get('page', 1))
-
-        params = []
-        sql = """
-            SELECT user_id,
-                   DATE(timestamp) as punch_date,
-                   MIN(timestamp) as first_punch_time,
-                   MAX(timestamp) as last_punch_time
-            FROM attendance_logs
-            WHERE 1=1
-        """
-
-        if emp_code:
-            sql += " AND user_id = %s"
-            params.append(emp_code)
+        qs, error = filtered_punch_history(request)
+        if error is not None:
+            return error
 
-        try:
-            if start_date and end_date:
-                end_date_obj = datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1)
-                sql += " AND timestamp >= %s AND timestamp < %s"
-                params.append(start_date)
-                params.append(end_date_obj.strftime("%Y-%m-%d"))
-            elif start_date:
-                today_plus_one = (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')
-                sql += " AND timestamp >= %s AND timestamp < %s"
-                params.append(start_date)
-                params.append(today_plus_one)
-            elif specific_date:
-                sql += " AND DATE(timestamp) = %s"
-                params.append(specific_date)
-        except ValueError:
-            return Response({"error": "Invalid date format. Use YYYY-MM-DD."}, status=400)
-
-        sql += """
-            GROUP BY user_id, DATE(timestamp)
-            ORDER BY DATE(timestamp) DESC
-        """
+        qp = request.query_params
+        per_page = _positive_int(qp.get('per_page'), PUNCHES_PER_PAGE, MAX_PUNCHES_PER_PAGE)
+        page = _positive_int(qp.get('page'), 1)
+
+        if 'cursor' in request.query_params:
+            count_key = str(qs.query)
+            return self.get_by_cursor(request, qs, per_page, count_key)
 
         # Count total results
-        count_sql = f"SELECT COUNT(*) FROM ({sql}) AS subquery"
-        with connections['logs'].cursor() as cursor:
-            cursor.execute(count_sql, params)
-            total_count = cursor.fetchone()[0]
+        total_count = qs.count()
 
         # Pagination
         offset = (page - 1) * per_page
-        paginated_sql = f"""
-            SELECT * FROM ({sql}) AS subquery
-            LIMIT %s OFFSET %s
-        """
-        paginated_params = params + [per_page, offset]
-
-        with connections['logs'].cursor() as cursor:
-            cursor.execute(paginated_sql, paginated_params)
-            rows = cursor.fetchall()
-
-        # Build emp_code → (first_name, last_name) map
-        user_map = {}
-        for u in User.objects.select_related('profile').all():
-            emp_code_key = getattr(u.profile, 'emp_code', None)
-            if emp_code_key:
-                user_map[emp_code_key] = (u.first_name, u.last_name)
-
-        # Utilities
-        def format_time(dt):
-            return dt.strftime('%H:%M:%S') if isinstance(dt, datetime) else str(dt)
-
-        def calculate_duration(start, end):
-            if isinstance(start, datetime) and isinstance(end, datetime):
-                total_minutes = int((end - start).total_seconds() // 60)
-                return f"{total_minutes // 60:02}:{total_minutes % 60:02}"
-            return "00:00"
-
-        def check_arrival_status(first_punch):
-            if isinstance(first_punch, datetime):
-                threshold_time = datetime.strptime('07:15:59', '%H:%M:%S').time()
-                if first_punch.time() > threshold_time:
-                    base_time = datetime.combine(first_punch.date(), datetime.strptime('07:00:00', '%H:%M:%S').time())
-                    delta = first_punch - base_time
-                    minutes_late = int(delta.total_seconds() // 60)
-                    return f"Late ({minutes_late} mins)"
-            return ""
-
-        def check_leave_status(first_punch, last_punch):
-            if isinstance(first_punch, datetime) and isinstance(last_punch, datetime):
-                actual_duration = last_punch - first_punch
-                threshold = timedelta(hours=8, minutes=30)
-                full_required = timedelta(hours=9)
-
-                if actual_duration < threshold:
-                    minutes_short = int((full_required - actual_duration).total_seconds() // 60)
-                    return f"Early Leave ({minutes_short} mins)"
-            return ""
+        rows = list(qs[offset:offset + per_page])
 
         # Build response
-        results = []
-        for row in rows:
-            emp_code_row, punch_date, first_punch_dt, last_punch_dt = row
-            arrival_status = check_arrival_status(first_punch_dt)
-            leave_status = check_leave_status(first_punch_dt, last_punch_dt)
-            combined_status = " + ".join(filter(None, [arrival_status, leave_status]))
-            first_name, last_name = user_map.get(emp_code_row, ("", ""))
-
-            results.append({
-                "emp_code": emp_code_row,
-                "first_name": first_name,
-                "last_name": last_name,
-                "date": str(punch_date),
-                "first_punch_time": format_time(first_punch_dt),
-                "last_punch_time": format_time(last_punch_dt),
-                "total_hour": calculate_duration(first_punch_dt, last_punch_dt),
-                "status": combined_status
-            })
+        user_map = employee_name_map()
+        results = [punch_result(row, user_map) for row in rows]
 
         # Pagination metadata
         last_page = (total_count + per_page - 1) // per_page
@@ -200,7 +270,7 @@ class DailyFirstPunchesView(APIView):
         }
 
         # Add total employee count (excluding emp_code == "00")
-        total_employee = User.objects.exclude(profile__emp_code="00").count()
+        total_employee = total_employee_count()
 
         return Response({
             "pagination": pagination,
@@ -208,6 +278,79 @@ class DailyFirstPunchesView(APIView):
             "total_employee": total_employee
         })
 
+    def get_by_cursor(self, request, qs, per_page, count_key):
+        qp = request.query_params
+        filtered_qs = qs
+
+        token = qp.get('cursor')
+        if token:
+            try:
+                after_date, after_code = decode_punch_cursor(token)
+            except ValueError as e:
+                return Response({"error": str(e)}, status=400)
+            qs = qs.filter(Q(date__lt=after_date) | Q(date=after_date, emp_code__gt=after_code))
+
+        # One extra row tells us whether another page exists
+        rows = list(qs[:per_page + 1])
+        has_next = len(rows) > per_page
+        rows = rows[:per_page]
+
+        user_map = employee_name_map()
+        results = [punch_result(row, user_map) for row in rows]
+
+        next_cursor = encode_punch_cursor(rows[-1]) if has_next else None
+        next_page_url = None
+        if next_cursor:
+            base_params = qp.dict()
+            base_params['per_page'] = per_page
+            base_params['cursor'] = next_cursor
+            next_page_url = f"{request.build_absolute_uri(request.path)}?{urlencode(base_params)}"
+
+        pagination = {
+            "per_page": per_page,
+            "next_cursor": next_cursor,
+            "next_page_url": next_page_url,
+        }
+
+        if str(qp.get('include_total', '')).lower() in ("1", "true", "t", "yes", "y"):
+            key = "daily_punches:count:" + hashlib.md5(count_key.encode()).hexdigest()
+            total = cache.get(key)
+            if total is None:
+                total = filtered_qs.count()
+                cache.set(key, total, PUNCH_COUNT_CACHE_SECONDS)
+            pagination["total"] = total
+            pagination["total_is_approximate"] = True
+
+        total_employee = total_employee_count()
+
+        return Response({
+            "pagination": pagination,
+            "results": results,
+            "total_employee": total_employee
+        })
+
+
+def report_employees():
+    """
+    [(emp_code, "First Last"), ...] of everyone included in attendance reports,
+    one entry per emp_code: like the old employee_map dict, a shared code keeps
+    its first user's position and its last user's name.
+    """
+    names = {}
+    for e in get_directory().reportable():
+        names[e.emp_code] = f"{e.first_name} {e.last_name}"
+    return list(names.items())
+
+
+def total_employee_count():
+    # Everyone except the "00" account
+    return sum(1 for e in get_directory().employees if e.emp_code != "00")
+
+
+def report_working_days(start_date, end_date):
+    all_dates = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+    return [d for d in all_dates if d.weekday() not in (5, 6)]
+
 
 class AttendanceSummaryReport(APIView):
     permission_classes = [IsAuthenticated]
@@ -222,116 +365,15 @@ class AttendanceSummaryReport(APIView):
         if end_date < start_date:
             return Response({"error": "end_date cannot be before start_date."}, status=400)
 
-        all_dates = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
-        working_days = [d for d in all_dates if d.weekday() not in (5, 6)]
+        working_days = report_working_days(start_date, end_date)
 
-        users = User.objects.select_related('profile').all()
-        employee_map = {
-            u.profile.emp_code: {
-                'name': f"{u.first_name} {u.last_name}"
-            }
-            for u in users
-            if hasattr(u, 'profile') and u.profile.emp_code
-        }
-
-        with connections['logs'].cursor() as cursor:
-            cursor.execute("""
-                SELECT user_id, DATE(timestamp), MIN(timestamp), MAX(timestamp)
-                FROM attendance_logs
-                WHERE DATE(timestamp) BETWEEN %s AND %s
-                GROUP BY user_id, DATE(timestamp)
-            """, [start_date, end_date])
-            punch_data = cursor.fetchall()
+        employees = report_employees()
 
-        punch_map = defaultdict(dict)
-        for user_id, punch_date, first_punch, last_punch in punch_data:
-            punch_map[user_id][punch_date] = (first_punch, last_punch)
+        rows = (punch_summary_queryset(start_date, end_date)
+                .order_by("emp_code", "date")
+                .values_list("emp_code", "date", "first_punch", "last_punch"))
 
-        results = []
-        serial_no = 1
-
-        for emp_code, info in employee_map.items():
-            if emp_code == "00":
-                continue  # Skip this 00 employee
-
-            total_minutes = 0
-            total_days = 0
-            sum_first_punch_seconds = 0
-            sum_last_punch_seconds = 0
-            vacation_count = 0
-
-            less_8_30 = 0
-            between_8_30_and_9_00 = 0
-            greater_9_00 = 0
-
-            before_7am = 0
-            between_7_and_7_15_59 = 0
-            after_7_15_59 = 0
-
-            for d in working_days:
-                punch = punch_map[emp_code].get(d)
-                if punch:
-                    first_punch, last_punch = punch
-                    duration = last_punch - first_punch
-                    duration_minutes = duration.total_seconds() / 60
-                    duration_hours = duration.total_seconds() / 3600
-
-                    total_minutes += duration_minutes
-                    total_days += 1
-                    sum_first_punch_seconds += first_punch.hour * 3600 + first_punch.minute * 60 + first_punch.second
-                    sum_last_punch_seconds += last_punch.hour * 3600 + last_punch.minute * 60 + last_punch.second
-
-                    if duration_hours < 8.5:
-                        less_8_30 += 1
-                    elif 8.5 <= duration_hours <= 9:
-                        between_8_30_and_9_00 += 1
-                    else:
-                        greater_9_00 += 1
-
-                    punch_time = first_punch.time()
-                    if punch_time < datetime.strptime("07:00:00", "%H:%M:%S").time():
-                        before_7am += 1
-                    elif punch_time <= datetime.strptime("07:15:59", "%H:%M:%S").time():
-                        between_7_and_7_15_59 += 1
-                    else:
-                        after_7_15_59 += 1
-                else:
-                    vacation_count += 1
-
-            def format_duration(minutes):
-                h = int(minutes // 60)
-                m = int(minutes % 60)
-                return f"{h:02}:{m:02}"
-
-            def format_avg_time(seconds):
-                if total_days == 0:
-                    return "00:00:00"
-                avg = int(seconds / total_days)
-                h = avg // 3600
-                m = (avg % 3600) // 60
-                s = avg % 60
-                return f"{h:02}:{m:02}:{s:02}"
-
-            result = {
-                "serial_no": serial_no,
-                "emp_code": emp_code,
-                "employee_name": info['name'],
-                "total_working_hours": format_duration(total_minutes),
-                "total_working_days": total_days,
-                "avg_hours_per_day": format_duration(total_minutes / total_days if total_days else 0),
-                "avg_sign_in": format_avg_time(sum_first_punch_seconds),
-                "avg_sign_out": format_avg_time(sum_last_punch_seconds),
-                "total_vacation": vacation_count,
-                "less_8_30": less_8_30,
-                "between_8_30_and_9_00": between_8_30_and_9_00,
-                "greater_9_00": greater_9_00,
-                "before_7am": before_7am,
-                "between_7_and_7_15_59": between_7_and_7_15_59,
-                "after_7_15_59": after_7_15_59
-            }
-
-            results.append(result)
-            serial_no += 1
+        results = attendance_summary(employees, rows, working_days)
 
         return Response({
             "start_date": str(start_date),
@@ -351,3 +393,61 @@ class AttendanceSummaryReport(APIView):
 
 
 
+
+
+# -------------------------------------------------
+# CSV exports (streamed)
+# -------------------------------------------------
+
+class DailyPunchesExportView(APIView):
+    """
+    GET /api/employee/daily-punches/export/?format=csv
+
+    Same filters and permissions as /daily-punches/ (emp_code, date,
+    start_date, end_date), every matching row, streamed as CSV.
+    """
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [CSVRenderer]
+
+    def get(self, request):
+        qs, error = filtered_punch_history(request)
+        if error is not None:
+            return error
+
+        user_map = employee_name_map()
+        rows = (punch_result(row, user_map) for row in iter_punch_history(qs))
+
+        return csv_response("daily-punches.csv", PUNCH_HISTORY_COLUMNS, rows)
+
+
+class AttendanceSummaryExportView(APIView):
+    """
+    GET /api/employee/attendance-summary/export/?start_date=&end_date=&format=csv
+
+    The attendance summary report as CSV, computed and streamed in batches
+    of employees, so multi-year ranges run in constant memory.
+    """
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [CSVRenderer]
+
+    def get(self, request):
+        try:
+            start_date = datetime.strptime(request.query_params.get('start_date'), "%Y-%m-%d").date()
+            end_date = datetime.strptime(request.query_params.get('end_date'), "%Y-%m-%d").date()
+        except (ValueError, TypeError):
+            return Response({"error": "Invalid or missing date format. Use YYYY-MM-DD."}, status=400)
+
+        if end_date < start_date:
+            return Response({"error": "end_date cannot be before start_date."}, status=400)
+
+        rows = iter_attendance_summary(
+            report_employees(),
+            punch_summary_queryset(start_date, end_date),
+            report_working_days(start_date, end_date),
+        )
+
+        return csv_response(
+            f"attendance-summary_{start_date}_{end_date}.csv",
+            ATTENDANCE_SUMMARY_COLUMNS,
+            rows,
+        )
@@ -1,3 +1,17 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import GrammarCorrection, OutboundEmail
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'subject', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status', 'kind')
+    search_fields = ('subject', 'last_error')
+    readonly_fields = ('created_at', 'sent_at')
+
+
+@admin.register(GrammarCorrection)
+class GrammarCorrectionAdmin(admin.ModelAdmin):
+    list_display = ('id', 'text', 'corrected', 'provider', 'created_at')
+    search_fields = ('text', 'corrected')
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class LeaveConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'leave'
+
+    def ready(self):
+        import leave.signals  # noqa: F401  (ledger / calendar cache receivers)
@@ -0,0 +1,233 @@
+# leave/bulk.py
+"""
+Bulk manual leave import and bulk approve / reject (admin endpoints).
+
+Each call is one transaction with set-based reads and writes instead of a
+save() per leave:
+
+  - overlap check: one LeaveDay query for every (user, date) of the batch,
+    plus a check between the batch's own items, under the same per-user
+    row locks Leave.save takes
+  - Leave bulk_create / bulk_update, LeaveDay bulk_create / update
+  - LeaveLedger rebuilt once per touched year for the touched users
+  - notifications rendered and queued with a single INSERT
+"""
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from mealreport.services import mark_cook_dates_dirty
+from seatplan.services import invalidate_seat_plan
+from .calendar_cache import invalidate_leave_calendar
+from .mailer import enqueue_emails
+from .models import ACTIVE_LEAVE_STATUSES, Leave, LeaveDay
+from .notifications import decision_leave, decision_messages, informed_status_for, team_emails_for
+from .services import leave_dates, leave_unit, rebuild_leave_ledger
+
+MAX_BULK_ITEMS = 1000
+
+
+class BulkLeaveError(Exception):
+    """The batch was rejected; errors = [{ index, errors: [messages] }]."""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__(f"{len(errors)} invalid item(s)")
+
+
+def _lock_users(user_ids):
+    User = get_user_model()
+    list(User.objects.select_for_update().filter(pk__in=sorted(user_ids)).values_list("pk", flat=True))
+
+
+def _refresh_derived(approved_days, changed_dates):
+    """
+    Ledger for the users / years of approved_days [(user_id, date)] and
+    meal report dirty flags now, calendar + seat plan caches once the
+    transaction commits.
+    """
+    by_year = {}
+    for user_id, d in approved_days:
+        by_year.setdefault(d.year, set()).add(user_id)
+    for year, user_ids in by_year.items():
+        rebuild_leave_ledger(year=year, user_ids=user_ids)
+
+    months = {(d.year, d.month) for _, d in approved_days}
+    dates = sorted(set(changed_dates))
+    transaction.on_commit(lambda: invalidate_leave_calendar(months))
+    transaction.on_commit(lambda: invalidate_seat_plan(dates))
+    mark_cook_dates_dirty(dates)
+
+
+# -------------------------------------------------
+# Import
+# -------------------------------------------------
+
+def bulk_create_leaves(items):
+    """
+    Create manual leaves from validated items (user_id, leave_type, date [ISO],
+    reason, status, informed_status). All or nothing: raises BulkLeaveError
+    with every problem found. Returns the created leaves (ordered by id).
+    """
+    User = get_user_model()
+    errors = {}
+
+    def error(i, message):
+        errors.setdefault(i, []).append(message)
+
+    known_users = set(User.objects.filter(id__in={it["user_id"] for it in items}).values_list("id", flat=True))
+    today = timezone.localdate()
+    batch = uuid.uuid4()
+
+    objs = []
+    for i, it in enumerate(items):
+        if it["user_id"] not in known_users:
+            error(i, "user_id not found.")
+        status = it.get("status") or "approved"
+        obj = Leave(
+            user_id=it["user_id"],
+            leave_type=it["leave_type"],
+            reason=it.get("reason") or "",
+            date=it["date"],
+            status=status,
+            is_approved=(status == "approved"),
+            informed_status=it.get("informed_status") or informed_status_for(it["date"], today),
+            import_batch=batch,
+        )
+        # Model rules (half-day, full-day reasons, ...); overlap is checked set-wise below
+        obj._overlap_checked = True
+        try:
+            obj.full_clean(exclude=["user"])
+        except ValidationError as e:
+            for message in e.messages:
+                error(i, message)
+        else:
+            obj.start_date, obj.end_date = obj.date_bounds()
+        objs.append(obj)
+
+    # Overlaps between items of the batch
+    claimed = {}
+    for i, obj in enumerate(objs):
+        if obj.status not in ACTIVE_LEAVE_STATUSES:
+            continue
+        for d in leave_dates(obj.date):
+            other = claimed.setdefault((obj.user_id, d), i)
+            if other != i:
+                error(i, f"Overlaps item {other} on {d}.")
+
+    with transaction.atomic():
+        # Same lock as Leave.save: no single submission can slip in between
+        _lock_users({obj.user_id for obj in objs})
+
+        if claimed:
+            taken = set(
+                LeaveDay.objects
+                .filter(user_id__in={u for u, _ in claimed}, date__in={d for _, d in claimed},
+                        status__in=ACTIVE_LEAVE_STATUSES)
+                .values_list("user_id", "date")
+            )
+            for key in sorted(taken & set(claimed)):
+                error(claimed[key], f"Leave already exists on {key[1]} for this user.")
+
+        if errors:
+            raise BulkLeaveError([{"index": i, "errors": errors[i]} for i in sorted(errors)])
+
+        Leave.objects.bulk_create(objs, batch_size=500)
+        # MySQL returns no ids from a bulk insert: read the batch back
+        created = list(Leave.objects.filter(import_batch=batch).order_by("id"))
+
+        days = [
+            LeaveDay(leave_id=lv.pk, user_id=lv.user_id, date=d, unit=leave_unit(lv.leave_type), status=lv.status)
+            for lv in created
+            for d in leave_dates(lv.date)
+        ]
+        LeaveDay.objects.bulk_create(days, batch_size=1000)
+
+        _refresh_derived(
+            [(day.user_id, day.date) for day in days if day.status == "approved"],
+            [day.date for day in days],
+        )
+
+    return created
+
+
+# -------------------------------------------------
+# Decisions
+# -------------------------------------------------
+
+def bulk_decide(decisions):
+    """
+    Approve / reject pending leaves: decisions = [(leave_id, "approve" | "reject")].
+    Leaves that are missing or no longer pending are skipped.
+    Returns (decided [{ id, status, informed_status }], skipped [{ id, error }]).
+    """
+    actions = dict(decisions)
+    now = timezone.now()
+
+    with transaction.atomic():
+        leaves = list(Leave.objects.select_for_update().filter(id__in=list(actions), status="pending").order_by("id"))
+        decided_ids = {lv.id for lv in leaves}
+
+        skipped = []
+        missing = [i for i in actions if i not in decided_ids]
+        if missing:
+            statuses = dict(Leave.objects.filter(id__in=missing).values_list("id", "status"))
+            for i in missing:
+                skipped.append({
+                    "id": i,
+                    "error": f"Leave is already {statuses[i]}." if i in statuses else "Leave not found.",
+                })
+
+        for lv in leaves:
+            approve = actions[lv.id] == "approve"
+            lv.status = "approved" if approve else "rejected"
+            lv.is_approved = approve
+            lv.updated_at = now
+            if approve and lv.date:
+                lv.informed_status = informed_status_for(lv.date, lv.created_at.date())
+        Leave.objects.bulk_update(leaves, ["status", "is_approved", "informed_status", "updated_at"], batch_size=500)
+
+        for status in ("approved", "rejected"):
+            ids = [lv.id for lv in leaves if lv.status == status]
+            if ids:
+                LeaveDay.objects.filter(leave_id__in=ids).update(status=status)
+
+        approved_days = list(
+            LeaveDay.objects.filter(leave_id__in=[lv.id for lv in leaves if lv.status == "approved"])
+            .values_list("user_id", "date")
+        )
+        _refresh_derived(approved_days, [d for lv in leaves for d in leave_dates(lv.date)])
+
+    _queue_decision_emails(leaves, actions)
+
+    decided = [{"id": lv.id, "status": lv.status, "informed_status": lv.informed_status} for lv in leaves]
+    return decided, skipped
+
+
+def _queue_decision_emails(leaves, actions):
+    if not leaves:
+        return
+    User = get_user_model()
+    users = User.objects.only("id", "email", "username", "first_name", "last_name") \
+        .in_bulk({lv.user_id for lv in leaves})
+    team = team_emails_for({lv.user_id for lv in leaves if lv.status == "approved"})
+
+    messages = []
+    for lv in leaves:
+        user = users.get(lv.user_id)
+        if user is None:
+            continue
+        try:
+            leave_ns = decision_leave(lv.id, lv.leave_type, lv.reason, lv.status,
+                                      lv.informed_status, lv.date, email_body=lv.email_body)
+            messages.extend(decision_messages(
+                user, leave_ns, actions[lv.id], lv.corrected_reason or lv.reason, team.get(lv.user_id, []),
+            ))
+        except Exception as e:
+            print(f"❌ Failed to render decision emails for leave {lv.id}: {e}")
+
+    queued = enqueue_emails(messages)
+    print(f"✉️ Queued {queued} decision email(s) for {len(leaves)} leave(s)")
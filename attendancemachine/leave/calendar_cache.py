@@ -0,0 +1,132 @@
+# leave/calendar_cache.py
+"""
+Month calendar of approved leave, cached per (visibility scope, month).
+
+A scope is the set of users a viewer may see: everyone for the admin, team
++ self otherwise (so team mates share one cached month). The cached month
+and its ETag are keyed by three tokens:
+
+  - the month's version, bumped by invalidate_leave_calendar() whenever an
+    approved leave changes in that month (leave.services.sync_leave_days)
+  - the employee directory version (names / emp codes in the entries)
+  - the scope digest; a viewer's team comes from the cached team graph
+    (member.graph)
+
+so answering If-None-Match needs cache reads only.
+"""
+import hashlib
+import uuid
+from datetime import date as date_cls, timedelta
+
+from django.core.cache import cache
+
+from employee.directory import directory_version, get_directory
+from member.graph import get_team_graph
+from .models import LeaveDay
+
+CALENDAR_CACHE_KEY = "leave:calendar:{scope}:{year}-{month:02d}:{version}"
+CALENDAR_MONTH_VERSION_KEY = "leave:calendar:version:{year}-{month:02d}"
+CALENDAR_CACHE_SECONDS = 24 * 60 * 60
+
+
+def _token(key):
+    token = cache.get(key)
+    if token is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        token = cache.get(key)
+    return token
+
+
+def invalidate_leave_calendar(months):
+    """Approved leave changed in these (year, month) buckets."""
+    months = set(months)
+    if months:
+        cache.set_many({
+            CALENDAR_MONTH_VERSION_KEY.format(year=y, month=m): uuid.uuid4().hex
+            for y, m in months
+        }, None)
+
+
+def _team_user_ids(user_id, directory):
+    """
+    Users whose email is one of the viewer's assigned members' emails
+    (emp_code "00" excluded), plus the viewer.
+    """
+    ids = {
+        uid for uid in get_team_graph().member_user_ids(user_id, directory)
+        if directory.by_user_id[uid].emp_code != "00"
+    }
+    ids.add(user_id)
+    return sorted(ids)
+
+
+def calendar_scope(user):
+    """
+    (scope key, visible user ids or None for everyone visible to the admin).
+    """
+    if user.username == "frahman":
+        return "all", None
+
+    user_ids = _team_user_ids(user.id, get_directory())
+    digest = hashlib.sha1(",".join(map(str, user_ids)).encode()).hexdigest()[:16]
+    return f"team:{digest}", user_ids
+
+
+def calendar_version(scope, year, month):
+    """Changes whenever the cached month of this scope would change."""
+    month_token = _token(CALENDAR_MONTH_VERSION_KEY.format(year=year, month=month))
+    raw = f"{scope}|{year}-{month:02d}|{month_token}|{directory_version()}"
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def build_calendar_days(year, month, user_ids=None):
+    """
+    [{ date, leaves: [...] }] for every day of the month; user_ids=None
+    means every user except emp_code "00".
+    """
+    first_day = date_cls(year, month, 1)
+    last_day = (date_cls(year + 1, 1, 1) if month == 12 else date_cls(year, month + 1, 1)) - timedelta(days=1)
+
+    directory = get_directory()
+    rows = LeaveDay.objects.filter(status="approved", date__gte=first_day, date__lte=last_day)
+    if user_ids is None:
+        rows = rows.exclude(user_id__in=[e.user_id for e in directory.employees if e.emp_code == "00"])
+    else:
+        rows = rows.filter(user_id__in=user_ids)
+
+    rows = (
+        rows
+        .order_by("date", "leave_id")
+        .values_list("date", "user_id", "leave__leave_type", "leave__reason", "leave__informed_status")
+    )
+
+    days = []
+    current = first_day
+    while current <= last_day:
+        days.append({"date": current.isoformat(), "leaves": []})
+        current += timedelta(days=1)
+    index_map = {d["date"]: d for d in days}
+
+    for d_date, uid, leave_type, reason, informed_status in rows:
+        e = directory.by_user_id.get(uid)
+        index_map[d_date.isoformat()]["leaves"].append({
+            "user_id": uid,
+            "first_name": e.first_name if e else "",
+            "last_name": e.last_name if e else "",
+            "emp_code": e.emp_code if e else None,
+            "leave_type": leave_type,
+            "reason": reason,
+            "informed_status": informed_status,
+        })
+    return days
+
+
+def calendar_days(scope, user_ids, year, month, version=None):
+    """Cached build_calendar_days() for the scope."""
+    version = version or calendar_version(scope, year, month)
+    key = CALENDAR_CACHE_KEY.format(scope=scope, year=year, month=month, version=version)
+    days = cache.get(key)
+    if days is None:
+        days = build_calendar_days(year, month, user_ids)
+        cache.set(key, days, CALENDAR_CACHE_SECONDS)
+    return days
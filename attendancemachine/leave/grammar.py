@@ -0,0 +1,172 @@
+# leave/grammar.py
+"""
+Grammar correction of half-day leave reasons, off the request path.
+
+    correct_text(text)              cache (GrammarCorrection) → provider
+    ensure_corrected_reason(leave)  stores the result on Leave.corrected_reason
+    correct_pending_reasons()       cron / correct_leave_reasons command:
+                                    leaves of the last PENDING_MAX_AGE only
+
+A leave whose correction failed MAX_ATTEMPTS times keeps its raw reason as
+corrected_reason and is not sent to the provider again. Leaves that existed
+before the feature were backfilled with their raw reason (migration 0014).
+
+The provider is settings.LEAVE_GRAMMAR_PROVIDER (dotted path to a class with
+a correct(text) method); EchoProvider is a local stub for tests and
+development. Requests and decisions never call the provider themselves.
+"""
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import GrammarCorrection, Leave
+
+DEFAULT_PROVIDER = "leave.grammar.OpenRouterProvider"
+DEFAULT_TIMEOUT = 10
+PENDING_BATCH_SIZE = 50
+PENDING_MAX_AGE = timedelta(days=7)
+MAX_ATTEMPTS = 3
+
+# Full-day reasons are fixed choices (personal/family/...), nothing to correct
+CORRECTED_LEAVE_TYPES = ('1st_half', '2nd_half')
+
+
+class EchoProvider:
+    """Returns the text unchanged (no network)."""
+    name = "echo"
+
+    def __init__(self, timeout=None):
+        self.timeout = timeout
+
+    def correct(self, text):
+        return text
+
+
+class OpenRouterProvider:
+    name = "openrouter"
+    model = "meta-llama/llama-3-70b-instruct"
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT):
+        from openai import OpenAI
+
+        self.client = OpenAI(
+            api_key=settings.OPENROUTER_API_KEY,
+            base_url="https://openrouter.ai/api/v1",
+            timeout=timeout,
+            max_retries=1,
+        )
+
+    def correct(self, text):
+        print("🔍 Correcting grammar via OpenRouter...")
+        completion = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {
+                    "role": "user",
+                    "content": f"Correct this sentence without explanation. Only return the corrected sentence:\n{text}"
+                }
+            ],
+            extra_headers={
+                "HTTP-Referer": "http://localhost:8000",  # Optional
+                "X-Title": "AttendanceMachine"             # Optional
+            }
+        )
+        return completion.choices[0].message.content
+
+
+_provider = {"path": None, "instance": None}
+
+
+def get_provider():
+    path = getattr(settings, "LEAVE_GRAMMAR_PROVIDER", DEFAULT_PROVIDER)
+    if _provider["path"] != path:
+        timeout = getattr(settings, "LEAVE_GRAMMAR_TIMEOUT", DEFAULT_TIMEOUT)
+        _provider["instance"] = import_string(path)(timeout=timeout)
+        _provider["path"] = path
+    return _provider["instance"]
+
+
+def text_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def correct_text(text):
+    """
+    Corrected 'text', from the cache when this text was seen before.
+    Provider errors propagate (nothing is cached for them).
+    """
+    text = (text or "").strip()
+    if not text:
+        return text
+
+    key = text_hash(text)
+    cached = GrammarCorrection.objects.filter(text_hash=key).values_list("corrected", flat=True).first()
+    if cached is not None:
+        return cached
+
+    provider = get_provider()
+    corrected = (provider.correct(text) or "").strip() or text
+    print("✅ Corrected sentence:", corrected)
+    GrammarCorrection.objects.bulk_create(
+        [GrammarCorrection(text_hash=key, text=text, corrected=corrected, provider=provider.name)],
+        ignore_conflicts=True,
+    )
+    return corrected
+
+
+def ensure_corrected_reason(leave):
+    """
+    leave.corrected_reason, computed and stored first if needed. If the
+    provider fails the raw reason is returned and the failure counted, so a
+    later run retries; after MAX_ATTEMPTS failures the raw reason is stored.
+    """
+    if leave.corrected_reason is not None:
+        return leave.corrected_reason
+
+    if leave.leave_type not in CORRECTED_LEAVE_TYPES:
+        corrected = leave.reason
+    else:
+        try:
+            corrected = correct_text(leave.reason)
+        except Exception as e:
+            print("❌ Grammar correction failed:", str(e))
+            _record_failure(leave)
+            return leave.reason
+
+    # .update(): no Leave.save validation / signals for a display-only field
+    Leave.objects.filter(pk=leave.pk).update(corrected_reason=corrected)
+    leave.corrected_reason = corrected
+    return corrected
+
+
+def _record_failure(leave):
+    leave.grammar_attempts += 1
+    fields = {"grammar_attempts": leave.grammar_attempts}
+    if leave.grammar_attempts >= MAX_ATTEMPTS:
+        print(f"⚠️ Giving up on grammar correction of leave {leave.pk}, keeping the raw reason")
+        fields["corrected_reason"] = leave.corrected_reason = leave.reason
+    Leave.objects.filter(pk=leave.pk).update(**fields)
+
+
+def correct_pending_reasons(limit=PENDING_BATCH_SIZE, max_age=PENDING_MAX_AGE):
+    """
+    Fill corrected_reason for up to 'limit' leaves created within 'max_age'
+    that are still missing it. Returns how many were corrected.
+    """
+    leaves = list(
+        Leave.objects.filter(corrected_reason__isnull=True, created_at__gte=timezone.now() - max_age)
+        .only("id", "leave_type", "reason", "corrected_reason", "grammar_attempts")
+        .order_by("-id")[:limit]
+    )
+    done = 0
+    for leave in leaves:
+        failures = leave.grammar_attempts
+        ensure_corrected_reason(leave)
+        if leave.grammar_attempts == failures:
+            done += 1
+    if leaves:
+        print(f"[leave.grammar] corrected {done}/{len(leaves)} leave reason(s)")
+    return done
@@ -0,0 +1,39 @@
+# leave/lookups.py
+"""
+`reason__search=`: word search on Leave.reason.
+
+MySQL: MATCH ... AGAINST in boolean mode on the FULLTEXT index created by
+migration 0019 — every word of at least FULLTEXT_MIN_TOKEN characters must
+start a word of the reason ("sick fam" → "+sick* +fam*"). Shorter input,
+and every other backend, falls back to icontains.
+"""
+import re
+
+from django.db.models import Lookup
+from django.db.models.lookups import IContains
+
+FULLTEXT_INDEX_NAME = "leave_reason_ft"
+# InnoDB's default innodb_ft_min_token_size
+FULLTEXT_MIN_TOKEN = 3
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def boolean_terms(text):
+    """'+word*' for every searchable word, or "" when none is long enough."""
+    words = [w for w in _WORD.findall(text or "") if len(w) >= FULLTEXT_MIN_TOKEN]
+    return " ".join(f"+{w}*" for w in words)
+
+
+class FullTextSearch(Lookup):
+    lookup_name = "search"
+
+    def as_sql(self, compiler, connection):
+        return compiler.compile(IContains(self.lhs, self.rhs))
+
+    def as_mysql(self, compiler, connection):
+        terms = boolean_terms(self.rhs)
+        if not terms:
+            return self.as_sql(compiler, connection)
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        return f"MATCH ({lhs}) AGAINST (%s IN BOOLEAN MODE)", (*lhs_params, terms)
@@ -0,0 +1,202 @@
+# leave/mailer.py
+"""
+Outbound mail queue for the leave app.
+
+Views call enqueue_email() (one INSERT) instead of EmailMessage.send().
+send_queued_emails() — run by the per-minute cron job and by the
+send_queued_emails management command — claims due rows, sends them over
+one SMTP connection and records the outcome:
+
+    queued  → sending → sent
+                      → queued again, next_attempt_at pushed back
+                        (RETRY_BASE_SECONDS * 2^(attempts-1), capped)
+                      → failed after MAX_ATTEMPTS
+
+Rows stuck in 'sending' (worker died mid-batch) are picked up again after
+SENDING_TIMEOUT. Rows queued with render_with get their body rendered by
+the worker first (e.g. the leave request mail, which waits for the
+grammar-corrected reason).
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import OutboundEmail
+
+SEND_BATCH_SIZE = 50
+MAX_ATTEMPTS = 6
+RETRY_BASE_SECONDS = 60
+RETRY_MAX_SECONDS = 60 * 60
+SENDING_TIMEOUT = timedelta(minutes=10)
+
+
+def enqueue_email(subject, body, to, from_email=None, kind="", leave_id=None,
+                  render_with="", render_args=None):
+    """
+    Queue one HTML mail. 'to' is an address or a list of addresses.
+    With render_with (dotted path) and an empty body, the worker calls
+    render_with(**render_args) for the body right before sending.
+    Returns the OutboundEmail row, or None when there is no recipient.
+    """
+    row = _outbound(subject, body, to, from_email, kind, leave_id, render_with, render_args)
+    if row is not None:
+        row.save()
+    return row
+
+
+def enqueue_emails(messages):
+    """
+    Queue many mails with one INSERT. 'messages' are dicts of
+    enqueue_email() keyword arguments. Returns the number queued.
+    """
+    rows = [row for row in (_outbound(**m) for m in messages) if row is not None]
+    OutboundEmail.objects.bulk_create(rows, batch_size=500)
+    return len(rows)
+
+
+def _outbound(subject, body, to, from_email=None, kind="", leave_id=None,
+              render_with="", render_args=None):
+    """Unsaved OutboundEmail, or None when there is no recipient."""
+    if isinstance(to, str):
+        to = [to]
+    to = [addr for addr in (to or []) if addr]
+    if not to:
+        return None
+
+    return OutboundEmail(
+        kind=kind,
+        leave_id=leave_id,
+        subject=subject,
+        body=body,
+        from_email=from_email or getattr(settings, "DEFAULT_FROM_EMAIL", "") or "",
+        to=to,
+        render_with=render_with,
+        render_args=render_args or {},
+        next_attempt_at=timezone.now(),
+    )
+
+
+def retry_delay(attempts):
+    """Seconds to wait before attempt number attempts + 1."""
+    return min(RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0), RETRY_MAX_SECONDS)
+
+
+def _claim_batch(now, limit):
+    """
+    Mark up to 'limit' due rows as 'sending' and return them. The conditional
+    UPDATE makes a row belong to exactly one worker even if two overlap.
+    """
+    due = (Q(status="queued", next_attempt_at__lte=now) |
+           Q(status="sending", next_attempt_at__lte=now - SENDING_TIMEOUT))
+    with transaction.atomic():
+        ids = list(OutboundEmail.objects.filter(due).order_by("next_attempt_at", "id")
+                   .values_list("id", flat=True)[:limit])
+        if not ids:
+            return []
+        OutboundEmail.objects.filter(due, id__in=ids).update(status="sending", next_attempt_at=now)
+    return list(OutboundEmail.objects.filter(id__in=ids, status="sending", next_attempt_at=now))
+
+
+def _render(row):
+    """Fill a deferred body. Done before the SMTP connection is opened."""
+    if row.render_with and not row.body:
+        row.body = import_string(row.render_with)(**row.render_args)
+        row.save(update_fields=["body"])
+
+
+def _message(row, connection):
+    msg = EmailMessage(row.subject, row.body, from_email=row.from_email or None,
+                       to=row.to, connection=connection)
+    msg.content_subtype = row.content_subtype or "html"
+    return msg
+
+
+def _record_failure(row, error, now):
+    row.attempts += 1
+    row.last_error = str(error)[:2000]
+    if row.attempts >= MAX_ATTEMPTS:
+        row.status = "failed"
+    else:
+        row.status = "queued"
+        row.next_attempt_at = now + timedelta(seconds=retry_delay(row.attempts))
+    row.save(update_fields=["attempts", "last_error", "status", "next_attempt_at"])
+
+
+def send_queued_emails(limit=SEND_BATCH_SIZE):
+    """
+    Deliver the due part of the queue, SEND_BATCH_SIZE rows per connection,
+    until nothing is due. Returns { sent, retried, failed, ms }.
+    """
+    started = time.monotonic()
+    stats = {"sent": 0, "retried": 0, "failed": 0}
+
+    while True:
+        now = timezone.now()
+        rows = _claim_batch(now, limit)
+        if not rows:
+            break
+
+        ready = []
+        for row in rows:
+            try:
+                _render(row)
+            except Exception as e:
+                _record_failure(row, e, now)
+                stats["failed" if row.status == "failed" else "retried"] += 1
+                print(f"❌ [leave.mailer] #{row.id} could not be rendered: {e}")
+                continue
+            ready.append(row)
+
+        connection = get_connection()
+        try:
+            if ready:
+                connection.open()
+        except Exception as e:
+            # Server unreachable: the whole batch backs off
+            for row in ready:
+                _record_failure(row, e, now)
+                stats["failed" if row.status == "failed" else "retried"] += 1
+            print(f"❌ [leave.mailer] SMTP connection failed: {e}")
+            break
+
+        try:
+            for row in ready:
+                try:
+                    _message(row, connection).send()
+                except Exception as e:
+                    _record_failure(row, e, now)
+                    stats["failed" if row.status == "failed" else "retried"] += 1
+                    print(f"❌ [leave.mailer] #{row.id} to {row.to} failed (attempt {row.attempts}): {e}")
+                    # The connection may be unusable after an SMTP error
+                    connection.close()
+                    try:
+                        connection.open()
+                    except Exception:
+                        pass
+                    continue
+
+                row.status = "sent"
+                row.attempts += 1
+                row.sent_at = timezone.now()
+                row.last_error = ""
+                row.save(update_fields=["status", "attempts", "sent_at", "last_error"])
+                stats["sent"] += 1
+        finally:
+            connection.close()
+
+        if len(rows) < limit:
+            break
+
+    stats["ms"] = round((time.monotonic() - started) * 1000, 1)
+    if stats["sent"] or stats["retried"] or stats["failed"]:
+        print(
+            f"[leave.mailer] {stats['sent']} sent, {stats['retried']} to retry, "
+            f"{stats['failed']} failed, {stats['ms']} ms"
+        )
+    return stats
@@ -0,0 +1,180 @@
+# leave/management/commands/bench_leave_list.py
+import random
+import time as time_mod
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from leave.models import Leave, LeaveDay
+
+HALF_DAY_REASONS = [
+    "doctor appointment", "bank work", "child school meeting",
+    "family function", "passport office", "dentist visit",
+]
+FULL_DAY_REASONS = [code for code, _label in Leave.FULL_DAY_REASONS]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the admin leave list filters (reason / informed_status / date / dates) "
+        "on a synthetic fixture, the old icontains / per-date join filters vs the indexed ones. "
+        "The fixture is committed (InnoDB only applies FULLTEXT changes at commit) as a "
+        "disposable import batch and deleted afterwards; run it against a scratch database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--leaves', type=int, default=100_000)
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--explain', action='store_true', help='Print the query plans')
+
+    def handle(self, *args, **options):
+        batch, prefix = self._build_fixture(options)
+        try:
+            mismatches = self._run(options)
+        finally:
+            self._drop_fixture(batch, prefix)
+
+        if mismatches:
+            raise CommandError(f"Old and new filters disagree on: {', '.join(mismatches)}")
+
+    # -------------------------------------------------
+    # Fixture
+    # -------------------------------------------------
+    def _build_fixture(self, options):
+        rnd = random.Random(options['seed'])
+        prefix = f"bench-{uuid.uuid4().hex[:8]}"
+        batch = uuid.uuid4()
+        t0 = time_mod.perf_counter()
+
+        with transaction.atomic():
+            self._insert_fixture(rnd, prefix, batch, options)
+
+        self.stdout.write(
+            f"Fixture {batch}: {options['leaves']} leaves for {options['users']} users "
+            f"in {time_mod.perf_counter() - t0:.1f} s"
+        )
+        return batch, prefix
+
+    def _insert_fixture(self, rnd, prefix, batch, options):
+        User.objects.bulk_create([User(username=f"{prefix}-{i}") for i in range(options['users'])])
+        user_ids = list(User.objects.filter(username__startswith=prefix).values_list('id', flat=True))
+
+        start = date(2024, 1, 1)
+        leaves = []
+        for _ in range(options['leaves']):
+            first = start + timedelta(days=rnd.randrange(730))
+            if rnd.random() < 0.4:
+                leave_type = rnd.choice(['1st_half', '2nd_half'])
+                reason = rnd.choice(HALF_DAY_REASONS)
+                dates = [first]
+            else:
+                leave_type = 'full_day'
+                reason = rnd.choice(FULL_DAY_REASONS)
+                dates = [first + timedelta(days=i) for i in range(rnd.randint(1, 3))]
+            status = rnd.choice(['approved', 'approved', 'pending', 'rejected'])
+            leaves.append(Leave(
+                user_id=rnd.choice(user_ids),
+                leave_type=leave_type,
+                reason=reason,
+                date=[d.isoformat() for d in dates],
+                start_date=dates[0],
+                end_date=dates[-1],
+                status=status,
+                is_approved=(status == 'approved'),
+                informed_status=rnd.choice(['informed', 'uninformed']),
+                import_batch=batch,
+            ))
+        Leave.objects.bulk_create(leaves, batch_size=2000)
+
+        days = []
+        for leave_id, user_id, leave_type, dates, status in (
+            Leave.objects.filter(import_batch=batch)
+            .values_list('id', 'user_id', 'leave_type', 'date', 'status').iterator(chunk_size=2000)
+        ):
+            unit = Decimal('1.0') if leave_type == 'full_day' else Decimal('0.5')
+            days.extend(
+                LeaveDay(leave_id=leave_id, user_id=user_id, date=date.fromisoformat(d), unit=unit, status=status)
+                for d in dates
+            )
+        LeaveDay.objects.bulk_create(days, batch_size=5000)
+
+    def _drop_fixture(self, batch, prefix):
+        # Plain DELETEs: the fixture never went through the leave signals /
+        # services, so there is nothing (mails, cook records) to undo
+        leave_table = connection.ops.quote_name(Leave._meta.db_table)
+        day_table = connection.ops.quote_name(LeaveDay._meta.db_table)
+        batch_value = Leave._meta.get_field("import_batch").get_db_prep_value(batch, connection)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {day_table} WHERE leave_id IN "
+                f"(SELECT id FROM {leave_table} WHERE import_batch = %s)",
+                [batch_value],
+            )
+            cursor.execute(f"DELETE FROM {leave_table} WHERE import_batch = %s", [batch_value])
+            User.objects.filter(username__startswith=prefix).delete()
+        self.stdout.write(f"Fixture {batch} deleted.")
+
+    # -------------------------------------------------
+    # Filters
+    # -------------------------------------------------
+    def _cases(self):
+        one = date(2025, 3, 12)
+        two = [date(2025, 3, 12), date(2025, 3, 13)]
+
+        legacy_dates = Leave.objects.all()
+        for d in two:
+            legacy_dates = legacy_dates.filter(days__date=d)
+
+        return [
+            ("reason=doctor",
+             Leave.objects.filter(reason__icontains="doctor"),
+             Leave.objects.filter(reason__search="doctor")),
+            # iexact, not the old icontains: "informed" is a substring of
+            # "uninformed", so icontains answered a different question
+            ("informed_status=informed",
+             Leave.objects.filter(informed_status__iexact="informed"),
+             Leave.objects.filter(informed_status="informed")),
+            ("status=approved&informed_status=uninformed",
+             Leave.objects.filter(status="approved", informed_status__iexact="uninformed"),
+             Leave.objects.filter(status="approved", informed_status="uninformed")),
+            (f"date={one}",
+             Leave.objects.filter(days__date=one),
+             Leave.objects.on_date(one)),
+            (f"dates={','.join(d.isoformat() for d in two)}",
+             legacy_dates,
+             Leave.objects.on_all_dates(two)),
+        ]
+
+    def _time(self, qs, repeat):
+        """Best ms for what the list endpoint runs: count + first page."""
+        timings = []
+        for _ in range(repeat):
+            t0 = time_mod.perf_counter()
+            total = qs.count()
+            list(qs.order_by('-created_at').values_list('id', flat=True)[:15])
+            timings.append((time_mod.perf_counter() - t0) * 1000)
+        return min(timings), total
+
+    def _run(self, options):
+        """Prints the timings; returns the labels whose row counts differ."""
+        mismatches = []
+        self.stdout.write(f"{'filter':<45} {'old ms':>9} {'new ms':>9} {'rows':>7}")
+        for label, legacy, indexed in self._cases():
+            old_ms, old_rows = self._time(legacy, options['repeat'])
+            new_ms, new_rows = self._time(indexed, options['repeat'])
+            rows = str(new_rows)
+            if old_rows != new_rows:
+                rows = f"{old_rows}/{new_rows} MISMATCH"
+                mismatches.append(label)
+            self.stdout.write(f"{label:<45} {old_ms:>9.1f} {new_ms:>9.1f} {rows:>7}")
+            if options['explain']:
+                self.stdout.write(f"  new plan ({connection.vendor}):")
+                for line in indexed.order_by('-created_at').explain().splitlines():
+                    self.stdout.write(f"    {line}")
+        return mismatches
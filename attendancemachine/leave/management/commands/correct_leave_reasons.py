@@ -0,0 +1,31 @@
+# leave/management/commands/correct_leave_reasons.py
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from leave.grammar import correct_pending_reasons, PENDING_BATCH_SIZE, PENDING_MAX_AGE
+
+
+class Command(BaseCommand):
+    help = (
+        "Grammar-correct leave reasons that have no corrected_reason yet "
+        "(newest first, leaves of the last --days only). Identical reasons are served from GrammarCorrection "
+        "and never sent to the provider twice. --all repeats until none are left."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=PENDING_BATCH_SIZE,
+                            help=f'Leaves per batch (default {PENDING_BATCH_SIZE})')
+        parser.add_argument('--days', type=int, default=PENDING_MAX_AGE.days,
+                            help=f'Only leaves created in the last N days (default {PENDING_MAX_AGE.days})')
+        parser.add_argument('--all', action='store_true', help='Keep going until every leave is corrected')
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            done = correct_pending_reasons(limit=options['limit'], max_age=timedelta(days=options['days']))
+            total += done
+            # A batch with failures (done < limit) would be retried forever
+            if not options['all'] or done < options['limit']:
+                break
+        self.stdout.write(self.style.SUCCESS(f"Corrected {total} leave reason(s)"))
@@ -0,0 +1,28 @@
+# leave/management/commands/rebuild_leave_ledger.py
+from django.core.management.base import BaseCommand
+
+from leave.services import rebuild_leave_ledger
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute LeaveLedger (approved leave per user and month) from "
+        "LeaveDay. Normally kept up to date on every leave change; use after "
+        "bulk edits or to repair drift."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--year', type=int, help='Only this calendar year')
+        parser.add_argument('--user', type=int, action='append', dest='users',
+                            help='Only this user id (repeatable)')
+
+    def handle(self, *args, **options):
+        written = rebuild_leave_ledger(year=options['year'], user_ids=options['users'])
+        scope = []
+        if options['year']:
+            scope.append(f"year {options['year']}")
+        if options['users']:
+            scope.append(f"user(s) {', '.join(map(str, options['users']))}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt leave ledger ({', '.join(scope) or 'all'}): {written} row(s)"
+        ))
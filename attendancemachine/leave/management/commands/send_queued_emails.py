@@ -0,0 +1,44 @@
+# leave/management/commands/send_queued_emails.py
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, DatabaseError
+
+from leave.mailer import send_queued_emails, SEND_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = (
+        "Deliver queued leave notification mails (leave.OutboundEmail) over "
+        "pooled SMTP connections, retrying failures with backoff. Runs once "
+        "by default (the per-minute cron job does the same); --loop keeps "
+        "polling so mails go out within seconds."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep polling instead of exiting')
+        parser.add_argument('--interval', type=float, default=5, help='Seconds between polls with --loop (default 5)')
+        parser.add_argument('--limit', type=int, default=SEND_BATCH_SIZE,
+                            help=f'Mails per SMTP connection (default {SEND_BATCH_SIZE})')
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                self.poll(options['limit'])
+                if not options['loop']:
+                    return
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write("Stopped.")
+
+    def poll(self, limit):
+        # Long-running process: drop connections the server has timed out
+        close_old_connections()
+        try:
+            stats = send_queued_emails(limit=limit)
+        except DatabaseError as e:
+            self.stderr.write(self.style.ERROR(f"Queue read failed: {e}"))
+            return
+
+        if stats["sent"] or stats["retried"] or stats["failed"]:
+            self.stdout.write(f"{stats['sent']} sent, {stats['retried']} to retry, {stats['failed']} failed")
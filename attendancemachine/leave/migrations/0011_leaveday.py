@@ -0,0 +1,32 @@
+# Generated by Django 5.2.4 on 2026-10-16 23:48
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leave', '0010_alter_leave_status'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaveDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('unit', models.DecimalField(decimal_places=1, max_digits=3)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('approved', 'Approved'), ('rejected', 'Rejected'), ('cancel_pending', 'Cancel Pending'), ('cancelled', 'Cancelled')], max_length=20)),
+                ('leave', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='days', to='leave.leave')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leave_days', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['date'],
+                'indexes': [models.Index(fields=['user', 'date'], name='leave_leave_user_id_87eaeb_idx'), models.Index(fields=['date', 'status'], name='leave_leave_date_bcc4c8_idx')],
+                'constraints': [models.UniqueConstraint(fields=('leave', 'date'), name='uniq_leave_day')],
+            },
+        ),
+    ]
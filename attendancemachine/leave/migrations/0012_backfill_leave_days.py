@@ -0,0 +1,47 @@
+# Expands every existing Leave.date list into LeaveDay rows
+
+from datetime import date as date_cls
+from decimal import Decimal
+
+from django.db import migrations
+
+
+def backfill_leave_days(apps, schema_editor):
+    Leave = apps.get_model("leave", "Leave")
+    LeaveDay = apps.get_model("leave", "LeaveDay")
+
+    batch = []
+    for leave in Leave.objects.only("id", "user_id", "leave_type", "status", "date").iterator(chunk_size=500):
+        raw = leave.date or []
+        if isinstance(raw, str):
+            raw = [raw]
+
+        dates = set()
+        for d in raw:
+            try:
+                dates.add(date_cls.fromisoformat(str(d)))
+            except ValueError:
+                continue
+
+        unit = Decimal("1.0") if leave.leave_type == "full_day" else Decimal("0.5")
+        batch.extend(
+            LeaveDay(leave_id=leave.id, user_id=leave.user_id, date=d, unit=unit, status=leave.status)
+            for d in sorted(dates)
+        )
+        if len(batch) >= 1000:
+            LeaveDay.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+
+    if batch:
+        LeaveDay.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("leave", "0011_leaveday"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_leave_days, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.4 on 2026-10-16 23:55
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_existing_reasons(apps, schema_editor):
+    # Existing leaves keep their reason as is: their mails went out long ago,
+    # and only new leaves are sent to the grammar provider
+    Leave = apps.get_model('leave', 'Leave')
+    Leave.objects.update(corrected_reason=F('reason'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leave', '0013_outboundemail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GrammarCorrection',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('text_hash', models.CharField(max_length=64, unique=True)),
+                ('text', models.TextField()),
+                ('corrected', models.TextField()),
+                ('provider', models.CharField(blank=True, max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='leave',
+            name='corrected_reason',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='outboundemail',
+            name='render_args',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='outboundemail',
+            name='render_with',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='outboundemail',
+            name='body',
+            field=models.TextField(blank=True),
+        ),
+        migrations.RunPython(fill_existing_reasons, migrations.RunPython.noop),
+    ]
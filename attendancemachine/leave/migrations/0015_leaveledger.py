@@ -0,0 +1,34 @@
+# Generated by Django 5.2.4 on 2026-10-16 23:57
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leave', '0014_leave_corrected_reason_grammarcorrection'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaveLedger',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('month', models.PositiveSmallIntegerField()),
+                ('total', models.DecimalField(decimal_places=1, default=0, max_digits=5)),
+                ('informed', models.DecimalField(decimal_places=1, default=0, max_digits=5)),
+                ('uninformed', models.DecimalField(decimal_places=1, default=0, max_digits=5)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leave_ledger', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['user', 'year', 'month'],
+                'indexes': [models.Index(fields=['year', 'month'], name='leave_leave_year_5be8a1_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'year', 'month'), name='uniq_leave_ledger_month')],
+            },
+        ),
+    ]
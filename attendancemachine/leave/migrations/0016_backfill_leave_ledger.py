@@ -0,0 +1,40 @@
+# Fills LeaveLedger from the approved LeaveDay rows
+
+from decimal import Decimal
+
+from django.db import migrations
+from django.db.models import Q, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def backfill_leave_ledger(apps, schema_editor):
+    LeaveDay = apps.get_model("leave", "LeaveDay")
+    LeaveLedger = apps.get_model("leave", "LeaveLedger")
+
+    informed = Q(leave__informed_status__iexact="informed")
+    grouped = (LeaveDay.objects.filter(status="approved")
+               .annotate(y=ExtractYear("date"), m=ExtractMonth("date"))
+               .values("user_id", "y", "m")
+               .annotate(total=Sum("unit"),
+                         informed=Sum("unit", filter=informed),
+                         uninformed=Sum("unit", filter=~informed))
+               .order_by())
+    zero = Decimal("0")
+    LeaveLedger.objects.bulk_create([
+        LeaveLedger(user_id=row["user_id"], year=row["y"], month=row["m"],
+                    total=row["total"] or zero,
+                    informed=row["informed"] or zero,
+                    uninformed=row["uninformed"] or zero)
+        for row in grouped
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("leave", "0015_leaveledger"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_leave_ledger, migrations.RunPython.noop),
+    ]
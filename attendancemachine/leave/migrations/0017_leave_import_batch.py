@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-17 00:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leave', '0016_backfill_leave_ledger'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='leave',
+            name='import_batch',
+            field=models.UUIDField(blank=True, db_index=True, null=True),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.4 on 2026-10-17 00:08
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leave', '0017_leave_import_batch'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='leave',
+            name='end_date',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='leave',
+            name='start_date',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.AlterField(
+            model_name='leave',
+            name='informed_status',
+            field=models.CharField(blank=True, choices=[('informed', 'Informed'), ('uninformed', 'Uninformed')], max_length=50, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='leave',
+            index=models.Index(fields=['user', 'start_date'], name='leave_leave_user_id_fb2a28_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leave',
+            index=models.Index(fields=['start_date', 'end_date'], name='leave_leave_start_d_5dff54_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leave',
+            index=models.Index(fields=['status', 'informed_status'], name='leave_leave_status_413813_idx'),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Fills Leave.start_date / end_date, normalises informed_status to the
+# exact choice values, and adds the FULLTEXT index behind reason__search
+# (MySQL only; other backends search with icontains)
+
+from datetime import date as date_cls
+
+from django.db import migrations
+from django.db.models.functions import Lower, Trim
+
+FULLTEXT_INDEX_NAME = "leave_reason_ft"
+
+
+def backfill_date_bounds(apps, schema_editor):
+    Leave = apps.get_model("leave", "Leave")
+
+    batch = []
+    for leave in Leave.objects.only("id", "date").iterator(chunk_size=1000):
+        raw = leave.date or []
+        if isinstance(raw, str):
+            raw = [raw]
+
+        dates = set()
+        for d in raw:
+            try:
+                dates.add(date_cls.fromisoformat(str(d)))
+            except ValueError:
+                continue
+
+        leave.start_date = min(dates) if dates else None
+        leave.end_date = max(dates) if dates else None
+        batch.append(leave)
+        if len(batch) >= 1000:
+            Leave.objects.bulk_update(batch, ["start_date", "end_date"])
+            batch = []
+
+    if batch:
+        Leave.objects.bulk_update(batch, ["start_date", "end_date"])
+
+
+def normalize_informed_status(apps, schema_editor):
+    Leave = apps.get_model("leave", "Leave")
+
+    Leave.objects.exclude(informed_status__isnull=True).update(informed_status=Lower(Trim("informed_status")))
+    # Anything else never counted as informed (the ledger matched 'informed' only)
+    Leave.objects.exclude(informed_status__isnull=True) \
+        .exclude(informed_status__in=["informed", "uninformed"]).update(informed_status=None)
+
+
+def add_reason_fulltext(apps, schema_editor):
+    if schema_editor.connection.vendor != "mysql":
+        return
+    table = apps.get_model("leave", "Leave")._meta.db_table
+    schema_editor.execute(f"CREATE FULLTEXT INDEX {FULLTEXT_INDEX_NAME} ON {table} (reason)")
+
+
+def drop_reason_fulltext(apps, schema_editor):
+    if schema_editor.connection.vendor != "mysql":
+        return
+    table = apps.get_model("leave", "Leave")._meta.db_table
+    schema_editor.execute(f"DROP INDEX {FULLTEXT_INDEX_NAME} ON {table}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("leave", "0018_leave_date_bounds_and_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_date_bounds, migrations.RunPython.noop),
+        migrations.RunPython(normalize_informed_status, migrations.RunPython.noop),
+        migrations.RunPython(add_reason_fulltext, drop_reason_fulltext),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-17 00:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leave', '0019_backfill_leave_date_bounds'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='leave',
+            name='grammar_attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+    ]
@@ -1,11 +1,59 @@
 # leave/models.py
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from datetime import date as date_cls
 
+from .lookups import FullTextSearch
+
+# Leaves in these states block other leave on the same dates
+ACTIVE_LEAVE_STATUSES = ('pending', 'approved')
+
+
+class LeaveOverlapError(ValidationError):
+    """A pending/approved leave of the same user already covers 'date'."""
+
+    def __init__(self, date):
+        self.date = date
+        super().__init__("Leave already exists on one or more selected dates.")
+
+
+class LeaveQuerySet(models.QuerySet):
+    def with_user(self):
+        """
+        Read model for listings: user and profile joined in, so row.user and
+        row.user.profile cost no extra query per row.
+        """
+        return self.select_related('user', 'user__profile')
+
+    def on_date(self, d):
+        """Leaves that include date d (start/end range first, then LeaveDay)."""
+        return self.filter(
+            start_date__lte=d, end_date__gte=d,
+            id__in=LeaveDay.objects.filter(date=d).values('leave_id'),
+        )
+
+    def on_all_dates(self, dates):
+        """Leaves that include every one of 'dates'."""
+        dates = sorted(set(dates))
+        if not dates:
+            return self
+        covering = (
+            LeaveDay.objects.filter(date__in=dates)
+            .values('leave_id')
+            .annotate(n=models.Count('date'))
+            .filter(n=len(dates))
+            .values('leave_id')
+        )
+        return self.filter(start_date__lte=dates[0], end_date__gte=dates[-1], id__in=covering)
+
 
 class Leave(models.Model):
+    INFORMED_STATUS_CHOICES = [
+        ('informed', 'Informed'),
+        ('uninformed', 'Uninformed'),
+    ]
+
     LEAVE_TYPE_CHOICES = [
         ('full_day', 'Full Day'),
         ('1st_half', 'First Half'),
@@ -32,19 +80,98 @@ class Leave(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='leaves')
     leave_type = models.CharField(max_length=10, choices=LEAVE_TYPE_CHOICES)
     reason = models.CharField(max_length=50)
+    # Grammar-corrected reason (leave.grammar); NULL until computed
+    corrected_reason = models.TextField(null=True, blank=True)
+    # Failed corrections so far; at leave.grammar.MAX_ATTEMPTS the raw
+    # reason is stored as corrected_reason and the leave is not retried
+    grammar_attempts = models.PositiveSmallIntegerField(default=0)
 
     # JSON array of ISO date strings
     date = models.JSONField(default=list, blank=True)
+    # Earliest / latest entry of date (NULL when empty), kept by save()
+    start_date = models.DateField(null=True, blank=True, editable=False)
+    end_date = models.DateField(null=True, blank=True, editable=False)
 
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     is_approved = models.BooleanField(default=False)
 
-    informed_status = models.CharField(max_length=50, null=True, blank=True)
+    informed_status = models.CharField(max_length=50, choices=INFORMED_STATUS_CHOICES, null=True, blank=True)
     email_body = models.TextField(blank=True)
 
+    # Set on leaves created together by the bulk import endpoint
+    import_batch = models.UUIDField(null=True, blank=True, db_index=True)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = LeaveQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'start_date']),
+            models.Index(fields=['start_date', 'end_date']),
+            models.Index(fields=['status', 'informed_status']),
+        ]
+
+    # ------------------------
+    # CHANGE TRACKING
+    # ------------------------
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        loaded = instance.__dict__
+        if all(f in loaded for f in ('user_id', 'status', 'leave_type', 'date', 'informed_status')):
+            instance._loaded_state = instance._date_state()
+        return instance
+
+    def _date_state(self):
+        raw = self.date or []
+        if isinstance(raw, (str, date_cls)):
+            raw = [raw]
+        dates = tuple(sorted({d.isoformat() if isinstance(d, date_cls) else str(d) for d in raw}))
+        return (self.user_id, self.status, self.leave_type, dates, self.informed_status)
+
+    def date_bounds(self):
+        """(earliest, latest) entry of self.date; (None, None) when empty."""
+        dates = self._date_state()[3]
+        if not dates:
+            return None, None
+        return date_cls.fromisoformat(dates[0]), date_cls.fromisoformat(dates[-1])
+
+    def touched_dates(self):
+        """
+        ISO dates the leave covers now plus those it covered when loaded, so a
+        cancel (which empties or shortens self.date) still reaches the
+        dropped days. Valid in post_save: save() moves the loaded state on
+        only after the save signals have run.
+        """
+        dates = set(self._date_state()[3])
+        loaded = getattr(self, '_loaded_state', None)
+        if loaded is not None:
+            dates.update(loaded[3])
+        return sorted(dates)
+
+    def _dates_changed(self):
+        """
+        True unless user, status, type, dates and informed_status (which the
+        LeaveLedger splits on) are as loaded from the DB.
+        """
+        loaded = getattr(self, '_loaded_state', None)
+        return self._state.adding or loaded is None or loaded != self._date_state()
+
+    def _needs_overlap_check(self):
+        """
+        Only an active leave can overlap, and only if it just became active
+        or its user / dates changed (e.g. not when only email_body is saved).
+        """
+        if self.status not in ACTIVE_LEAVE_STATUSES:
+            return False
+        loaded = getattr(self, '_loaded_state', None)
+        if self._state.adding or loaded is None:
+            return True
+        user_id, status, _type, dates, _informed = self._date_state()
+        return (loaded[0], loaded[3]) != (user_id, dates) or loaded[1] not in ACTIVE_LEAVE_STATUSES
+
     # ------------------------
     # VALIDATION LOGIC
     # ------------------------
@@ -93,25 +220,176 @@ class Leave(models.Model):
         if self.leave_type == 'full_day' and self.reason not in dict(self.FULL_DAY_REASONS):
             raise ValidationError("Invalid reason for full-day leave. Use personal/family/sick/paternity/maternity/wedding.")
 
-        # Prevent overlapping leave
-        existing = Leave.objects.filter(
-            user=self.user,
-            status__in=['approved', 'pending']
-        ).exclude(id=self.id)
-
-        for other in existing:
-            other_dates = set(other.date or [])
-            if any(d in other_dates for d in self.date):
-                raise ValidationError("Leave already exists on one or more selected dates.")
+        # Prevent overlapping leave (save() has already checked under its lock)
+        if self._needs_overlap_check() and not getattr(self, '_overlap_checked', False):
+            self.check_overlap()
 
     # ------------------------
     # SAVE OVERRIDE
     # ------------------------
+    def check_overlap(self):
+        """Raise LeaveOverlapError if another active leave of the user shares a date."""
+        from .services import first_overlapping_date
+
+        clash = first_overlapping_date(self.user_id, self.date, exclude_leave_id=self.pk)
+        if clash:
+            raise LeaveOverlapError(clash)
+
     def save(self, *args, **kwargs):
-        self.full_clean()  # applies validation
-        super().save(*args, **kwargs)
+        from .services import sync_leave_days
+
+        with transaction.atomic():
+            if self._needs_overlap_check():
+                # Serialize concurrent submissions for the same user so two
+                # requests can't both pass the overlap check
+                list(User.objects.select_for_update().filter(pk=self.user_id).values_list('pk', flat=True))
+                self.check_overlap()
+                self._overlap_checked = True
+
+            try:
+                self.full_clean()  # applies validation
+            finally:
+                self._overlap_checked = False
+
+            self.start_date, self.end_date = self.date_bounds()
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'date' in update_fields:
+                kwargs['update_fields'] = {*update_fields, 'start_date', 'end_date'}
+            super().save(*args, **kwargs)
+
+            if self._dates_changed():
+                sync_leave_days(self)
+                self._loaded_state = self._date_state()
 
     def __str__(self):
         sample = ", ".join(self.date[:3])
         suffix = "..." if len(self.date) > 3 else ""
         return f"{self.user.username} - {self.get_leave_type_display()} - [{sample}{suffix}] - {self.get_status_display()}"
+
+
+# reason__search= (FULLTEXT on MySQL, see leave/lookups.py)
+Leave._meta.get_field('reason').register_lookup(FullTextSearch)
+
+
+class LeaveDay(models.Model):
+    """
+    One row per date of a Leave (Leave.date expanded), so date lookups are
+    indexed range queries instead of JSON scans.
+
+    Kept in sync by leave.services.sync_leave_days (Leave.save and the flows
+    that change a leave with .update()). unit: 1.0 full day, 0.5 half day.
+    status mirrors Leave.status.
+    """
+
+    leave = models.ForeignKey(Leave, on_delete=models.CASCADE, related_name='days')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='leave_days')
+    date = models.DateField()
+    unit = models.DecimalField(max_digits=3, decimal_places=1)
+    status = models.CharField(max_length=20, choices=Leave.STATUS_CHOICES)
+
+    class Meta:
+        ordering = ['date']
+        constraints = [
+            models.UniqueConstraint(fields=['leave', 'date'], name='uniq_leave_day'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'date']),
+            models.Index(fields=['date', 'status']),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} @ {self.date} ({self.unit}, {self.status})"
+
+
+
+class LeaveLedger(models.Model):
+    """
+    Approved leave per user and calendar month (sum of LeaveDay.unit), split
+    by the leave's informed_status. Only months with leave have a row.
+
+    Maintained by leave.services.recompute_ledger whenever a leave's days are
+    synced (approve / reject / cancel / admin cancel / edits), in the same
+    transaction; `manage.py rebuild_leave_ledger` recomputes it from LeaveDay.
+    """
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='leave_ledger')
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    total = models.DecimalField(max_digits=5, decimal_places=1, default=0)
+    informed = models.DecimalField(max_digits=5, decimal_places=1, default=0)
+    uninformed = models.DecimalField(max_digits=5, decimal_places=1, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['user', 'year', 'month']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'year', 'month'], name='uniq_leave_ledger_month'),
+        ]
+        indexes = [
+            models.Index(fields=['year', 'month']),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.year}-{self.month:02d}: {self.total}"
+
+class OutboundEmail(models.Model):
+    """
+    Mail queued by the leave APIs (leave.mailer.enqueue_email) and delivered
+    by the send_queued_emails worker, so requests never wait on SMTP.
+
+    Failed sends are retried with exponential backoff (next_attempt_at) until
+    MAX_ATTEMPTS, then the row stays 'failed' with the last error.
+    """
+
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=50, blank=True)   # e.g. 'leave_request', 'leave_decision'
+    leave = models.ForeignKey(Leave, on_delete=models.SET_NULL, null=True, blank=True, related_name='emails')
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField(blank=True)
+    # Optional deferred body: dotted path of a function called with
+    # **render_args by the worker right before sending (blank body only)
+    render_with = models.CharField(max_length=255, blank=True)
+    render_args = models.JSONField(default=dict, blank=True)
+    content_subtype = models.CharField(max_length=10, default='html')
+    from_email = models.CharField(max_length=255, blank=True)
+    to = models.JSONField(default=list)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField()
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.kind or 'email'} → {', '.join(self.to)} ({self.status})"
+
+
+class GrammarCorrection(models.Model):
+    """
+    Provider output per distinct reason text (sha256 of the stripped text),
+    so the same reason is never sent to the grammar provider twice.
+    """
+
+    text_hash = models.CharField(max_length=64, unique=True)
+    text = models.TextField()
+    corrected = models.TextField()
+    provider = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.text[:40]} → {self.corrected[:40]}"
@@ -0,0 +1,84 @@
+# leave/notifications.py
+"""
+Mails sent when a leave is approved or rejected, as enqueue_email() kwargs,
+shared by the single (LeaveDecisionView) and bulk decision endpoints.
+"""
+from datetime import date as date_cls
+from types import SimpleNamespace
+
+from django.template.loader import render_to_string
+
+from member.graph import get_team_graph
+
+ADMIN_EMAIL = "faisal@ampec.com.au"
+LEAVE_TYPE_DISPLAY = {"full_day": "Full Day", "1st_half": "First Half", "2nd_half": "Second Half"}
+
+
+def informed_status_for(dates, created_date):
+    """'informed' when the earliest leave date is 3+ days after created_date."""
+    try:
+        earliest = min(date_cls.fromisoformat(str(d)) for d in dates)
+        return "informed" if (earliest - created_date).days >= 3 else "uninformed"
+    except Exception:
+        return "uninformed"
+
+
+def decision_leave(leave_id, leave_type, reason, status, informed_status, dates, email_body=""):
+    """The 'leave' object the decision templates expect."""
+    return SimpleNamespace(
+        id=leave_id,
+        leave_type=leave_type,
+        reason=reason,
+        status=status,
+        is_approved=(status == "approved"),
+        email_body=email_body,
+        informed_status=informed_status,
+        date=dates,
+        get_leave_type_display=LEAVE_TYPE_DISPLAY.get(leave_type, leave_type),
+    )
+
+
+def team_emails_for(user_ids):
+    """{ user_id: [member emails] } for the users' assigned members (team graph)."""
+    graph = get_team_graph()
+    return {user_id: graph.member_emails(user_id) for user_id in user_ids}
+
+
+def decision_messages(user, leave_ns, action, corrected_reason, team_emails):
+    """
+    enqueue_email() kwargs for one decision: requester, admin, and the
+    team notice on approval (when the user has team emails).
+    """
+    display_name = (user.get_full_name() or user.username)
+    reason = corrected_reason or leave_ns.reason or ""
+    messages = [
+        dict(
+            subject=f"Your Leave Request Has Been {leave_ns.status.upper()}",
+            body=render_to_string("leave/leave_decision_email.html", {
+                "user": user, "leave": leave_ns, "corrected_reason": corrected_reason,
+            }),
+            to=[user.email],
+            kind="leave_decision",
+            leave_id=leave_ns.id,
+        ),
+        dict(
+            subject=f"You have {action}ed a leave request",
+            body=render_to_string("leave/admin_decision_email.html", {
+                "action": action, "display_name": display_name, "leave": leave_ns, "reason": reason,
+            }),
+            to=[ADMIN_EMAIL],
+            kind="leave_decision_admin",
+            leave_id=leave_ns.id,
+        ),
+    ]
+    if leave_ns.status == "approved" and team_emails:
+        messages.append(dict(
+            subject=f"Team Notice: {display_name}'s leave ({leave_ns.get_leave_type_display})",
+            body=render_to_string("leave/team_leave_notice.html", {
+                "display_name": display_name, "leave": leave_ns, "dates": leave_ns.date, "reason": reason,
+            }),
+            to=team_emails,
+            kind="leave_team_notice",
+            leave_id=leave_ns.id,
+        ))
+    return messages
@@ -1,7 +1,7 @@
 # leave/serializers.py
 from rest_framework import serializers
 from datetime import date as date_cls
-from .models import Leave
+from .models import Leave, LeaveOverlapError
 
 class LeaveSerializer(serializers.ModelSerializer):
     class Meta:
@@ -15,7 +15,6 @@ class LeaveSerializer(serializers.ModelSerializer):
         read_only_fields = ['status', 'email_body', 'created_at']
 
     def validate(self, data):
-        user = self.context['request'].user
         leave_type = data.get('leave_type')
         reason = data.get('reason')
         dates = data.get('date')
@@ -49,25 +48,18 @@ class LeaveSerializer(serializers.ModelSerializer):
         if leave_type == 'full_day' and reason not in dict(Leave.FULL_DAY_REASONS):
             raise serializers.ValidationError({"reason": "Invalid reason for full-day (personal/family/sick)."})
 
-        # Overlap check with pending/approved leaves (any shared date)
-        existing = Leave.objects.filter(
-            user=user,
-            status__in=['approved', 'pending']
-        ).exclude(id=self.instance.id if self.instance else None)
-
-        for other in existing:
-            if any(d in (other.date or []) for d in norm):
-                # (Optional: allow combining 1st_half + 2nd_half same day — uncomment next block to allow)
-                # if (leave_type in ('1st_half', '2nd_half') and len(norm) == 1 and
-                #     other.date and len(other.date) == 1 and
-                #     norm[0] == other.date[0] and
-                #     {leave_type, other.leave_type} == {'1st_half', '2nd_half'}):
-                #     continue
-                raise serializers.ValidationError({"date": "Overlaps with an existing leave."})
+        # Overlap with pending/approved leaves is checked by Leave.save
+        # (one indexed query, under a per-user lock) and surfaced in create()
 
         data['date'] = norm
         return data
 
+    def create(self, validated_data):
+        try:
+            return super().create(validated_data)
+        except LeaveOverlapError:
+            raise serializers.ValidationError({"date": ["Overlaps with an existing leave."]})
+
 
 class LeaveListSerializer(serializers.ModelSerializer):
     user = serializers.SerializerMethodField()
@@ -0,0 +1,188 @@
+# leave/services.py
+from datetime import date as date_cls
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+from mealreport.services import mark_cook_dates_dirty
+from .calendar_cache import invalidate_leave_calendar
+from .models import ACTIVE_LEAVE_STATUSES, Leave, LeaveDay, LeaveLedger
+
+FULL_DAY_UNIT = Decimal("1.0")
+HALF_DAY_UNIT = Decimal("0.5")
+
+
+def leave_unit(leave_type):
+    return FULL_DAY_UNIT if leave_type == 'full_day' else HALF_DAY_UNIT
+
+
+def leave_dates(raw):
+    """
+    Leave.date (JSON list of ISO strings, or a single string) as a sorted list
+    of dates; invalid entries are skipped.
+    """
+    if not raw:
+        return []
+    if isinstance(raw, (str, date_cls)):
+        raw = [raw]
+
+    out = set()
+    for d in raw:
+        if isinstance(d, date_cls):
+            out.add(d)
+            continue
+        try:
+            out.add(date_cls.fromisoformat(str(d)))
+        except ValueError:
+            continue
+    return sorted(out)
+
+
+def first_overlapping_date(user_id, dates, exclude_leave_id=None):
+    """
+    Earliest of 'dates' already covered by a pending/approved leave of the
+    user (other than exclude_leave_id), or None. One indexed query.
+    """
+    dates = leave_dates(dates)
+    if not dates:
+        return None
+    qs = LeaveDay.objects.filter(user_id=user_id, status__in=ACTIVE_LEAVE_STATUSES, date__in=dates)
+    if exclude_leave_id is not None:
+        qs = qs.exclude(leave_id=exclude_leave_id)
+    return qs.order_by('date').values_list('date', flat=True).first()
+
+
+def sync_leave_days(leave):
+    """
+    Make the LeaveDay rows of 'leave' match its date list, type, status and user.
+    """
+    wanted = set(leave_dates(leave.date))
+    unit = leave_unit(leave.leave_type)
+
+    with transaction.atomic():
+        days = LeaveDay.objects.filter(leave_id=leave.pk)
+        existing_rows = list(days.values_list('date', 'user_id', 'status'))
+        existing = {d for d, _, _ in existing_rows}
+
+        removed = existing - wanted
+        if removed:
+            days.filter(date__in=removed).delete()
+
+        if existing & wanted:
+            (days.exclude(user_id=leave.user_id, unit=unit, status=leave.status)
+                 .update(user_id=leave.user_id, unit=unit, status=leave.status))
+
+        added = wanted - existing
+        if added:
+            LeaveDay.objects.bulk_create([
+                LeaveDay(leave_id=leave.pk, user_id=leave.user_id, date=d, unit=unit, status=leave.status)
+                for d in sorted(added)
+            ])
+
+        # Ledger / calendar: every month where this leave counted (approved)
+        # before or after
+        touched = {}
+        for d, user_id, status in existing_rows:
+            if status == 'approved':
+                touched.setdefault(user_id, set()).add((d.year, d.month))
+        if leave.status == 'approved':
+            touched.setdefault(leave.user_id, set()).update((d.year, d.month) for d in wanted)
+        for user_id, months in touched.items():
+            recompute_ledger(user_id, months)
+
+        if touched:
+            months = set().union(*touched.values())
+            transaction.on_commit(lambda: invalidate_leave_calendar(months))
+
+        # Meal report counts pending and approved leave on each date
+        mark_cook_dates_dirty(existing | wanted)
+
+
+def sync_leave_days_for(leave_ids):
+    """
+    Re-sync after changing leaves with queryset.update() (which skips save()).
+    """
+    for leave in Leave.objects.filter(pk__in=list(leave_ids)):
+        sync_leave_days(leave)
+
+
+# ------------------------
+# LEAVE LEDGER
+# ------------------------
+
+def _ledger_rows(day_qs):
+    """
+    LeaveLedger objects (unsaved) from approved LeaveDay rows of 'day_qs',
+    one per (user, year, month).
+    """
+    informed = Q(leave__informed_status='informed')
+    grouped = (day_qs.filter(status='approved')
+               .annotate(y=ExtractYear('date'), m=ExtractMonth('date'))
+               .values('user_id', 'y', 'm')
+               .annotate(total=Sum('unit'),
+                         informed=Sum('unit', filter=informed),
+                         uninformed=Sum('unit', filter=~informed))
+               .order_by())
+    zero = Decimal("0")
+    return [
+        LeaveLedger(user_id=row['user_id'], year=row['y'], month=row['m'],
+                    total=row['total'] or zero,
+                    informed=row['informed'] or zero,
+                    uninformed=row['uninformed'] or zero)
+        for row in grouped
+    ]
+
+
+def _month_range(year, month):
+    start = date_cls(year, month, 1)
+    end = date_cls(year + 1, 1, 1) if month == 12 else date_cls(year, month + 1, 1)
+    return start, end
+
+
+def recompute_ledger(user_id, months):
+    """
+    Re-aggregate the user's LeaveLedger rows for 'months' [(year, month)]
+    from LeaveDay. The user row is locked so concurrent syncs of the same
+    user's leaves apply one after the other.
+    """
+    months = set(months)
+    if not months:
+        return
+
+    with transaction.atomic():
+        list(get_user_model().objects.select_for_update().filter(pk=user_id).values_list('pk', flat=True))
+
+        in_months = Q()
+        for year, month in months:
+            start, end = _month_range(year, month)
+            in_months |= Q(date__gte=start, date__lt=end)
+        rows = _ledger_rows(LeaveDay.objects.filter(in_months, user_id=user_id))
+
+        ledger_months = Q()
+        for year, month in months:
+            ledger_months |= Q(year=year, month=month)
+        LeaveLedger.objects.filter(ledger_months, user_id=user_id).delete()
+        LeaveLedger.objects.bulk_create(rows)
+
+
+def rebuild_leave_ledger(year=None, user_ids=None):
+    """
+    Recompute LeaveLedger from LeaveDay, for one year and/or some users or
+    everything. Returns the number of ledger rows written.
+    """
+    days = LeaveDay.objects.all()
+    ledger = LeaveLedger.objects.all()
+    if year is not None:
+        days = days.filter(date__gte=date_cls(year, 1, 1), date__lt=date_cls(year + 1, 1, 1))
+        ledger = ledger.filter(year=year)
+    if user_ids is not None:
+        days = days.filter(user_id__in=list(user_ids))
+        ledger = ledger.filter(user_id__in=list(user_ids))
+
+    with transaction.atomic():
+        ledger.delete()
+        rows = LeaveLedger.objects.bulk_create(_ledger_rows(days), batch_size=1000)
+    return len(rows)
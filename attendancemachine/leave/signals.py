@@ -0,0 +1,26 @@
+# leave/signals.py
+from django.db import transaction
+from django.db.models.signals import post_delete, pre_delete
+from django.dispatch import receiver
+
+from .calendar_cache import invalidate_leave_calendar
+from .models import Leave, LeaveDay
+from .services import recompute_ledger
+
+
+@receiver(pre_delete, sender=Leave)
+def remember_approved_months(sender, instance, **kwargs):
+    # The LeaveDay rows are gone (CASCADE) by post_delete
+    instance._approved_months = {
+        (d.year, d.month)
+        for d in LeaveDay.objects.filter(leave_id=instance.pk, status='approved').values_list('date', flat=True)
+    }
+
+
+@receiver(post_delete, sender=Leave)
+def drop_deleted_leave_from_ledger(sender, instance, **kwargs):
+    months = getattr(instance, '_approved_months', None)
+    if months:
+        recompute_ledger(instance.user_id, months)
+        transaction.on_commit(lambda: invalidate_leave_calendar(months))
+
@@ -1,3 +1,533 @@
-from django.test import TestCase
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from member.models import Member, MemberAssignment
+from . import mailer
+from .grammar import MAX_ATTEMPTS, correct_pending_reasons
+from .models import GrammarCorrection, Leave, LeaveDay, LeaveLedger, LeaveOverlapError, OutboundEmail
+from .services import first_overlapping_date, rebuild_leave_ledger, sync_leave_days_for
+
+
+# -------------------------------------------------
+# Query budgets of the leave read endpoints
+# -------------------------------------------------
+# Every row is served from Leave.objects.with_user() (user + profile joined),
+# the employee directory and the team graph, so the number of queries must
+# not depend on how many rows a page holds. Each endpoint is called at two
+# page sizes over the same fixture and must stay at the same fixed budget.
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class LeaveQueryBudgetTests(TestCase):
+    LEAVES = 12
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = cls._user("frahman", "00")
+        cls.member = cls._user("member", "100")
+        team = Member.objects.create(name="Team", email="team@example.com")
+        MemberAssignment.objects.create(user=cls.member, member=team)
+
+        today = timezone.localdate()
+        for i in range(cls.LEAVES):
+            u = cls._user(f"user{i}", str(200 + i))
+            MemberAssignment.objects.create(user=u, member=team)
+            day = today + timedelta(days=i + 3)
+            Leave.objects.create(
+                user=u, leave_type="full_day", reason="sick",
+                date=[day.isoformat()], status="approved", is_approved=True,
+            )
+
+    @staticmethod
+    def _user(username, emp_code):
+        u = User.objects.create_user(username, f"{username}@example.com", "pw", first_name=username.title())
+        u.profile.emp_code = emp_code
+        u.profile.save()
+        return u
+
+    def assertBudget(self, user, url, budget, **params):
+        client = APIClient()
+        client.force_authenticate(user)
+        for per_page in (2, self.LEAVES):
+            # Cold caches: directory, team graph and calendar are loaded too
+            cache.clear()
+            with self.assertNumQueries(budget):
+                response = client.get(url, {**params, "per_page": per_page})
+            self.assertEqual(response.status_code, 200, response.content)
+        return response
+
+    def test_team_approved_budget(self):
+        response = self.assertBudget(self.member, "/api/leave/team-approved/", 5)
+        self.assertEqual(response.data["pagination"]["total"], self.LEAVES)
+
+    def test_leave_list_budget(self):
+        response = self.assertBudget(self.admin, "/api/leave/list/", 2)
+        self.assertEqual(len(response.data["results"]), self.LEAVES)
+
+    def test_upcoming_budget(self):
+        response = self.assertBudget(self.admin, "/api/leave/upcoming-leaves/", 2)
+        self.assertEqual(len(response.data["upcoming"]), self.LEAVES)
+
+    def test_calendar_budget(self):
+        month = (timezone.localdate() + timedelta(days=3)).strftime("%Y-%m")
+        self.assertBudget(self.member, "/api/leave/calendar/", 4, month=month)
+
+
+# -------------------------------------------------
+# Grammar correction cron
+# -------------------------------------------------
+class CountingProvider:
+    name = "counting"
+    calls = []
+    fail = False
+
+    def __init__(self, timeout=None):
+        pass
+
+    def correct(self, text):
+        CountingProvider.calls.append(text)
+        if CountingProvider.fail:
+            raise TimeoutError("provider timed out")
+        return text.capitalize() + "."
+
+
+@override_settings(LEAVE_GRAMMAR_PROVIDER="leave.tests.CountingProvider")
+class GrammarCorrectionTests(TestCase):
+    def setUp(self):
+        CountingProvider.calls = []
+        CountingProvider.fail = False
+        self.user = User.objects.create_user("ann", "ann@example.com", "pw")
+
+    def _leave(self, reason, day="2025-03-10"):
+        return Leave.objects.create(user=self.user, leave_type="1st_half", reason=reason,
+                                    date=[day], status="pending")
+
+    def test_identical_reasons_reach_the_provider_once(self):
+        a = self._leave("bank work")
+        b = self._leave("bank work", day="2025-03-11")
+        self.assertEqual(correct_pending_reasons(), 2)
+        self.assertEqual(CountingProvider.calls, ["bank work"])
+        a.refresh_from_db()
+        b.refresh_from_db()
+        self.assertEqual((a.corrected_reason, b.corrected_reason), ("Bank work.", "Bank work."))
+        self.assertEqual(GrammarCorrection.objects.count(), 1)
+
+    def test_old_leaves_are_left_alone(self):
+        old = self._leave("dentist")
+        Leave.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=30))
+        self.assertEqual(correct_pending_reasons(), 0)
+        self.assertEqual(CountingProvider.calls, [])
+
+    def test_failures_stop_after_max_attempts(self):
+        CountingProvider.fail = True
+        leave = self._leave("passport ofice")
+        for _ in range(MAX_ATTEMPTS + 2):
+            correct_pending_reasons()
+        self.assertEqual(len(CountingProvider.calls), MAX_ATTEMPTS)
+
+        leave.refresh_from_db()
+        self.assertEqual(leave.grammar_attempts, MAX_ATTEMPTS)
+        self.assertEqual(leave.corrected_reason, "passport ofice")
+
+
+# -------------------------------------------------
+# LeaveDay rows
+# -------------------------------------------------
+class LeaveDaySyncTests(TestCase):
+    MON, TUE, WED = date(2025, 3, 10), date(2025, 3, 11), date(2025, 3, 12)
+
+    def setUp(self):
+        self.ann = User.objects.create_user("ann", "ann@example.com", "pw")
+        self.bob = User.objects.create_user("bob", "bob@example.com", "pw")
+
+    def days(self, leave):
+        return list(LeaveDay.objects.filter(leave=leave).values_list("date", "user_id", "unit", "status"))
+
+    def test_rows_follow_the_leave(self):
+        leave = Leave.objects.create(user=self.ann, leave_type="full_day", reason="sick",
+                                     date=[self.TUE.isoformat(), self.MON.isoformat()], status="pending")
+        self.assertEqual(self.days(leave), [
+            (self.MON, self.ann.pk, 1, "pending"), (self.TUE, self.ann.pk, 1, "pending"),
+        ])
+        self.assertEqual((leave.start_date, leave.end_date), (self.MON, self.TUE))
+
+        leave.date = [self.TUE.isoformat(), self.WED.isoformat()]
+        leave.status = "approved"
+        leave.user = self.bob
+        leave.save()
+        self.assertEqual(self.days(leave), [
+            (self.TUE, self.bob.pk, 1, "approved"), (self.WED, self.bob.pk, 1, "approved"),
+        ])
+
+    def test_half_day_counts_half(self):
+        leave = Leave.objects.create(user=self.ann, leave_type="2nd_half", reason="bank",
+                                     date=[self.MON.isoformat()], status="approved")
+        self.assertEqual(self.days(leave), [(self.MON, self.ann.pk, 0.5, "approved")])
+
+    def test_updates_then_sync(self):
+        leave = Leave.objects.create(user=self.ann, leave_type="full_day", reason="sick",
+                                     date=[self.MON.isoformat()], status="pending")
+        Leave.objects.filter(pk=leave.pk).update(status="rejected")
+        sync_leave_days_for([leave.pk])
+        self.assertEqual(self.days(leave)[0][3], "rejected")
+
+    def test_date_lookups(self):
+        both = Leave.objects.create(user=self.ann, leave_type="full_day", reason="sick",
+                                    date=[self.MON.isoformat(), self.WED.isoformat()], status="approved")
+        tue = Leave.objects.create(user=self.bob, leave_type="full_day", reason="sick",
+                                   date=[self.TUE.isoformat()], status="approved")
+
+        self.assertEqual(list(Leave.objects.on_date(self.TUE)), [tue])
+        self.assertEqual(list(Leave.objects.on_date(self.MON)), [both])
+        # MON..WED bounds cover Tuesday, but the leave has no row for it
+        self.assertEqual(list(Leave.objects.on_all_dates([self.MON, self.WED])), [both])
+        self.assertEqual(list(Leave.objects.on_all_dates([self.MON, self.TUE])), [])
+
+
+# -------------------------------------------------
+# Overlap check
+# -------------------------------------------------
+class LeaveOverlapTests(TestCase):
+    MON, TUE, WED = "2025-03-10", "2025-03-11", "2025-03-12"
+
+    def setUp(self):
+        self.ann = User.objects.create_user("ann", "ann@example.com", "pw")
+        self.leave = self._leave([self.TUE, self.WED])
+
+    def _leave(self, dates, status="pending", user=None):
+        return Leave.objects.create(user=user or self.ann, leave_type="full_day", reason="sick",
+                                    date=dates, status=status)
+
+    def test_first_overlapping_date(self):
+        self.assertEqual(first_overlapping_date(self.ann.pk, [self.WED, self.MON, self.TUE]), date(2025, 3, 11))
+        self.assertIsNone(first_overlapping_date(self.ann.pk, [self.MON]))
+        self.assertIsNone(first_overlapping_date(self.ann.pk, [self.TUE], exclude_leave_id=self.leave.pk))
+        self.assertIsNone(first_overlapping_date(self.ann.pk, []))
+
+    def test_overlapping_leave_is_refused(self):
+        with self.assertRaises(LeaveOverlapError) as ctx:
+            self._leave([self.MON, self.WED])
+        self.assertEqual(ctx.exception.date, date(2025, 3, 12))
+
+        # Another user, or a rejected leave, does not clash
+        self._leave([self.WED], user=User.objects.create_user("bob", "bob@example.com", "pw"))
+        self._leave([self.WED], status="rejected")
+
+    def test_reactivating_a_leave_is_checked(self):
+        Leave.objects.filter(pk=self.leave.pk).update(status="rejected")
+        sync_leave_days_for([self.leave.pk])
+        self._leave([self.WED])
+
+        leave = Leave.objects.get(pk=self.leave.pk)
+        leave.status = "pending"
+        with self.assertRaises(LeaveOverlapError):
+            leave.save()
+
+    def test_unrelated_edit_skips_the_check(self):
+        leave = Leave.objects.get(pk=self.leave.pk)
+        leave.email_body = "sent"
+        with mock.patch("leave.services.first_overlapping_date") as check:
+            leave.save()
+        check.assert_not_called()
+
+    def test_manual_create_reports_the_clash(self):
+        admin = User.objects.create_user("frahman", "frahman@example.com", "pw")
+        client = APIClient()
+        client.force_authenticate(admin)
+        response = client.post("/api/leave/manual/", {
+            "user_id": self.ann.pk, "leave_type": "full_day", "reason": "sick", "date": [self.MON, self.TUE],
+        }, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("2025-03-11", response.data["non_field_errors"][0])
+        self.assertEqual(Leave.objects.filter(user=self.ann).count(), 1)
+
+
+# -------------------------------------------------
+# Outbound mail queue
+# -------------------------------------------------
+def render_body(name):
+    return f"<p>Hello {name}</p>"
+
+
+class MailerTests(TestCase):
+    START = datetime(2025, 3, 10, 9, 0, tzinfo=dt_timezone.utc)
+
+    def setUp(self):
+        self.now = self.START
+        clock = mock.patch("django.utils.timezone.now", side_effect=lambda: self.now)
+        clock.start()
+        self.addCleanup(clock.stop)
+
+    def advance(self, seconds):
+        self.now += timedelta(seconds=seconds)
+
+    def failing_smtp(self):
+        return mock.patch("django.core.mail.backends.locmem.EmailBackend.send_messages",
+                          side_effect=ConnectionError("421 try again later"))
+
+    def test_queued_mail_is_sent_once(self):
+        self.assertIsNone(mailer.enqueue_email("Hi", "<p>x</p>", [""]))
+        row = mailer.enqueue_email("Hi", "<p>x</p>", "ann@example.com", kind="leave_request")
+
+        self.assertEqual(mailer.send_queued_emails()["sent"], 1)
+        self.assertEqual(mailer.send_queued_emails()["sent"], 0)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual((mail.outbox[0].to, mail.outbox[0].content_subtype), (["ann@example.com"], "html"))
+        row.refresh_from_db()
+        self.assertEqual((row.status, row.attempts, row.sent_at), ("sent", 1, self.START))
+
+    def test_deferred_body_is_rendered_by_the_worker(self):
+        mailer.enqueue_email("Hi", "", "ann@example.com",
+                             render_with="leave.tests.render_body", render_args={"name": "Ann"})
+        mailer.send_queued_emails()
+        self.assertEqual(mail.outbox[0].body, "<p>Hello Ann</p>")
+
+    def test_retry_backoff(self):
+        self.assertEqual([mailer.retry_delay(n) for n in (1, 2, 3, 7, 20)], [60, 120, 240, 3600, 3600])
+
+        row = mailer.enqueue_email("Hi", "<p>x</p>", "ann@example.com")
+        with self.failing_smtp():
+            self.assertEqual(mailer.send_queued_emails()["retried"], 1)
+        row.refresh_from_db()
+        self.assertEqual((row.status, row.attempts), ("queued", 1))
+        self.assertEqual(row.next_attempt_at, self.START + timedelta(seconds=60))
+        self.assertIn("421", row.last_error)
+
+        # Not due yet
+        self.advance(59)
+        self.assertEqual(mailer.send_queued_emails()["sent"], 0)
+        self.advance(1)
+        self.assertEqual(mailer.send_queued_emails()["sent"], 1)
+
+    def test_gives_up_after_max_attempts(self):
+        row = mailer.enqueue_email("Hi", "<p>x</p>", "ann@example.com")
+        with self.failing_smtp():
+            for _ in range(mailer.MAX_ATTEMPTS + 1):
+                mailer.send_queued_emails()
+                self.advance(mailer.RETRY_MAX_SECONDS)
+        row.refresh_from_db()
+        self.assertEqual((row.status, row.attempts), ("failed", mailer.MAX_ATTEMPTS))
+        self.assertEqual(mailer.send_queued_emails()["sent"], 0)
+
+    def test_rows_stuck_in_sending_are_picked_up_again(self):
+        row = mailer.enqueue_email("Hi", "<p>x</p>", "ann@example.com")
+        OutboundEmail.objects.filter(pk=row.pk).update(status="sending")
+
+        self.assertEqual(mailer.send_queued_emails()["sent"], 0)
+        self.advance(mailer.SENDING_TIMEOUT.total_seconds())
+        self.assertEqual(mailer.send_queued_emails()["sent"], 1)
+
+
+# -------------------------------------------------
+# Leave ledger
+# -------------------------------------------------
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class LeaveLedgerTests(TestCase):
+    def setUp(self):
+        self.ann = User.objects.create_user("ann", "ann@example.com", "pw")
+        # Spans March / April
+        self.leave = Leave.objects.create(user=self.ann, leave_type="full_day", reason="sick",
+                                          date=["2025-03-31", "2025-04-01"], status="approved",
+                                          informed_status="informed")
+        Leave.objects.create(user=self.ann, leave_type="1st_half", reason="bank",
+                             date=["2025-03-05"], status="approved", informed_status="uninformed")
+        Leave.objects.create(user=self.ann, leave_type="full_day", reason="sick",
+                             date=["2025-03-20"], status="pending")
+
+    def ledger(self):
+        return [
+            (m, float(total), float(informed), float(uninformed))
+            for m, total, informed, uninformed in
+            LeaveLedger.objects.filter(user=self.ann, year=2025)
+            .values_list("month", "total", "informed", "uninformed")
+        ]
+
+    def test_approved_days_are_counted_per_month(self):
+        self.assertEqual(self.ledger(), [(3, 1.5, 1.0, 0.5), (4, 1.0, 1.0, 0.0)])
+
+    def test_edits_recompute_the_touched_months(self):
+        self.leave.informed_status = "uninformed"
+        self.leave.save()
+        self.assertEqual(self.ledger(), [(3, 1.5, 0.0, 1.5), (4, 1.0, 0.0, 1.0)])
+
+        self.leave.date = ["2025-03-31"]
+        self.leave.save()
+        self.assertEqual(self.ledger(), [(3, 1.5, 0.0, 1.5)])
+
+        self.leave.status = "rejected"
+        self.leave.save()
+        self.assertEqual(self.ledger(), [(3, 0.5, 0.0, 0.5)])
+
+    def test_rebuild_matches_the_incremental_ledger(self):
+        before = self.ledger()
+        LeaveLedger.objects.all().delete()
+        self.assertEqual(rebuild_leave_ledger(year=2025), 2)
+        self.assertEqual(self.ledger(), before)
+
+    def test_summary_reads_the_ledger(self):
+        client = APIClient()
+        client.force_authenticate(self.ann)
+        response = client.get("/api/leave/summary/", {"year": 2025, "period": "monthly", "month": 3})
+        self.assertEqual(response.status_code, 200)
+        row, = response.data["results"]
+        self.assertEqual((row["total_leave"], row["informed_leave"], row["uninformed_leave"]), (1.5, 1.0, 0.5))
+        self.assertEqual([m["leave"] for m in row["monthly_breakdown"][2:4]], [1.5, 1.0])
+
+
+# -------------------------------------------------
+# Calendar cache / ETag
+# -------------------------------------------------
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class LeaveCalendarTests(TestCase):
+    URL = "/api/leave/calendar/"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.ann = LeaveQueryBudgetTests._user("ann", "101")
+        cls.bob = LeaveQueryBudgetTests._user("bob", "102")
+        cls.out = LeaveQueryBudgetTests._user("out", "103")
+        # Ann's team: the users behind her assigned members' emails
+        MemberAssignment.objects.create(user=cls.ann, member=Member.objects.create(name="Bob", email=cls.bob.email))
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.ann)
+
+    def approve(self, user, day):
+        with self.captureOnCommitCallbacks(execute=True):
+            Leave.objects.create(user=user, leave_type="full_day", reason="sick",
+                                 date=[day], status="approved")
+
+    def get(self, etag=None, month="2025-03"):
+        headers = {"HTTP_IF_NONE_MATCH": etag} if etag else {}
+        return self.client.get(self.URL, {"month": month}, **headers)
+
+    def on_leave(self, response):
+        return {d["date"]: [e["user_id"] for e in d["leaves"]] for d in response.data["days"] if d["leaves"]}
+
+    def test_team_scope(self):
+        self.approve(self.bob, "2025-03-10")
+        self.approve(self.out, "2025-03-11")
+        self.assertEqual(self.on_leave(self.get()), {"2025-03-10": [self.bob.pk]})
+
+    def test_unchanged_month_answers_304_from_the_cache(self):
+        etag = self.get()["ETag"]
+        with self.assertNumQueries(0):
+            response = self.get(etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+        # Leave in another month keeps this month's ETag
+        self.approve(self.bob, "2025-04-10")
+        self.assertEqual(self.get(etag).status_code, 304)
+
+    def test_approved_leave_changes_the_etag(self):
+        etag = self.get()["ETag"]
+        self.approve(self.bob, "2025-03-10")
+
+        response = self.get(etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(self.on_leave(response), {"2025-03-10": [self.bob.pk]})
+
+    def test_invalid_month(self):
+        self.assertEqual(self.get(month="2025-13").status_code, 400)
+
+
+# -------------------------------------------------
+# Bulk import / decisions
+# -------------------------------------------------
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class BulkLeaveTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = LeaveQueryBudgetTests._user("frahman", "00")
+        cls.ann = LeaveQueryBudgetTests._user("ann", "101")
+        cls.bob = LeaveQueryBudgetTests._user("bob", "102")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def item(self, user, *dates, leave_type="full_day", reason="personal"):
+        return {"user_id": user.pk, "leave_type": leave_type, "date": list(dates), "reason": reason}
+
+    def test_import_creates_leaves_days_and_ledger(self):
+        response = self.client.post("/api/leave/manual/bulk/", {"leaves": [
+            self.item(self.ann, "2025-12-25", "2025-12-26"),
+            self.item(self.bob, "2025-12-25"),
+            self.item(self.bob, "2025-12-24", leave_type="2nd_half", reason="bank"),
+        ]}, format="json")
+        self.assertEqual(response.status_code, 201, response.content)
+
+        created = Leave.objects.filter(import_batch=response.data["import_batch"])
+        self.assertEqual(created.count(), 3)
+        self.assertEqual(LeaveDay.objects.filter(leave__in=created, status="approved").count(), 4)
+        self.assertEqual(
+            sorted(LeaveLedger.objects.filter(year=2025, month=12).values_list("user_id", "total")),
+            [(self.ann.pk, 2), (self.bob.pk, 1.5)],
+        )
+
+    def test_import_is_all_or_nothing(self):
+        Leave.objects.create(user=self.ann, leave_type="full_day", reason="sick",
+                             date=["2025-12-26"], status="pending")
+        response = self.client.post("/api/leave/manual/bulk/", {"leaves": [
+            self.item(self.bob, "2025-12-25"),
+            self.item(self.ann, "2025-12-25", "2025-12-26"),
+            self.item(self.bob, "2025-12-25"),
+            self.item(self.bob, "2025-12-27", reason="holiday"),
+        ]}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([item["index"] for item in response.data["items"]], [1, 2, 3])
+        self.assertEqual(Leave.objects.count(), 1)
+
+    def test_only_admin(self):
+        self.client.force_authenticate(self.ann)
+        response = self.client.post("/api/leave/manual/bulk/", {"leaves": [self.item(self.ann, "2025-12-25")]},
+                                    format="json")
+        self.assertEqual(response.status_code, 403)
+
+    def test_bulk_decisions(self):
+        pending = [
+            Leave.objects.create(user=u, leave_type="full_day", reason="sick", date=[d], status="pending")
+            for u, d in ((self.ann, "2025-03-10"), (self.bob, "2025-03-11"))
+        ]
+        done = Leave.objects.create(user=self.bob, leave_type="full_day", reason="sick",
+                                    date=["2025-03-20"], status="rejected")
+
+        response = self.client.post("/api/leave/decision/bulk/", {"decisions": [
+            {"id": pending[0].pk, "action": "approve"},
+            {"id": pending[1].pk, "action": "reject"},
+            {"id": done.pk, "action": "approve"},
+            {"id": 999, "action": "approve"},
+        ]}, format="json")
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual([(d["id"], d["status"]) for d in response.data["decided"]],
+                         [(pending[0].pk, "approved"), (pending[1].pk, "rejected")])
+        self.assertEqual(response.data["skipped"], [
+            {"id": done.pk, "error": "Leave is already rejected."},
+            {"id": 999, "error": "Leave not found."},
+        ])
+
+        self.assertEqual(
+            dict(LeaveDay.objects.filter(leave__in=pending).values_list("leave_id", "status")),
+            {pending[0].pk: "approved", pending[1].pk: "rejected"},
+        )
+        self.assertEqual(list(LeaveLedger.objects.values_list("user_id", "month", "total")), [(self.ann.pk, 3, 1)])
+        # Mails are queued, not sent
+        self.assertEqual(
+            sorted(OutboundEmail.objects.filter(kind="leave_decision").values_list("leave_id", flat=True)),
+            [p.pk for p in pending],
+        )
+
+    def test_duplicate_decision_ids(self):
+        response = self.client.post("/api/leave/decision/bulk/", {"decisions": [
+            {"id": 1, "action": "approve"}, {"id": 1, "action": "reject"},
+        ]}, format="json")
+        self.assertEqual(response.status_code, 400)
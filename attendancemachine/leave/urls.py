@@ -13,6 +13,8 @@ from .views import (
     # LeaveCancelDecisionView,   # ❌ not needed for auto-cancel
     # LeaveCancelReviewBackendView,  # ❌ remove, not implemented
     AdminFutureLeaveCancelView,
+    BulkManualLeaveCreateView,
+    BulkLeaveDecisionView,
 )
 
 urlpatterns = [
@@ -26,6 +28,7 @@ urlpatterns = [
     # -------------------------------
     path('approve/<int:pk>/', LeaveApprovalView.as_view(), name='leave-approval'),
     path('decision/<int:pk>/', LeaveDecisionView.as_view(), name='leave-decision'),
+    path('decision/bulk/', BulkLeaveDecisionView.as_view(), name='leave-decision-bulk'),
 
     # -------------------------------
     # LIST + SUMMARY
@@ -37,6 +40,7 @@ urlpatterns = [
     # MANUAL LEAVE CREATION (admin only)
     # -------------------------------
     path('manual/', ManualLeaveCreateView.as_view(), name='leave-manual-create'),
+    path('manual/bulk/', BulkManualLeaveCreateView.as_view(), name='leave-manual-bulk-create'),
 
     # -------------------------------
     # TEAM LEAVES + CALENDAR + UPCOMING
@@ -1,54 +1,47 @@
 import os
 import ssl
 import certifi
-from django.core.mail import EmailMessage
+from django.contrib.auth import get_user_model
 from django.template.loader import render_to_string
-from django.conf import settings
-from openai import OpenAI
+
+from .grammar import ensure_corrected_reason
+from .mailer import enqueue_email
+from .models import Leave
 
 # ✅ SSL fix for cPanel
 os.environ['SSL_CERT_FILE'] = certifi.where()
 ssl._create_default_https_context = ssl.create_default_context
 
-# --- OpenRouter Setup ---
-client = OpenAI(
-    api_key=settings.OPENROUTER_API_KEY,
-    base_url="https://openrouter.ai/api/v1"
-)
 
-def correct_grammar_and_paraphrase(text: str) -> str:
-    try:
-        print("🔍 Correcting grammar via OpenRouter...")
-        completion = client.chat.completions.create(
-            model="meta-llama/llama-3-70b-instruct",
-            messages=[
-                {
-                    "role": "user",
-                    "content": f"Correct this sentence without explanation. Only return the corrected sentence:\n{text}"
-                }
-            ],
-            extra_headers={
-                "HTTP-Referer": "http://localhost:8000",  # Optional
-                "X-Title": "AttendanceMachine"             # Optional
-            }
-        )
-        corrected = completion.choices[0].message.content.strip()
-        print("✅ Corrected sentence:", corrected)
-        return corrected
-    except Exception as e:
-        print("❌ Grammar correction failed:", str(e))
-        return text  # fallback
+def send_leave_email(user, leave, approve_url=None, reject_url=None):
+    """
+    Queues the email notification for a leave request to the manager.
+    The body is rendered by the mail worker (render_leave_email), after the
+    reason has been grammar-corrected, so the request never waits on it.
+    """
+    print("📨 Queueing leave request email for:", user.email)
+
+    return enqueue_email(
+        f"New Leave Request from {user.username}",
+        "",
+        ["faisal@ampec.com.au"],
+        kind="leave_request",
+        leave_id=leave.id,
+        render_with="leave.utils.render_leave_email",
+        render_args={"leave_id": leave.id, "approve_url": approve_url, "reject_url": reject_url},
+    )
 
 
-def send_leave_email(user, leave, corrected_reason, approve_url=None, reject_url=None):
+def render_leave_email(leave_id, approve_url=None, reject_url=None):
     """
-    Sends an email notification for a leave request to the manager.
+    Body of the manager's leave request email (called by the mail worker).
+    Also stores it as Leave.email_body.
     """
-    print("📨 Preparing email for:", user.email)
+    leave = Leave.objects.get(pk=leave_id)
+    user = get_user_model().objects.get(pk=leave.user_id)
+    corrected_reason = ensure_corrected_reason(leave)
     print("📨 Using corrected_reason:", corrected_reason)
 
-    subject = f"New Leave Request from {user.username}"
-
     context = {
         'user': user,
         'leave': leave,
@@ -60,13 +53,5 @@ def send_leave_email(user, leave, corrected_reason, approve_url=None, reject_url
     body = render_to_string("leave/leave_email.html", context)
     print("🧾 Rendered email body (truncated):", body[:200])
 
-    email = EmailMessage(subject, body, to=["faisal@ampec.com.au"])
-    email.content_subtype = "html"
-
-    try:
-        email.send()
-        print("✅ Email sent successfully.")
-    except Exception as e:
-        print("❌ Email send error:", str(e))
-
+    Leave.objects.filter(pk=leave_id).update(email_body=body)
     return body
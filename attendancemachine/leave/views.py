@@ -1,10 +1,10 @@
+from calendar import monthrange
+from collections import defaultdict
 from datetime import date as date_cls, datetime
 
-from django.apps import apps
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.sites.shortcuts import get_current_site
-from django.core.mail import EmailMessage
 from django.core.exceptions import ValidationError
 from django.db import transaction
 from django.db.models import Q
@@ -22,17 +22,24 @@ from rest_framework.views import APIView
 from rest_framework import generics
 
 from django.utils.dateparse import parse_datetime, parse_date
+from django.utils.http import parse_etags, quote_etag
 
-from types import SimpleNamespace
 from django.shortcuts import redirect
 
-from .models import Leave
+from .models import Leave, LeaveDay, LeaveLedger, LeaveOverlapError
 from .serializers import LeaveSerializer
-from .utils import send_leave_email, correct_grammar_and_paraphrase
+from .bulk import BulkLeaveError, MAX_BULK_ITEMS, bulk_create_leaves, bulk_decide
+from .calendar_cache import calendar_days, calendar_scope, calendar_version
+from .mailer import enqueue_email, enqueue_emails
+from .notifications import decision_leave, decision_messages, informed_status_for
+from .services import sync_leave_days, sync_leave_days_for
+from .utils import send_leave_email
 from datetime import date, timedelta
 
 
-from member.models import Member, MemberAssignment
+from employee.directory import get_directory
+from member.graph import get_team_graph
+from seatplan.services import invalidate_seat_plan
 from django.contrib.auth.models import User
 from urllib.parse import urlencode
 User = get_user_model()
@@ -52,27 +59,19 @@ class LeaveRequestView(APIView):
             leave = serializer.save(user=request.user)
             print("✅ Leave saved with ID:", leave.id)
 
-            corrected_reason = (
-                correct_grammar_and_paraphrase(leave.reason or "")
-                if leave.leave_type in ('1st_half', '2nd_half') else leave.reason
-            )
-
             domain = get_current_site(request).domain
             approve_url = f"http://{domain}{reverse('leave-approval', args=[leave.id])}?action=approve"
             reject_url = f"http://{domain}{reverse('leave-approval', args=[leave.id])}?action=reject"
 
-            print("🧠 Final reason used:", corrected_reason)
-
-            email_body = send_leave_email(
+            # Grammar correction + rendering happen in the mail worker;
+            # it stores corrected_reason and email_body on the leave
+            send_leave_email(
                 request.user,
                 leave,
-                corrected_reason,
                 approve_url=approve_url,
                 reject_url=reject_url
             )
-            leave.email_body = email_body
-            leave.save()
-            print("✉️ Email sent and body saved.")
+            print("✉️ Email queued.")
 
             return Response({
                 "message": "Leave request submitted successfully",
@@ -98,31 +97,6 @@ class LeaveApprovalView(APIView):
         return redirect(frontend_url)
 
 
-# -------------------------------------------------
-# Optional model resolver (kept if you later need it)
-# -------------------------------------------------
-
-def _get_member_model():
-    """
-    Resolve the Member model from another app safely.
-    Priority:
-      1) settings.MEMBER_MODEL = "app_label.ModelName"  (e.g., "assign.Member")
-      2) fallback common guesses: ("assign", "Member"), ("members", "Member")
-    """
-    model_path = getattr(settings, "MEMBER_MODEL", None)
-    if model_path and "." in model_path:
-        app_label, model_name = model_path.rsplit(".", 1)
-        Model = apps.get_model(app_label, model_name)
-        if Model is not None:
-            return Model
-
-    for app_label in ("assign", "members"):
-        Model = apps.get_model(app_label, "Member")
-        if Model is not None:
-            return Model
-    return None
-
-
 # -------------------------------------------------
 # Decision: approve/reject (sends requester + team emails)
 # -------------------------------------------------
@@ -141,7 +115,8 @@ class LeaveDecisionView(APIView):
         row = (Leave.objects
                .filter(pk=pk)
                .values("id","leave_type","reason","status","is_approved",
-                       "user_id","email_body","informed_status","date","created_at")
+                       "user_id","email_body","informed_status","date","created_at",
+                       "corrected_reason")
                .first())
         if not row:
             raise Http404("Leave not found.")
@@ -161,12 +136,7 @@ class LeaveDecisionView(APIView):
 
         informed_status_value = row.get("informed_status")
         if new_status == "approved" and date_list:
-            try:
-                earliest_leave_date = min(date_cls.fromisoformat(d) for d in date_list)
-                created_date = row["created_at"].date()
-                informed_status_value = "informed" if (earliest_leave_date - created_date).days >= 3 else "uninformed"
-            except Exception:
-                informed_status_value = "uninformed"
+            informed_status_value = informed_status_for(date_list, row["created_at"].date())
 
         with transaction.atomic():
             update_kwargs = {
@@ -179,97 +149,31 @@ class LeaveDecisionView(APIView):
             updated = (Leave.objects.filter(pk=pk, status="pending").update(**update_kwargs))
             if updated == 0:
                 return Response({"message": "Leave status already changed."}, status=400)
+            sync_leave_days_for([pk])
+
+        # .update() skips post_save → refresh the live seat plan explicitly
+        invalidate_seat_plan(date_list)
 
         User = get_user_model()
         user = User.objects.only("id","email","username","first_name","last_name").get(pk=row["user_id"])
 
-        corrected_reason = (
-            correct_grammar_and_paraphrase(row["reason"] or "")
-            if row["leave_type"] in ("1st_half","2nd_half")
-            else row["reason"]
-        )
+        # Computed in the background (leave.grammar); raw reason until then
+        corrected_reason = row["corrected_reason"] or row["reason"]
 
-        display_map = {"full_day": "Full Day", "1st_half": "First Half", "2nd_half": "Second Half"}
-        leave_ns = SimpleNamespace(
-            id=row["id"],
-            leave_type=row["leave_type"],
-            reason=row["reason"],
-            status=new_status,
-            is_approved=new_is_approved,
-            email_body=row.get("email_body"),
-            informed_status=informed_status_value if new_status == "approved" else row.get("informed_status"),
-            date=date_list,
-            get_leave_type_display=display_map.get(row["leave_type"], row["leave_type"]),
+        leave_ns = decision_leave(
+            row["id"], row["leave_type"], row["reason"], new_status,
+            informed_status_value if new_status == "approved" else row.get("informed_status"),
+            date_list, email_body=row.get("email_body"),
         )
 
-        # ✅ Notify the applied user (you had removed this block)
-        try:
-            requester_ctx = {"user": user, "leave": leave_ns, "corrected_reason": corrected_reason}
-            requester_subject = f"Your Leave Request Has Been {new_status.upper()}"
-            requester_body = render_to_string("leave/leave_decision_email.html", requester_ctx)
-            from_email = getattr(settings, "DEFAULT_FROM_EMAIL", None)
-            requester_msg = EmailMessage(requester_subject, requester_body, from_email=from_email, to=[user.email])
-            requester_msg.content_subtype = "html"
-            requester_msg.send()
-        except Exception as e:
-            print(f"❌ Failed to notify user: {str(e)}")
-
-        # Admin notice (HTML)
+        # Requester + admin notice, team notice on approval (queued)
         try:
-            display_name = (user.get_full_name() or user.username)
-            admin_ctx = {
-                "action": action,
-                "display_name": display_name,
-                "leave": leave_ns,
-                "reason": corrected_reason or row.get("reason", ""),
-            }
-            admin_subject = f"You have {action}ed a leave request"
-            admin_body = render_to_string("leave/admin_decision_email.html", admin_ctx)
-            from_email = getattr(settings, "DEFAULT_FROM_EMAIL", None)
-            admin_msg = EmailMessage(admin_subject, admin_body, from_email=from_email, to=["faisal@ampec.com.au"])
-            admin_msg.content_subtype = "html"
-            admin_msg.send()
+            team_emails = get_team_graph().member_emails(user.id) if new_status == "approved" else []
+            if new_status == "approved" and not team_emails:
+                print(f"ℹ️ No member emails found for user {user.id}; team notice skipped.")
+            enqueue_emails(decision_messages(user, leave_ns, action, corrected_reason, team_emails))
         except Exception as e:
-            print(f"❌ Failed to notify admin: {str(e)}")
-
-        # Team notice (on approval)
-        if new_status == "approved":
-            try:
-                team_emails = list(
-                    user.members.values_list("email", flat=True)
-                        .exclude(email__isnull=True)
-                        .exclude(email="")
-                        .distinct()
-                )
-                if not team_emails:
-                    Member = _get_member_model()
-                    if Member:
-                        team_emails = list(
-                            Member.objects.filter(user_assignments__user_id=row["user_id"])
-                                .values_list("email", flat=True)
-                                .exclude(email__isnull=True)
-                                .exclude(email="")
-                                .distinct()
-                        )
-
-                if team_emails:
-                    display_name = (user.get_full_name() or user.username)
-                    team_subject = f"Team Notice: {display_name}'s leave ({leave_ns.get_leave_type_display})"
-                    team_ctx = {
-                        "display_name": display_name,
-                        "leave": leave_ns,
-                        "dates": date_list,
-                        "reason": corrected_reason or row.get("reason", ""),
-                    }
-                    team_body = render_to_string("leave/team_leave_notice.html", team_ctx)
-                    from_email = getattr(settings, "DEFAULT_FROM_EMAIL", None)
-                    team_msg = EmailMessage(team_subject, team_body, from_email=from_email, to=team_emails)
-                    team_msg.content_subtype = "html"
-                    team_msg.send()
-                else:
-                    print(f"ℹ️ No member emails found for user {user.id}; team notice skipped.")
-            except Exception as e:
-                print(f"❌ Team notification failed: {e}")
+            print(f"❌ Failed to queue decision emails: {e}")
 
         return Response({
             "message": f"Leave has been {new_status}.",
@@ -347,6 +251,13 @@ def parse_int(val):
         return None
 
 
+def parse_iso_date(val):
+    try:
+        return parse_date(str(val).strip())
+    except (TypeError, ValueError):
+        return None
+
+
 ALLOWED_ORDER_FIELDS = {
     'id', 'leave_type', 'reason', 'status', 'is_approved',
     'informed_status', 'created_at', 'updated_at'
@@ -429,7 +340,7 @@ class LeaveListView(generics.ListAPIView):
     def get_queryset(self):
         user = self.request.user
         qp = self.request.query_params
-        qs = Leave.objects.select_related('user').all()
+        qs = Leave.objects.with_user()
 
         # -------- Access control + base filtering by USER ID --------
         user_id_param = qp.get('id')
@@ -454,7 +365,7 @@ class LeaveListView(generics.ListAPIView):
             qs = qs.filter(leave_type=qp['leave_type'])
 
         if 'reason' in qp:
-            qs = qs.filter(reason__icontains=qp['reason'])
+            qs = qs.filter(reason__search=qp['reason'])
 
         if 'status' in qp:
             qs = qs.filter(status=qp['status'])
@@ -465,18 +376,18 @@ class LeaveListView(generics.ListAPIView):
                 qs = qs.filter(is_approved=val)
 
         if 'informed_status' in qp:
-            qs = qs.filter(informed_status__icontains=qp['informed_status'])
+            qs = qs.filter(informed_status=qp['informed_status'].strip().lower())
 
-        # JSON date filters
+        # Date filters (start/end range, then LeaveDay)
         one_date = qp.get('date')
         if one_date:
-            qs = qs.filter(date__contains=[one_date])
+            d = parse_iso_date(one_date)
+            qs = qs.on_date(d) if d else qs.none()
 
         many_dates = qp.get('dates')
         if many_dates:
-            items = [d.strip() for d in many_dates.split(',') if d.strip()]
-            for d in items:
-                qs = qs.filter(date__contains=[d])  # include ALL those dates
+            items = [parse_iso_date(d) for d in many_dates.split(',') if d.strip()]
+            qs = qs.on_all_dates(items) if all(items) else qs.none()  # include ALL those dates
 
         # created_at / updated_at ranges
         created_from = qp.get('created_from')
@@ -549,27 +460,13 @@ class LeaveUserSummaryView(APIView):
         month = parse_int(qp.get('month'))
         want_details = bool(parse_bool(qp.get('details')))
 
-        if period == 'monthly' and not month:
+        if period == 'monthly' and not (month and 1 <= month <= 12):
             return Response({"error": "month is required when period=monthly (1-12)."}, status=400)
 
-        def date_matches_for_total(iso_str: str) -> bool:
-            """Used for total/informed/uninformed (respects period)."""
-            try:
-                d = date_cls.fromisoformat(iso_str)
-            except Exception:
-                return False
-            if period == 'monthly':
-                return d.year == year and d.month == month
-            # default or 'yearly'
-            return d.year == year
-
-        def month_index_if_in_year(iso_str: str):
-            """Used for monthly_breakdown (whole year). Returns 0..11 or None."""
-            try:
-                d = date_cls.fromisoformat(iso_str)
-            except Exception:
-                return None
-            return (d.month - 1) if d.year == year else None
+        try:
+            year_start, year_end = date_cls(year, 1, 1), date_cls(year, 12, 31)
+        except ValueError:
+            return Response({"error": "Invalid year."}, status=400)
 
         # ---- choose users ----
         uid_param = qp.get('id')
@@ -586,65 +483,48 @@ class LeaveUserSummaryView(APIView):
         else:
             users_qs = User.objects.select_related('profile').filter(id=user.id)
 
-        user_ids = list(users_qs.values_list('id', flat=True))
-
-        # ---- fetch relevant leaves (approved only) ----
-        leaves = (Leave.objects
-                  .filter(user_id__in=user_ids, status='approved')
-                  .values('user_id', 'leave_type', 'reason', 'date', 'informed_status'))
-
-        # ---- accumulators ----
-        totals              = {uid: 0.0 for uid in user_ids}  # period-aware
-        informed_totals     = {uid: 0.0 for uid in user_ids}
-        uninformed_totals   = {uid: 0.0 for uid in user_ids}
-
-        monthly_leave       = {uid: [0.0]*12 for uid in user_ids}  # whole year
-        monthly_informed    = {uid: [0.0]*12 for uid in user_ids}
-        monthly_uninformed  = {uid: [0.0]*12 for uid in user_ids}
-
-        details_map = {uid: [] for uid in user_ids} if want_details else None
-
-        # ---- iterate all leaves ----
-        for r in leaves:
-            uid = r['user_id']
-            leave_type = r['leave_type']
-            reason = r['reason']
-            inf_status = (r.get('informed_status') or '').lower()
-            is_informed = (inf_status == 'informed')
-
-            dates = r.get('date') or []
-            if isinstance(dates, str):
-                dates = [dates]
-
-            unit = 1.0 if leave_type == 'full_day' else 0.5
-
-            for iso in dates:
-                # period-aware totals
-                if date_matches_for_total(iso):
-                    totals[uid] += unit
-                    if is_informed:
-                        informed_totals[uid] += unit
-                    else:
-                        uninformed_totals[uid] += unit
-                    if want_details:
-                        details_map[uid].append({
-                            "date": iso,
-                            "leave_type": leave_type,
-                            "reason": reason
-                        })
-
-                # monthly breakdown (whole year)
-                mi = month_index_if_in_year(iso)
-                if mi is not None:
-                    monthly_leave[uid][mi] += unit
-                    if is_informed:
-                        monthly_informed[uid][mi] += unit
-                    else:
-                        monthly_uninformed[uid][mi] += unit
-
+        user_ids = users_qs.values('id')
+
+        # ---- ledger of the requested year: one grouped read ----
+        zeros = lambda: [0.0] * 12
+        monthly_leave       = defaultdict(zeros)  # whole year
+        monthly_informed    = defaultdict(zeros)
+        monthly_uninformed  = defaultdict(zeros)
+
+        ledger = (LeaveLedger.objects
+                  .filter(user_id__in=user_ids, year=year)
+                  .values_list('user_id', 'month', 'total', 'informed', 'uninformed'))
+        for uid, m, total, informed, uninformed in ledger:
+            monthly_leave[uid][m - 1] = float(total)
+            monthly_informed[uid][m - 1] = float(informed)
+            monthly_uninformed[uid][m - 1] = float(uninformed)
+
+        # period-aware totals
+        months = [month - 1] if period == 'monthly' else range(12)
+        totals            = {uid: sum(v[i] for i in months) for uid, v in monthly_leave.items()}
+        informed_totals   = {uid: sum(v[i] for i in months) for uid, v in monthly_informed.items()}
+        uninformed_totals = {uid: sum(v[i] for i in months) for uid, v in monthly_uninformed.items()}
+
+        # ---- details (optional): approved leave days in the period ----
+        details_map = defaultdict(list) if want_details else None
         if want_details:
-            for uid in details_map:
-                details_map[uid].sort(key=lambda x: x["date"])
+            if period == 'monthly':
+                d_start = date_cls(year, month, 1)
+                d_end = date_cls(year, month, monthrange(year, month)[1])
+            else:
+                d_start, d_end = year_start, year_end
+
+            leave_days = (LeaveDay.objects
+                          .filter(user_id__in=user_ids, status='approved',
+                                  date__gte=d_start, date__lte=d_end)
+                          .order_by('date')
+                          .values_list('user_id', 'date', 'leave__leave_type', 'leave__reason'))
+            for uid, d, leave_type, reason in leave_days:
+                details_map[uid].append({
+                    "date": d.isoformat(),
+                    "leave_type": leave_type,
+                    "reason": reason
+                })
 
         month_names = [
             "January","February","March","April","May","June",
@@ -665,9 +545,9 @@ class LeaveUserSummaryView(APIView):
             monthly_breakdown = [
                 {
                     "month": month_names[i],
-                    "leave": float(monthly_leave[u.id][i]),
-                    "informed_leave": float(monthly_informed[u.id][i]),
-                    "uninformed_leave": float(monthly_uninformed[u.id][i]),
+                    "leave": monthly_leave[u.id][i],
+                    "informed_leave": monthly_informed[u.id][i],
+                    "uninformed_leave": monthly_uninformed[u.id][i],
                 }
                 for i in range(12)
             ]
@@ -695,7 +575,7 @@ class LeaveUserSummaryView(APIView):
 
 
 # ---- Serializer for manual creation (inline) ----
-class ManualLeaveCreateSerializer(serializers.Serializer):
+class ManualLeaveItemSerializer(serializers.Serializer):
     user_id = serializers.IntegerField()
     leave_type = serializers.ChoiceField(choices=['full_day', '1st_half', '2nd_half'])
     # array of YYYY-MM-DD strings
@@ -708,7 +588,6 @@ class ManualLeaveCreateSerializer(serializers.Serializer):
     informed_status = serializers.ChoiceField(choices=['informed', 'uninformed'], required=False)
 
     def validate(self, attrs):
-        user_id = attrs['user_id']
         leave_type = attrs['leave_type']
         dates = attrs['date']
 
@@ -719,18 +598,20 @@ class ManualLeaveCreateSerializer(serializers.Serializer):
         if leave_type == 'full_day' and len(dates) < 1:
             raise serializers.ValidationError("Full-day leave must have at least one date.")
 
+        attrs['date'] = dates  # keep normalized
+        return attrs
+
+
+class ManualLeaveCreateSerializer(ManualLeaveItemSerializer):
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+
         # user must exist
         User = get_user_model()
-        if not User.objects.filter(id=user_id).exists():
+        if not User.objects.filter(id=attrs['user_id']).exists():
             raise serializers.ValidationError("user_id not found.")
 
-        # overlap check against pending/approved for that user
-        qs = Leave.objects.filter(user_id=user_id, status__in=['pending', 'approved'])
-        for d in dates:
-            if qs.filter(date__contains=[d]).exists():
-                raise serializers.ValidationError(f"Leave already exists on {d} for this user.")
-
-        attrs['date'] = dates  # keep normalized
+        # overlap with pending/approved leaves is checked once by Leave.save
         return attrs
 
 
@@ -773,27 +654,26 @@ class ManualLeaveCreateView(APIView):
         # Informed status: use provided or compute from "now" vs earliest date
         informed = data.get('informed_status')
         if not informed:
-            try:
-                earliest = min(date_cls.fromisoformat(d) for d in dates)
-                created = timezone.localdate()  # today's date in server timezone
-                informed = 'informed' if (earliest - created).days >= 3 else 'uninformed'
-            except Exception:
-                informed = 'uninformed'
+            # today's date in server timezone
+            informed = informed_status_for(dates, timezone.localdate())
 
         # create
         User = get_user_model()
         target_user = User.objects.get(id=user_id)
 
-        with transaction.atomic():
-            leave = Leave.objects.create(
-                user=target_user,
-                leave_type=leave_type,
-                reason=reason,
-                date=dates,                   # JSON list
-                status=status_value,
-                is_approved=is_approved,
-                informed_status=informed
-            )
+        try:
+            with transaction.atomic():
+                leave = Leave.objects.create(
+                    user=target_user,
+                    leave_type=leave_type,
+                    reason=reason,
+                    date=dates,                   # JSON list
+                    status=status_value,
+                    is_approved=is_approved,
+                    informed_status=informed
+                )
+        except LeaveOverlapError as e:
+            return Response({"non_field_errors": [f"Leave already exists on {e.date} for this user."]}, status=400)
 
         # minimal response
         return Response({
@@ -814,6 +694,104 @@ class ManualLeaveCreateView(APIView):
 
 
 
+# ---- Bulk manual import / bulk decisions (admin only) ----
+class BulkManualLeaveSerializer(serializers.Serializer):
+    leaves = serializers.ListField(
+        child=ManualLeaveItemSerializer(),
+        allow_empty=False,
+        max_length=MAX_BULK_ITEMS,
+    )
+
+
+class BulkManualLeaveCreateView(APIView):
+    """
+    POST /api/leave/manual/bulk/
+    Only 'frahman'. Creates many manual leaves in one transaction
+    (e.g. public holidays, year-start imports). All or nothing.
+
+    Body:
+    {
+      "leaves": [
+        { "user_id": 72, "leave_type": "full_day", "date": ["2025-12-25"],
+          "reason": "personal", "status": "approved", "informed_status": "informed" },
+        ...
+      ]
+    }
+    Items take the same fields as /api/leave/manual/.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        if request.user.username != 'frahman':
+            return Response({"error": "You are not authorized to perform this action."}, status=403)
+
+        ser = BulkManualLeaveSerializer(data=request.data)
+        if not ser.is_valid():
+            return Response(ser.errors, status=400)
+
+        try:
+            created = bulk_create_leaves(ser.validated_data['leaves'])
+        except BulkLeaveError as e:
+            return Response({"error": "No leave was created.", "items": e.errors}, status=400)
+
+        return Response({
+            "message": f"{len(created)} manual leave(s) created.",
+            "import_batch": str(created[0].import_batch) if created else None,
+            "data": [
+                {
+                    "id": lv.id,
+                    "user_id": lv.user_id,
+                    "leave_type": lv.leave_type,
+                    "date": lv.date,
+                    "status": lv.status,
+                    "informed_status": lv.informed_status,
+                }
+                for lv in created
+            ],
+        }, status=201)
+
+
+class BulkLeaveDecisionSerializer(serializers.Serializer):
+    class DecisionSerializer(serializers.Serializer):
+        id = serializers.IntegerField()
+        action = serializers.ChoiceField(choices=['approve', 'reject'])
+
+    decisions = serializers.ListField(child=DecisionSerializer(), allow_empty=False, max_length=MAX_BULK_ITEMS)
+
+    def validate_decisions(self, value):
+        ids = [d['id'] for d in value]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError("Each leave id may appear only once.")
+        return value
+
+
+class BulkLeaveDecisionView(APIView):
+    """
+    POST /api/leave/decision/bulk/
+    Only 'frahman'. Approves / rejects many pending leaves in one transaction;
+    emails are queued in one batch. Leaves no longer pending are skipped.
+
+    Body:
+    { "decisions": [ { "id": 101, "action": "approve" }, { "id": 102, "action": "reject" } ] }
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        if request.user.username != "frahman":
+            return Response({"error": "You are not authorized to perform this action."}, status=403)
+
+        ser = BulkLeaveDecisionSerializer(data=request.data)
+        if not ser.is_valid():
+            return Response(ser.errors, status=400)
+
+        decided, skipped = bulk_decide([(d['id'], d['action']) for d in ser.validated_data['decisions']])
+        return Response({
+            "message": f"{len(decided)} leave(s) decided, {len(skipped)} skipped.",
+            "decided": decided,
+            "skipped": skipped,
+        }, status=200)
+
+
 class UpcomingLeaveView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -825,35 +803,24 @@ class UpcomingLeaveView(APIView):
         # Admin → all users
         # Normal → only self
         # ---------------------------------------------------
-        if user.username == "frahman":
-            qs = Leave.objects.filter(status="approved")
-        else:
-            qs = Leave.objects.filter(status="approved", user_id=user.id)
-
-        upcoming_list = []
+        days = LeaveDay.objects.filter(status="approved", date__gte=today)
+        if user.username != "frahman":
+            days = days.filter(user_id=user.id)
 
-        for lv in qs.select_related("user"):
-            raw_dates = lv.date or []
+        # leave_id -> upcoming ISO dates (ascending)
+        upcoming_by_leave = {}
+        for leave_id, d in days.order_by("date").values_list("leave_id", "date"):
+            upcoming_by_leave.setdefault(leave_id, []).append(d.isoformat())
 
-            # Normalize to list always
-            if isinstance(raw_dates, str):
-                date_list = [raw_dates]
-            else:
-                date_list = raw_dates
+        qs = (Leave.objects
+              .filter(id__in=list(upcoming_by_leave))
+              .with_user()
+              .order_by("id"))
 
-            # Filter dates >= today
-            upcoming_dates = []
-            for d in date_list:
-                try:
-                    d_date = date_cls.fromisoformat(d)
-                    if d_date >= today:
-                        upcoming_dates.append(d)
-                except Exception:
-                    continue
+        upcoming_list = []
 
-            # Skip if no upcoming dates
-            if not upcoming_dates:
-                continue
+        for lv in qs:
+            upcoming_dates = upcoming_by_leave[lv.id]
 
             u = lv.user
             profile = getattr(u, "profile", None)
@@ -902,23 +869,20 @@ class TeamApprovedLeaveView(APIView):
         # 1) admin → see all approved leaves
         # ---------------------------------------------------
         if user.username == "frahman":
-            qs = Leave.objects.filter(status="approved")
+            qs = Leave.objects.with_user().filter(status="approved")
 
         else:
             # ---------------------------------------------------
             # 2) normal user → only team members' approved leaves
             # ---------------------------------------------------
-            team_user_ids = list(
-                User.objects.filter(
-                    member_assignments__member__user_assignments__user=user
-                )
-                .exclude(id=user.id)          # exclude self
-                .exclude(profile__emp_code="00")
-                .values_list("id", flat=True)
-                .distinct()
-            )
+            directory = get_directory()
+            team_user_ids = [
+                uid for uid in get_team_graph().co_members(user.id)
+                if uid != user.id             # exclude self
+                and (uid not in directory.by_user_id or directory.by_user_id[uid].emp_code != "00")
+            ]
 
-            qs = Leave.objects.filter(
+            qs = Leave.objects.with_user().filter(
                 status="approved",
                 user_id__in=team_user_ids
             )
@@ -927,10 +891,10 @@ class TeamApprovedLeaveView(APIView):
         start_date = qp.get("start_date")
         end_date = qp.get("end_date")
 
-        if start_date:
-            qs = qs.filter(date__contains=[start_date])
-        if end_date:
-            qs = qs.filter(date__contains=[end_date])
+        for value in (start_date, end_date):
+            if value:
+                d = parse_iso_date(value)
+                qs = qs.filter(days__date=d) if d else qs.none()
 
         # count for pagination
         total = qs.count()
@@ -1020,113 +984,34 @@ class LeaveCalendarView(APIView):
         except Exception:
             return Response({"error": "Invalid month format. Use YYYY-MM"}, status=400)
 
-        # Calculate last day of the month
-        if month == 12:
-            last_day = date(year + 1, 1, 1) - timedelta(days=1)
-        else:
-            last_day = date(year, month + 1, 1) - timedelta(days=1)
-
         # -----------------------------------------
-        # 2) DETERMINE VISIBLE USERS
+        # 2) VISIBILITY SCOPE (admin → all, else team + self)
         # -----------------------------------------
-
-        # Admin → see all approved leaves
-        if user.username == "frahman":
-            visible_user_ids = list(
-                User.objects.exclude(profile__emp_code="00")
-                .values_list("id", flat=True)
-            )
-
-        else:
-            # Normal user → See team + self
-
-            # Step A: Find member_ids where this user is assigned
-            member_ids = list(
-                MemberAssignment.objects.filter(user=user)
-                .values_list("member_id", flat=True)
-            )
-
-            # Step B: Get member emails (safe Python list → avoids collation issue)
-            member_emails = list(
-                Member.objects.filter(id__in=member_ids)
-                .values_list("email", flat=True)
-            )
-
-            # Step C: Get User IDs who have these emails
-            employee_user_ids = list(
-                User.objects.filter(email__in=member_emails)
-                .exclude(profile__emp_code="00")
-                .values_list("id", flat=True)
-            )
-
-            visible_user_ids = set(employee_user_ids)
-            visible_user_ids.add(user.id)
+        scope, visible_user_ids = calendar_scope(user)
 
         # -----------------------------------------
-        # 3) FETCH APPROVED LEAVES
+        # 3) CONDITIONAL REQUEST → 304
         # -----------------------------------------
-
-        leaves = Leave.objects.filter(
-            status="approved",
-            user_id__in=visible_user_ids
-        )
-
-        # Filter rows by month because dates are inside JSONField
-        filtered = []
-        for lv in leaves:
-            for d in lv.date:
-                try:
-                    d_date = date.fromisoformat(d)
-                except:
-                    continue
-                if first_day <= d_date <= last_day:
-                    filtered.append((lv, d_date))
+        version = calendar_version(scope, year, month)
+        etag = quote_etag(version)
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = Response(status=304)
+            response["ETag"] = etag
+            response["Cache-Control"] = "private, no-cache"
+            return response
 
         # -----------------------------------------
-        # 4) BUILD FULL MONTH CALENDAR
+        # 4) FULL MONTH CALENDAR (cached per scope + month)
         # -----------------------------------------
+        days = calendar_days(scope, visible_user_ids, year, month, version=version)
 
-        days = []
-        current = first_day
-
-        while current <= last_day:
-            days.append({
-                "date": current.isoformat(),
-                "leaves": []
-            })
-            current += timedelta(days=1)
-
-        index_map = {d["date"]: d for d in days}
-
-        # -----------------------------------------
-        # 5) FILL LEAVES INTO CALENDAR DAYS
-        # -----------------------------------------
-
-        for lv, d_date in filtered:
-            u = lv.user
-            profile = getattr(u, "profile", None)
-            emp_code = getattr(profile, "emp_code", None)
-
-            entry = {
-                "user_id": u.id,
-                "first_name": u.first_name,
-                "last_name": u.last_name,
-                "emp_code": emp_code,
-                "leave_type": lv.leave_type,
-                "reason": lv.reason,
-                "informed_status": lv.informed_status,
-            }
-
-            index_map[d_date.isoformat()]["leaves"].append(entry)
-
-        # -----------------------------------------
-        # 6) RETURN FINAL RESPONSE
-        # -----------------------------------------
-
-        return Response({
+        response = Response({
             "month": month_str,
             "days": days
         })
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
+        return response
     
 
 
@@ -1215,9 +1100,12 @@ class LeaveCancelRequestView(APIView):
         else:
             # FULL cancellation → mark cancelled (BUT bypass clean() date rule)
             Leave.objects.filter(pk=leave.id).update(
-                date=[], status="cancelled", is_approved=False, updated_at=timezone.now()
+                date=[], start_date=None, end_date=None,
+                status="cancelled", is_approved=False, updated_at=timezone.now()
             )
+            invalidate_seat_plan(requested)
             leave.refresh_from_db()
+            sync_leave_days(leave)
 
         # --------------------------------------
         # 4) SEND EMAIL — USER
@@ -1233,36 +1121,20 @@ class LeaveCancelRequestView(APIView):
             "remaining_dates": remaining,
         })
 
-        msg_user = EmailMessage(
+        enqueue_email(
             "Your Leave Cancellation Has Been Processed",
             user_body,
-            from_email,
             [user.email],
+            from_email=from_email,
+            kind="leave_cancel",
+            leave_id=leave.id,
         )
-        msg_user.content_subtype = "html"
-        msg_user.send()
 
         # --------------------------------------
         # 5) SEND EMAIL — TEAM MEMBERS
         # --------------------------------------
         try:
-            team_emails = list(
-                user.members.values_list("email", flat=True)
-                    .exclude(email__isnull=True)
-                    .exclude(email="")
-                    .distinct()
-            )
-
-            if not team_emails:
-                Member = _get_member_model()
-                if Member:
-                    team_emails = list(
-                        Member.objects.filter(user_assignments__user_id=user.id)
-                            .values_list("email", flat=True)
-                            .exclude(email__isnull=True)
-                            .exclude(email="")
-                            .distinct()
-                    )
+            team_emails = get_team_graph().member_emails(user.id)
 
             if team_emails:
                 team_body = render_to_string("leave/cancel_team_email.html", {
@@ -1273,14 +1145,14 @@ class LeaveCancelRequestView(APIView):
                     "remaining_dates": remaining,
                 })
 
-                msg_team = EmailMessage(
+                enqueue_email(
                     f"Leave Cancellation Notice – {user.get_full_name() or user.username}",
                     team_body,
-                    from_email,
                     team_emails,
+                    from_email=from_email,
+                    kind="leave_cancel_team",
+                    leave_id=leave.id,
                 )
-                msg_team.content_subtype = "html"
-                msg_team.send()
 
         except Exception as e:
             print("Team email failed:", e)
@@ -1329,7 +1201,7 @@ class AdminFutureLeaveCancelView(APIView):
 
         # 2) Load leave (typically approved)
         try:
-            leave = Leave.objects.select_related("user").get(pk=pk)
+            leave = Leave.objects.with_user().get(pk=pk)
         except Leave.DoesNotExist:
             return Response({"error": "Leave not found."}, status=404)
 
@@ -1437,33 +1309,18 @@ class AdminFutureLeaveCancelView(APIView):
             "initiated_by": "admin",
         }
         user_html = render_to_string("leave/cancel_user_email.html", user_ctx)
-        msg_user = EmailMessage(
+        enqueue_email(
             subject="Your leave has been updated by admin",
             body=user_html,
-            from_email=from_email,
             to=[user.email],
+            from_email=from_email,
+            kind="leave_admin_cancel",
+            leave_id=leave.id,
         )
-        msg_user.content_subtype = "html"
-        msg_user.send()
 
         # --- Team email (HTML) ---
         try:
-            team_emails = list(
-                user.members.values_list("email", flat=True)
-                    .exclude(email__isnull=True)
-                    .exclude(email="")
-                    .distinct()
-            )
-            if not team_emails:
-                Member = _get_member_model()
-                if Member:
-                    team_emails = list(
-                        Member.objects.filter(user_assignments__user_id=user.id)
-                            .values_list("email", flat=True)
-                            .exclude(email__isnull=True)
-                            .exclude(email="")
-                            .distinct()
-                    )
+            team_emails = get_team_graph().member_emails(user.id)
 
             if team_emails:
                 team_ctx = {
@@ -1475,14 +1332,14 @@ class AdminFutureLeaveCancelView(APIView):
                     "initiated_by": "admin",
                 }
                 team_html = render_to_string("leave/cancel_team_email.html", team_ctx)
-                msg_team = EmailMessage(
+                enqueue_email(
                     subject=f"Leave Cancellation Notice – {user.get_full_name() or user.username}",
                     body=team_html,
-                    from_email=from_email,
                     to=team_emails,
+                    from_email=from_email,
+                    kind="leave_admin_cancel_team",
+                    leave_id=leave.id,
                 )
-                msg_team.content_subtype = "html"
-                msg_team.send()
         except Exception as e:
             print("Admin future-cancel: team email failed:", e)
 
@@ -0,0 +1,61 @@
+# meal/management/commands/generate_cook_records.py
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from meal.services import generate_cook_records
+
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise CommandError(f"Invalid date '{value}', expected YYYY-MM-DD")
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate/update the CookRecords of a date range in one pass "
+        "(e.g. back-fill a month of meal history)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First date, YYYY-MM-DD')
+        parser.add_argument('--end', help='Last date, YYYY-MM-DD (default: today)')
+        parser.add_argument('--month', help='A whole month, YYYY-MM (instead of --start/--end)')
+        parser.add_argument('--weekends', action='store_true', help='Also generate Saturdays and Sundays')
+        parser.add_argument('--include-finalized', action='store_true',
+                            help='Regenerate finalized records too')
+        parser.add_argument('--force', action='store_true',
+                            help="Regenerate today's record even after the 08:00 lock")
+
+    def handle(self, *args, **options):
+        if options['month']:
+            try:
+                first = datetime.strptime(options['month'], "%Y-%m").date()
+            except ValueError:
+                raise CommandError(f"Invalid month '{options['month']}', expected YYYY-MM")
+            start = first
+            end = (first.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+        else:
+            if not options['start']:
+                raise CommandError("Give --start (and optionally --end) or --month")
+            start = _parse_date(options['start'])
+            end = _parse_date(options['end']) if options['end'] else timezone.localdate()
+
+        try:
+            stats = generate_cook_records(
+                start, end,
+                weekends=options['weekends'],
+                include_finalized=options['include_finalized'],
+                force=options['force'],
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"CookRecords {start}..{end}: {len(stats['written'])} written, "
+            f"{len(stats['unchanged'])} unchanged, {len(stats['finalized'])} finalized (kept), "
+            f"{len(stats['locked'])} locked (kept)"
+        ))
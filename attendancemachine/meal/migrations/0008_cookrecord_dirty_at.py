@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-17 00:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meal', '0007_cookrecord_opt_out_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cookrecord',
+            name='dirty_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
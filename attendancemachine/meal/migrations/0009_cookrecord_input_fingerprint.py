@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-17 00:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meal', '0008_cookrecord_dirty_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cookrecord',
+            name='input_fingerprint',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# The meal report's old generator marked every projected (future) CookRecord
+# finalized. Only today's record can really be finalized, so reset the future
+# ones and mark them dirty for the report refresher.
+
+from datetime import date as date_cls
+
+from django.db import migrations
+from django.utils import timezone
+
+
+def unfinalize_future_records(apps, schema_editor):
+    CookRecord = apps.get_model("meal", "CookRecord")
+    CookRecord.objects.filter(date__gt=date_cls.today(), is_finalized=True, finalized_by__isnull=True).update(
+        is_finalized=False, finalized_at=None, dirty_at=timezone.now(),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("meal", "0009_cookrecord_input_fingerprint"),
+    ]
+
+    operations = [
+        migrations.RunPython(unfinalize_future_records, migrations.RunPython.noop),
+    ]
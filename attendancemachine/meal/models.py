@@ -73,8 +73,9 @@ class CookRecord(models.Model):
     eaters_count = models.IntegerField(default=0)
     opt_out_count = models.IntegerField(default=0)  # ✅ newly added column
 
-    # Who ate (snapshot)
-    # Each entry: {user_id, name, attended, on_leave, included, inclusion_reason}
+    # Who ate (snapshot), one entry per employee (meal.projection):
+    # {emp_code, user_id, name, attended, first_punch_time, leave_type,
+    #  leave_status, opted_out, included, inclusion_reason}
     eaters = models.JSONField(default=list, blank=True)
 
     # Locking & audit
@@ -89,6 +90,13 @@ class CookRecord(models.Model):
         related_name="finalized_cook_records",
     )
 
+    # meal.projection.input_fingerprint of the inputs this snapshot was built from
+    input_fingerprint = models.CharField(max_length=64, blank=True, default="")
+
+    # Set when an input of the snapshot changed; cleared by
+    # mealreport.services.refresh_cook_records after regenerating
+    dirty_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
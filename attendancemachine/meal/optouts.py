@@ -0,0 +1,123 @@
+# meal/optouts.py
+"""
+Opt-out resolution: every active MealOptOut loaded once into an interval
+index.
+
+    index = get_optout_index()
+    index.by_date(dates)        { date: { user_id: reason } }, one sweep
+    index.on_date(d)            { user_id: reason }
+
+'date' opt-outs are one-day intervals, 'range' opt-outs start..end, and
+'permanent' ones cover every date (left out with permanent=False). The
+intervals are kept sorted by start and by end; by_date() walks the sorted
+dates once, adding intervals as they start and dropping them once they
+have ended, so a range costs O(intervals + dates) rather than a query or
+scan per date.
+
+Cached like employee.directory: a process-local copy reused while the
+shared version token is unchanged, and the Django cache keyed by that
+token. invalidate_optout_index() (MealOptOut save / delete, see
+meal/signals.py) writes a new token.
+"""
+import threading
+import uuid
+
+from django.core.cache import cache
+
+from .models import MealOptOut
+
+OPTOUT_VERSION_KEY = "meal:optouts:version"
+OPTOUT_CACHE_KEY = "meal:optouts:{version}"
+OPTOUT_CACHE_SECONDS = 60 * 60
+
+_lock = threading.Lock()
+_local = {"version": None, "index": None}
+
+
+class OptOutIndex:
+    """
+    Built from active (user_id, scope, date, start_date, end_date, reason)
+    rows, oldest first; a user's first covering opt-out gives the reason.
+    """
+
+    def __init__(self, rows):
+        self.permanent = {}
+        self._intervals = []   # (start, end, user_id, reason)
+        for user_id, scope, on, start, end, reason in rows:
+            if scope == "permanent":
+                self.permanent.setdefault(user_id, reason)
+            elif scope == "date" and on is not None:
+                self._intervals.append((on, on, user_id, reason))
+            elif scope == "range" and start is not None and end is not None and start <= end:
+                self._intervals.append((start, end, user_id, reason))
+
+        n = len(self._intervals)
+        self._by_start = sorted(range(n), key=lambda i: (self._intervals[i][0], i))
+        self._by_end = sorted(range(n), key=lambda i: (self._intervals[i][1], i))
+
+    def by_date(self, dates, permanent=True):
+        """{ date: { user_id: reason } } for every date in 'dates'."""
+        out = {}
+        active = set()
+        s = e = 0
+        for d in sorted(set(dates)):
+            while s < len(self._by_start) and self._intervals[self._by_start[s]][0] <= d:
+                active.add(self._by_start[s])
+                s += 1
+            while e < len(self._by_end) and self._intervals[self._by_end[e]][1] < d:
+                active.discard(self._by_end[e])
+                e += 1
+
+            users = dict(self.permanent) if permanent else {}
+            for i in sorted(active):
+                _start, _end, user_id, reason = self._intervals[i]
+                users.setdefault(user_id, reason)
+            out[d] = users
+        return out
+
+    def on_date(self, d, permanent=True):
+        return self.by_date([d], permanent=permanent)[d]
+
+
+def _load_rows():
+    return list(
+        MealOptOut.objects.filter(active=True)
+        .order_by("id")
+        .values_list("user_id", "scope", "date", "start_date", "end_date", "reason")
+    )
+
+
+def _current_version():
+    version = cache.get(OPTOUT_VERSION_KEY)
+    if version is None:
+        cache.add(OPTOUT_VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(OPTOUT_VERSION_KEY)
+    return version
+
+
+def get_optout_index():
+    version = _current_version()
+    if _local["version"] == version and _local["index"] is not None:
+        return _local["index"]
+
+    with _lock:
+        if _local["version"] == version and _local["index"] is not None:
+            return _local["index"]
+
+        key = OPTOUT_CACHE_KEY.format(version=version)
+        rows = cache.get(key)
+        if rows is None:
+            rows = _load_rows()
+            cache.set(key, rows, OPTOUT_CACHE_SECONDS)
+
+        index = OptOutIndex(rows)
+        _local["version"] = version
+        _local["index"] = index
+        return index
+
+
+def invalidate_optout_index():
+    cache.set(OPTOUT_VERSION_KEY, uuid.uuid4().hex, None)
+    with _lock:
+        _local["version"] = None
+        _local["index"] = None
@@ -0,0 +1,350 @@
+# meal/projection.py
+"""
+Meal projection engine: who eats on a day, as stored on CookRecord. Both
+the cook-record endpoints (meal.services) and the meal report
+(mealreport.services) go through project_cook_record().
+
+    inputs = load_day_inputs(d)         dish, people, first punches, leave, opt-outs
+    fp = input_fingerprint(inputs, p)   hash of the inputs + policy
+    project(inputs, p)                  CookRecord field values
+
+project_cook_record() keeps fp on CookRecord.input_fingerprint; when the
+stored fingerprint matches, the day is neither recomputed nor written.
+project_cook_records() does the same for a date range with one query per
+input (load_range_inputs) and one bulk upsert.
+
+Inclusion rules are a policy (settings.MEAL_PROJECTION_POLICY, dotted path;
+default CutoffPolicy). Whatever the policy says, an active opt-out
+(permanent, date or range) excludes. Every eater entry has one shape:
+
+    { emp_code, user_id, name, attended, first_punch_time, leave_type,
+      leave_status, opted_out, included, inclusion_reason }
+"""
+import hashlib
+import json
+from datetime import date as date_cls, datetime
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+from django.utils.timezone import get_default_timezone, is_naive, localtime, make_aware
+
+from .lock import DHAKA_TZ, cutoff_time
+from .models import CookRecord, Meal, MealOverride
+from .optouts import get_optout_index
+from .signals import cook_records_written
+
+DEFAULT_POLICY = "meal.projection.CutoffPolicy"
+
+
+class Person(NamedTuple):
+    emp_code: Optional[str]
+    user_id: Optional[int]
+    name: str
+
+
+class DayInputs(NamedTuple):
+    date: date_cls
+    dish: Optional[dict]     # { source, item, price, notes }, None when nothing is configured
+    people: tuple            # Person, ordered by emp_code
+    first_punch: dict        # emp_code -> earliest punch (aware, Asia/Dhaka)
+    leave: dict              # user_id -> (leave_type, status), pending / approved
+    opted_out: frozenset     # user ids with an active opt-out covering the date
+
+
+# -----------------------------------------
+# Policies
+# -----------------------------------------
+class CutoffPolicy:
+    """
+    Attendance based (the cook-record rules):
+      - punched <= cutoff (08:00)      -> INCLUDE, even if on leave
+      - 1st_half / 2nd_half leave      -> INCLUDE
+      - no punch & no leave            -> INCLUDE
+      - punched after cutoff, no leave -> EXCLUDE (protect the cook)
+      - full_day leave, no punch       -> EXCLUDE
+    Only approved leave counts. No menu configured -> 'UNSET' placeholder.
+    """
+    name = "cutoff"
+    leave_statuses = ("approved",)
+    default_dish = None
+
+    def decide(self, punch_dt, leave_type, cutoff):
+        attended = punch_dt is not None
+        if attended and punch_dt.time() <= cutoff:
+            return True, "present_before_cutoff"
+        if leave_type in ("1st_half", "2nd_half"):
+            return True, "half_day_leave_included"
+        if not attended and leave_type is None:
+            return True, "no_punch_no_leave_included"
+        if attended and leave_type is None:
+            return False, "present_after_cutoff"
+        if leave_type == "full_day" and not attended:
+            return False, "full_day_leave"
+        return False, "excluded"
+
+
+class HeadcountPolicy:
+    """
+    Everyone not on leave (pending or approved, any type) eats; punches are
+    ignored. No menu configured -> 'Regular Meal' at 70.
+    """
+    name = "headcount"
+    leave_statuses = ("approved", "pending")
+    default_dish = {"source": "weekly", "item": "Regular Meal", "price": 70.0, "notes": "Default menu"}
+
+    def decide(self, punch_dt, leave_type, cutoff):
+        if leave_type is not None:
+            return False, "on_leave"
+        return True, "headcount"
+
+
+_policy = {"path": None, "instance": None}
+
+
+def get_policy():
+    path = getattr(settings, "MEAL_PROJECTION_POLICY", DEFAULT_POLICY)
+    if _policy["path"] != path:
+        _policy["instance"] = import_string(path)()
+        _policy["path"] = path
+    return _policy["instance"]
+
+
+# -----------------------------------------
+# Inputs
+# -----------------------------------------
+def _dish(for_date, overrides, weekly):
+    """
+    MealOverride(date) -> source='override', else Meal(day=weekday) ->
+    source='weekly', else None.
+    """
+    ovr = overrides.get(for_date)
+    if ovr:
+        return {"source": "override", "item": ovr.item, "price": float(ovr.price), "notes": ovr.notes or None}
+
+    meal = weekly.get(for_date.strftime("%A").lower())
+    if meal:
+        return {"source": "weekly", "item": meal.item, "price": float(meal.price), "notes": None}
+
+    return None
+
+
+def _to_dhaka(dt):
+    """Naive datetimes are in DEFAULT_TIME_ZONE."""
+    if is_naive(dt):
+        dt = make_aware(dt, get_default_timezone())
+    return localtime(dt, DHAKA_TZ)
+
+
+def _people(directory, punch_codes):
+    """Reportable employees plus punch codes that belong to no user."""
+    people = {e.emp_code: Person(e.emp_code, e.user_id, e.name) for e in directory.reportable()}
+    for code in punch_codes:
+        if code not in people and code != "00" and directory.get(code) is None:
+            people[code] = Person(code, None, f"Emp-{code}")
+    return tuple(people[code] for code in sorted(people))
+
+
+def load_range_inputs(dates):
+    """
+    { date: DayInputs } for 'dates', loading overrides, the weekly menu,
+    punches and leave with one query each over min..max; opt-outs come
+    from the cached interval index (meal.optouts).
+    """
+    from employee.directory import get_directory
+    from employee.services import punch_summary_queryset
+    from leave.models import ACTIVE_LEAVE_STATUSES, LeaveDay
+
+    dates = sorted(set(dates))
+    if not dates:
+        return {}
+    start, end = dates[0], dates[-1]
+
+    overrides = {o.date: o for o in MealOverride.objects.filter(date__gte=start, date__lte=end)}
+    weekly = {}
+    for meal in Meal.objects.exclude(day__isnull=True).order_by("id"):
+        weekly.setdefault(meal.day, meal)
+
+    first_punch = {d: {} for d in dates}
+    for d, code, first in (punch_summary_queryset(start, end)
+                           .values_list("date", "emp_code", "first_punch")):
+        if d in first_punch:
+            first_punch[d][code] = _to_dhaka(datetime.combine(d, first))
+
+    leave = {d: {} for d in dates}
+    for d, user_id, leave_type, status in (
+        LeaveDay.objects.filter(date__gte=start, date__lte=end, status__in=ACTIVE_LEAVE_STATUSES)
+        .values_list("date", "user_id", "leave__leave_type", "status")
+    ):
+        if d in leave:
+            leave[d][user_id] = (leave_type, status)
+
+    opted_out = get_optout_index().by_date(dates)
+
+    directory = get_directory()
+    return {
+        d: DayInputs(
+            date=d,
+            dish=_dish(d, overrides, weekly),
+            people=_people(directory, first_punch[d]),
+            first_punch=first_punch[d],
+            leave=leave[d],
+            opted_out=frozenset(opted_out[d]),
+        )
+        for d in dates
+    }
+
+
+def load_day_inputs(for_date: date_cls):
+    return load_range_inputs([for_date])[for_date]
+
+
+# -----------------------------------------
+# Projection
+# -----------------------------------------
+def input_fingerprint(inputs: DayInputs, policy):
+    payload = {
+        "policy": policy.name,
+        "cutoff": cutoff_time().isoformat(),
+        "dish": inputs.dish,
+        "people": [list(p) for p in inputs.people],
+        "first_punch": sorted((code, dt.isoformat()) for code, dt in inputs.first_punch.items()),
+        "leave": sorted([uid, lt, st] for uid, (lt, st) in inputs.leave.items()),
+        "opted_out": sorted(inputs.opted_out),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def project(inputs: DayInputs, policy):
+    """CookRecord field values (everything but date / finalization) for the day."""
+    cutoff = cutoff_time()
+    dish = inputs.dish or policy.default_dish
+    if dish is None:
+        return {
+            "source": "manual", "item": "UNSET", "price": 0.0, "notes": None,
+            "present_count": 0, "on_leave_count": 0, "opt_out_count": 0, "eaters_count": 0,
+            "eaters": [], "cutoff_time": cutoff,
+        }
+
+    eaters = []
+    present = on_leave = opted_out_count = included_count = 0
+    for p in inputs.people:
+        punch_dt = inputs.first_punch.get(p.emp_code)
+        leave_type, leave_status = inputs.leave.get(p.user_id, (None, None))
+        if leave_status not in policy.leave_statuses:
+            leave_type = None
+        opted_out = p.user_id in inputs.opted_out
+
+        included, reason = policy.decide(punch_dt, leave_type, cutoff)
+        if opted_out:
+            included, reason = False, "opted_out"
+
+        present += punch_dt is not None
+        on_leave += leave_type is not None
+        opted_out_count += opted_out
+        included_count += included
+        eaters.append({
+            "emp_code": p.emp_code,
+            "user_id": p.user_id,
+            "name": p.name,
+            "attended": punch_dt is not None,
+            "first_punch_time": punch_dt.isoformat() if punch_dt else None,
+            "leave_type": leave_type,
+            "leave_status": leave_status,
+            "opted_out": opted_out,
+            "included": included,
+            "inclusion_reason": reason,
+        })
+
+    return {
+        "source": dish["source"],
+        "item": dish["item"],
+        "price": float(dish["price"]),
+        "notes": dish.get("notes"),
+        "present_count": present,
+        "on_leave_count": on_leave,
+        "opt_out_count": opted_out_count,
+        "eaters_count": included_count,
+        "eaters": eaters,
+        "cutoff_time": cutoff,
+    }
+
+
+def project_cook_record(for_date: date_cls, policy=None):
+    """The CookRecord of for_date, recomputed and saved only if its inputs changed."""
+    policy = policy or get_policy()
+    inputs = load_day_inputs(for_date)
+    fingerprint = input_fingerprint(inputs, policy)
+
+    rec = CookRecord.objects.filter(date=for_date).first()
+    if rec is not None and rec.input_fingerprint == fingerprint:
+        return rec
+
+    rec, _ = CookRecord.objects.update_or_create(
+        date=for_date,
+        defaults={**project(inputs, policy), "input_fingerprint": fingerprint},
+    )
+    return rec
+
+
+UPSERT_FIELDS = [
+    "source", "item", "price", "notes",
+    "present_count", "on_leave_count", "opt_out_count", "eaters_count", "eaters",
+    "cutoff_time", "input_fingerprint", "updated_at",
+]
+
+
+def project_cook_records(dates, policy=None, include_finalized=False):
+    """
+    project_cook_record() for many dates: inputs are loaded once for the
+    whole range (load_range_inputs) and every changed day is written with a
+    single bulk upsert. Finalized records are left alone unless
+    include_finalized. Returns { written, unchanged, finalized } date lists.
+    """
+    from employee.services import upsert_kwargs
+
+    policy = policy or get_policy()
+    dates = sorted(set(dates))
+    stats = {"written": [], "unchanged": [], "finalized": []}
+    if not dates:
+        return stats
+
+    existing = {
+        d: (fingerprint, finalized)
+        for d, fingerprint, finalized in (
+            CookRecord.objects.filter(date__gte=dates[0], date__lte=dates[-1])
+            .values_list("date", "input_fingerprint", "is_finalized")
+        )
+    }
+
+    objs = []
+    for d, inputs in load_range_inputs(dates).items():
+        fingerprint = input_fingerprint(inputs, policy)
+        stored_fingerprint, finalized = existing.get(d, (None, False))
+        if finalized and not include_finalized:
+            stats["finalized"].append(d)
+        elif stored_fingerprint == fingerprint:
+            stats["unchanged"].append(d)
+        else:
+            objs.append(CookRecord(date=d, input_fingerprint=fingerprint, **project(inputs, policy)))
+            stats["written"].append(d)
+
+    if objs:
+        CookRecord.objects.bulk_create(
+            objs,
+            batch_size=500,
+            **upsert_kwargs(CookRecord, unique_fields=["date"], update_fields=UPSERT_FIELDS),
+        )
+        cook_records_written.send(sender=CookRecord, dates=stats["written"])
+    return stats
+
+
+def eater_user_ids(rec):
+    """User ids of the included eaters (also reads the old bare-id lists)."""
+    ids = []
+    for e in rec.eaters or []:
+        if isinstance(e, int):
+            ids.append(e)
+        elif isinstance(e, dict) and e.get("included") and e.get("user_id"):
+            ids.append(e["user_id"])
+    return ids
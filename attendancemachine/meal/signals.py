@@ -0,0 +1,19 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from .models import MealOptOut
+from .optouts import invalidate_optout_index
+
+# Sent by meal.projection.project_cook_records() after its bulk upsert,
+# which bypasses the CookRecord save signals.
+#   dates: [date, ...] CookRecords written
+cook_records_written = Signal()
+
+
+# Also fires for opt-outs deleted by CASCADE with their user
+@receiver(post_save, sender=MealOptOut)
+@receiver(post_delete, sender=MealOptOut)
+def drop_optout_index(sender, instance, **kwargs):
+    # After commit, so no process re-caches the index from pre-commit rows
+    transaction.on_commit(invalidate_optout_index)
@@ -1,3 +1,180 @@
-from django.test import TestCase
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from employee.directory import invalidate_directory
+from employee.models import DailyPunchSummary
+from leave.models import Leave
+from . import optouts, projection
+from .models import CookRecord, Meal, MealOptOut, MealOverride
+from .services import generate_cook_records
+from .signals import cook_records_written
+
+LOCMEM = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+# -------------------------------------------------
+# Range generation
+# -------------------------------------------------
+@override_settings(CACHES=LOCMEM)
+class GenerateCookRecordsTests(TestCase):
+    MON, TUE, WED, THU = date(2025, 3, 10), date(2025, 3, 11), date(2025, 3, 12), date(2025, 3, 13)
+
+    def setUp(self):
+        cache.clear()
+        # Wednesday 09:00 Asia/Dhaka: today's record is locked
+        now = mock.patch("django.utils.timezone.now",
+                         return_value=datetime(2025, 3, 12, 3, 0, tzinfo=dt_timezone.utc))
+        now.start()
+        self.addCleanup(now.stop)
+
+    def test_locked_today_is_kept(self):
+        stats = generate_cook_records(self.MON, self.THU)
+        self.assertEqual(stats["written"], [self.MON, self.TUE, self.THU])
+        self.assertEqual(stats["locked"], [self.WED])
+        self.assertFalse(CookRecord.objects.filter(date=self.WED).exists())
+
+    def test_force_writes_today(self):
+        stats = generate_cook_records(self.MON, self.THU, force=True)
+        self.assertEqual(stats["written"], [self.MON, self.TUE, self.WED, self.THU])
+        self.assertEqual(stats["locked"], [])
+
+    def test_finalized_records_are_kept(self):
+        generate_cook_records(self.MON, self.TUE)
+        CookRecord.objects.filter(date=self.MON).update(is_finalized=True, input_fingerprint="old")
+        CookRecord.objects.filter(date=self.TUE).update(input_fingerprint="old")
+
+        stats = generate_cook_records(self.MON, self.TUE)
+        self.assertEqual((stats["finalized"], stats["written"]), ([self.MON], [self.TUE]))
+
+
+# -------------------------------------------------
+# Projection fingerprints
+# -------------------------------------------------
+@override_settings(CACHES=LOCMEM)
+class ProjectionFingerprintTests(TestCase):
+    MON, TUE = date(2025, 3, 10), date(2025, 3, 11)
+
+    def setUp(self):
+        cache.clear()
+        self.ann = User.objects.create_user("ann", "ann@example.com", "pw", first_name="Ann")
+        self.ann.profile.emp_code = "101"
+        self.ann.profile.save()
+        invalidate_directory()
+        optouts.invalidate_optout_index()
+        Meal.objects.create(day="monday", item="Chicken Curry", price=60)
+        Meal.objects.create(day="tuesday", item="Fish Fry", price=65)
+
+        self.written = []
+        handler = lambda sender, dates, **kwargs: self.written.append(list(dates))
+        cook_records_written.connect(handler)
+        self.addCleanup(cook_records_written.disconnect, handler)
+
+    def test_unchanged_inputs_are_not_rewritten(self):
+        stats = projection.project_cook_records([self.MON, self.TUE])
+        self.assertEqual(stats["written"], [self.MON, self.TUE])
+        stamps = dict(CookRecord.objects.values_list("date", "updated_at"))
+
+        stats = projection.project_cook_records([self.MON, self.TUE])
+        self.assertEqual((stats["written"], stats["unchanged"]), ([], [self.MON, self.TUE]))
+        self.assertEqual(dict(CookRecord.objects.values_list("date", "updated_at")), stamps)
+        self.assertEqual(self.written, [[self.MON, self.TUE]])
+
+        rec = CookRecord.objects.get(date=self.MON)
+        self.assertEqual(projection.project_cook_record(self.MON).updated_at, rec.updated_at)
+
+    def test_changed_inputs_are_rewritten(self):
+        projection.project_cook_records([self.MON, self.TUE])
+        before = dict(CookRecord.objects.values_list("date", "input_fingerprint"))
+
+        MealOverride.objects.create(date=self.TUE, item="Biriyani", price=90)
+        Leave.objects.create(user=self.ann, leave_type="full_day", reason="sick",
+                             date=[self.MON.isoformat()], status="approved")
+
+        stats = projection.project_cook_records([self.MON, self.TUE])
+        self.assertEqual(stats["written"], [self.MON, self.TUE])
+        after = dict(CookRecord.objects.values_list("date", "input_fingerprint"))
+        self.assertNotEqual(after[self.MON], before[self.MON])
+        self.assertNotEqual(after[self.TUE], before[self.TUE])
+
+        mon, tue = CookRecord.objects.order_by("date")
+        self.assertEqual((tue.source, tue.item, tue.price), ("override", "Biriyani", 90.0))
+        self.assertEqual(mon.eaters[0]["inclusion_reason"], "full_day_leave")
+        self.assertEqual((mon.on_leave_count, mon.eaters_count), (1, 0))
+
+    def test_punch_changes_the_fingerprint(self):
+        inputs = projection.load_day_inputs(self.MON)
+        policy = projection.CutoffPolicy()
+        before = projection.input_fingerprint(inputs, policy)
+        self.assertEqual(projection.input_fingerprint(projection.load_day_inputs(self.MON), policy), before)
+
+        DailyPunchSummary.objects.create(emp_code="101", date=self.MON, first_punch=time(1, 30),
+                                         last_punch=time(11, 0), punch_count=2)
+        self.assertNotEqual(projection.input_fingerprint(projection.load_day_inputs(self.MON), policy), before)
+        # Same inputs under another policy
+        self.assertNotEqual(projection.input_fingerprint(inputs, projection.HeadcountPolicy()), before)
+
+
+# -------------------------------------------------
+# Opt-out interval index
+# -------------------------------------------------
+class OptOutIndexTests(TestCase):
+    D = [date(2025, 3, 10) + timedelta(days=i) for i in range(6)]
+
+    def index(self, *rows):
+        return optouts.OptOutIndex(rows)
+
+    def test_sweep_matches_a_per_date_scan(self):
+        rows = [
+            (1, "range", None, self.D[1], self.D[3], "trip"),
+            (2, "date", self.D[2], None, None, "fasting"),
+            (3, "range", self.D[0], self.D[5], self.D[5], "one day range"),
+            (4, "range", None, self.D[4], self.D[2], "backwards, ignored"),
+            (5, "date", None, None, None, "no date, ignored"),
+            (6, "permanent", None, None, None, "vegetarian"),
+        ]
+        by_date = self.index(*rows).by_date(reversed(self.D))
+        self.assertEqual(list(by_date), self.D)
+        for d in self.D:
+            expected = {6: "vegetarian"}
+            for user_id, scope, on, start, end, reason in rows[:3]:
+                if (scope == "date" and on == d) or (scope == "range" and start <= d <= end):
+                    expected[user_id] = reason
+            self.assertEqual(by_date[d], expected, d)
+
+    def test_permanent_can_be_left_out(self):
+        index = self.index(
+            (1, "permanent", None, None, None, "vegetarian"),
+            (2, "date", self.D[0], None, None, "fasting"),
+        )
+        self.assertEqual(index.on_date(self.D[0], permanent=False), {2: "fasting"})
+        self.assertEqual(index.on_date(self.D[1]), {1: "vegetarian"})
+
+    def test_first_opt_out_gives_the_reason(self):
+        index = self.index(
+            (1, "range", None, self.D[0], self.D[2], "trip"),
+            (1, "date", self.D[1], None, None, "fasting"),
+        )
+        self.assertEqual(index.on_date(self.D[1]), {1: "trip"})
+
+
+@override_settings(CACHES=LOCMEM)
+class OptOutIndexCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        optouts.invalidate_optout_index()
+        self.ann = User.objects.create_user("ann", "ann@example.com", "pw")
+
+    def test_saved_opt_outs_show_after_commit(self):
+        d = date(2025, 3, 10)
+        self.assertEqual(optouts.get_optout_index().on_date(d), {})
+        with self.assertNumQueries(0):
+            optouts.get_optout_index()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            MealOptOut.objects.create(user=self.ann, scope="date", date=d, reason="fasting")
+            MealOptOut.objects.create(user=self.ann, scope="permanent", reason="off", active=False)
+        self.assertEqual(optouts.get_optout_index().on_date(d), {self.ann.pk: "fasting"})
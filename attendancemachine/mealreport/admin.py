@@ -1,8 +1,14 @@
 from django.contrib import admin
-from .models import MealPayment
+from .models import MealMonthlyRollup, MealPayment
 
 @admin.register(MealPayment)
 class MealPaymentAdmin(admin.ModelAdmin):
     list_display = ("date", "amount", "currency", "method", "status", "paid_by", "paid_at")
     list_filter = ("status", "method", "currency")
     search_fields = ("date", "transaction_id", "invoice_number", "paid_by__username")
+
+
+@admin.register(MealMonthlyRollup)
+class MealMonthlyRollupAdmin(admin.ModelAdmin):
+    list_display = ("month", "days", "meals", "cost", "paid_days", "unpaid_days", "unpaid_amount", "unmatched_paid_amount", "opt_outs", "updated_at")
+    readonly_fields = ("updated_at",)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class MealreportConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'mealreport'
+
+    def ready(self):
+        import mealreport.signals  # noqa: F401  (CookRecord dirty flags, monthly rollups)
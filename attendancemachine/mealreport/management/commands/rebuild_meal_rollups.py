@@ -0,0 +1,56 @@
+# mealreport/management/commands/rebuild_meal_rollups.py
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+
+from meal.models import CookRecord
+from mealreport.models import MealPayment
+from mealreport.rollups import month_start, rebuild_month_rollups
+
+
+def _parse_month(value):
+    try:
+        return datetime.strptime(value, "%Y-%m").date()
+    except ValueError:
+        raise CommandError(f"Invalid month '{value}', expected YYYY-MM")
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the monthly meal cost / consumption rollups from CookRecords and "
+        "payments (every month with data by default)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First month, YYYY-MM')
+        parser.add_argument('--end', help='Last month, YYYY-MM (default: --start)')
+
+    def handle(self, *args, **options):
+        if options['start']:
+            start = _parse_month(options['start'])
+            end = _parse_month(options['end']) if options['end'] else start
+        else:
+            bounds = [
+                CookRecord.objects.filter(is_finalized=True).aggregate(lo=Min('date'), hi=Max('date')),
+                MealPayment.objects.aggregate(lo=Min('date'), hi=Max('date')),
+            ]
+            los = [b['lo'] for b in bounds if b['lo']]
+            his = [b['hi'] for b in bounds if b['hi']]
+            if not los:
+                self.stdout.write("No finalized cook records or payments, nothing to rebuild.")
+                return
+            start, end = month_start(min(los)), month_start(max(his))
+        if end < start:
+            raise CommandError("--end must not be before --start")
+
+        months = []
+        m = start
+        while m <= end:
+            months.append(m)
+            m = (m.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+        rebuilt = rebuild_month_rollups(months)
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {len(rebuilt)} monthly rollup(s): {start:%Y-%m}..{end:%Y-%m}"
+        ))
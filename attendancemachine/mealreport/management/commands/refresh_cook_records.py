@@ -0,0 +1,18 @@
+# mealreport/management/commands/refresh_cook_records.py
+from django.core.management.base import BaseCommand
+
+from mealreport.services import refresh_cook_records
+
+
+class Command(BaseCommand):
+    help = (
+        "Regenerate the meal report's upcoming CookRecords that are missing or "
+        "marked dirty (runs every minute from cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Regenerate every date of the window')
+
+    def handle(self, *args, **options):
+        count = refresh_cook_records(force=options['force'])
+        self.stdout.write(self.style.SUCCESS(f"Regenerated {count} cook record(s)"))
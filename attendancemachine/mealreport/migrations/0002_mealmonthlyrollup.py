@@ -0,0 +1,35 @@
+# Generated by Django 5.2.4 on 2026-10-17 00:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mealreport', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MealMonthlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(unique=True)),
+                ('days', models.IntegerField(default=0)),
+                ('meals', models.IntegerField(default=0)),
+                ('cost', models.FloatField(default=0)),
+                ('headcount', models.IntegerField(default=0)),
+                ('opt_outs', models.IntegerField(default=0)),
+                ('paid_days', models.IntegerField(default=0)),
+                ('paid_amount', models.FloatField(default=0)),
+                ('unpaid_days', models.IntegerField(default=0)),
+                ('unpaid_amount', models.FloatField(default=0)),
+                ('daily', models.JSONField(blank=True, default=list)),
+                ('per_employee', models.JSONField(blank=True, default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['-month'],
+            },
+        ),
+    ]
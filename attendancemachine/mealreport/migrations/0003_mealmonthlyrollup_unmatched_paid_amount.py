@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-17 00:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mealreport', '0002_mealmonthlyrollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mealmonthlyrollup',
+            name='unmatched_paid_amount',
+            field=models.FloatField(default=0),
+        ),
+    ]
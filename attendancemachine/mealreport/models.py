@@ -44,3 +44,37 @@ class MealPayment(models.Model):
     def __str__(self):
         who = getattr(self.paid_by, "username", "system")
         return f"{self.date} – {self.amount} {self.currency} via {self.method} by {who}"
+
+
+class MealMonthlyRollup(models.Model):
+    """
+    Meal cost / consumption of one month's finalized CookRecords and their
+    payments (mealreport.rollups). Rebuilt per month when a day in it is
+    finalized or paid.
+    """
+    month = models.DateField(unique=True)  # first day of the month
+
+    days = models.IntegerField(default=0)           # finalized meal days
+    meals = models.IntegerField(default=0)          # sum of eaters_count
+    cost = models.FloatField(default=0)             # sum of price * eaters_count
+    headcount = models.IntegerField(default=0)      # people evaluated over the days
+    opt_outs = models.IntegerField(default=0)       # sum of opt_out_count
+
+    paid_days = models.IntegerField(default=0)
+    paid_amount = models.FloatField(default=0)      # successful payments of its finalized days
+    unpaid_days = models.IntegerField(default=0)
+    unpaid_amount = models.FloatField(default=0)    # cost of the days without one
+    unmatched_paid_amount = models.FloatField(default=0)  # successful payments of days not finalized
+
+    # [{date, source, item, price, meals, cost, opt_outs, paid, paid_amount}]
+    daily = models.JSONField(default=list, blank=True)
+    # [{user_id, emp_code, name, meals, cost, opt_out_days}]
+    per_employee = models.JSONField(default=list, blank=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-month"]
+
+    def __str__(self):
+        return f"{self.month:%Y-%m} – {self.days} days, {self.cost} BDT"
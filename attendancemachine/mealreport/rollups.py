@@ -0,0 +1,192 @@
+# mealreport/rollups.py
+"""
+Monthly meal cost / consumption rollups (MealMonthlyRollup).
+
+A month is rebuilt as a whole from its finalized CookRecords (price,
+eaters_count, opt_out_count, per-employee eater entries) and its
+MealPayments: one query each, then one upsert. paid_amount covers the
+finalized days only; payments for other days are unmatched_paid_amount. Only the months touched by
+a change are rebuilt (mealreport/signals.py):
+
+  - CookRecord finalized, re-saved while finalized, or deleted
+  - cook_records_written (bulk generation) for finalized dates
+  - MealPayment saved / deleted
+
+rollup_range() serves the analytics endpoint from those rows.
+rebuild_meal_rollups (command) rebuilds any or every month.
+"""
+from datetime import date as date_cls, timedelta
+
+from django.db import transaction
+
+from employee.services import upsert_kwargs
+from meal.models import CookRecord
+from .models import MealMonthlyRollup, MealPayment
+
+ROLLUP_FIELDS = [
+    "days", "meals", "cost", "headcount", "opt_outs",
+    "paid_days", "paid_amount", "unpaid_days", "unpaid_amount", "unmatched_paid_amount",
+    "daily", "per_employee", "updated_at",
+]
+TOTAL_FIELDS = ROLLUP_FIELDS[:10]
+
+
+def month_start(d):
+    return d.replace(day=1)
+
+
+def month_end(month):
+    return (month.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+
+
+def _eater_entries(eaters):
+    """(key, user_id, emp_code, name, included, opted_out) per entry; bare ids are eaters."""
+    for e in eaters or []:
+        if isinstance(e, int):
+            yield f"u{e}", e, None, None, True, False
+        elif isinstance(e, dict):
+            key = f"u{e['user_id']}" if e.get("user_id") else f"c{e.get('emp_code')}"
+            yield (key, e.get("user_id"), e.get("emp_code"), e.get("name"),
+                   bool(e.get("included")), bool(e.get("opted_out")))
+
+
+def _empty_month(month):
+    return {"month": month, "days": 0, "meals": 0, "cost": 0.0, "headcount": 0, "opt_outs": 0,
+            "paid_days": 0, "paid_amount": 0.0, "unpaid_days": 0, "unpaid_amount": 0.0,
+            "unmatched_paid_amount": 0.0, "daily": [], "employees": {}}
+
+
+def rebuild_month_rollups(months):
+    """
+    Rebuild MealMonthlyRollup for the given months (any date inside each
+    month will do). Returns the rebuilt month starts.
+    """
+    months = sorted({month_start(m) for m in months})
+    if not months:
+        return []
+    start, end = months[0], month_end(months[-1])
+
+    payments = {
+        p.date: p
+        for p in MealPayment.objects.filter(date__gte=start, date__lte=end).only("date", "amount", "status")
+    }
+    records = (
+        CookRecord.objects.filter(date__gte=start, date__lte=end, is_finalized=True)
+        .order_by("date")
+        .values_list("date", "source", "item", "price", "eaters_count", "opt_out_count", "eaters")
+    )
+
+    acc = {m: _empty_month(m) for m in months}
+    for d, source, item, price, meals, opt_outs, eaters in records:
+        m = acc.get(month_start(d))
+        if m is None:
+            continue
+        price = float(price or 0)
+        meals = int(meals or 0)
+        opt_outs = int(opt_outs or 0)
+        cost = price * meals
+        pay = payments.get(d)
+        paid = bool(pay and pay.status == "success")
+
+        entries = list(_eater_entries(eaters))
+        dict_entries = [e for e in eaters or [] if isinstance(e, dict)]
+        m["days"] += 1
+        m["meals"] += meals
+        m["cost"] += cost
+        m["opt_outs"] += opt_outs
+        m["headcount"] += len(dict_entries) if dict_entries else meals + opt_outs
+        if paid:
+            m["paid_days"] += 1
+            m["paid_amount"] += float(pay.amount or 0)
+        else:
+            m["unpaid_days"] += 1
+            m["unpaid_amount"] += cost
+        m["daily"].append({
+            "date": d.isoformat(), "source": source, "item": item, "price": price,
+            "meals": meals, "cost": cost, "opt_outs": opt_outs,
+            "paid": paid, "paid_amount": float(pay.amount) if paid else None,
+        })
+
+        for key, user_id, emp_code, name, included, opted_out in entries:
+            emp = m["employees"].setdefault(key, {
+                "user_id": user_id, "emp_code": emp_code, "name": name,
+                "meals": 0, "cost": 0.0, "opt_out_days": 0,
+            })
+            if included:
+                emp["meals"] += 1
+                emp["cost"] += price
+            if opted_out:
+                emp["opt_out_days"] += 1
+
+    # Payments for days not (yet) finalized stay out of paid_amount, which
+    # must match paid_days; they are reported on their own
+    finalized = {day["date"] for m in acc.values() for day in m["daily"]}
+    for d, pay in payments.items():
+        if pay.status == "success" and month_start(d) in acc and d.isoformat() not in finalized:
+            acc[month_start(d)]["unmatched_paid_amount"] += float(pay.amount or 0)
+
+    objs = []
+    for m in acc.values():
+        employees = sorted(m.pop("employees").values(), key=lambda e: (e["emp_code"] or "", e["user_id"] or 0))
+        objs.append(MealMonthlyRollup(per_employee=employees, **m))
+
+    MealMonthlyRollup.objects.bulk_create(
+        objs,
+        **upsert_kwargs(MealMonthlyRollup, unique_fields=["month"], update_fields=ROLLUP_FIELDS),
+    )
+    return months
+
+
+def schedule_rollups(dates):
+    """Rebuild the months of 'dates' once the current transaction commits."""
+    months = {month_start(d) for d in dates if isinstance(d, date_cls)}
+    if months:
+        transaction.on_commit(lambda: rebuild_month_rollups(months))
+
+
+# -----------------------------------------
+# Range read
+# -----------------------------------------
+def _rates(row):
+    days, meals, headcount = row["days"], row["meals"], row["headcount"]
+    row["cost_per_day"] = round(row["cost"] / days, 2) if days else 0.0
+    row["cost_per_meal"] = round(row["cost"] / meals, 2) if meals else 0.0
+    row["opt_out_rate"] = round(row["opt_outs"] / headcount, 4) if headcount else 0.0
+    row["paid_rate"] = round(row["paid_days"] / days, 4) if days else 0.0
+    return row
+
+
+def rollup_range(start_month, end_month, include_daily=False):
+    """
+    { months: [...], totals: {...}, per_employee: [...] } for the months
+    start_month..end_month (inclusive), read from MealMonthlyRollup.
+    """
+    rows = MealMonthlyRollup.objects.filter(
+        month__gte=month_start(start_month), month__lte=month_start(end_month)
+    ).order_by("month")
+
+    totals = {f: 0 for f in TOTAL_FIELDS}
+    employees = {}
+    months = []
+    for r in rows:
+        row = {"month": r.month.strftime("%Y-%m")}
+        row.update({f: getattr(r, f) for f in TOTAL_FIELDS})
+        for f in TOTAL_FIELDS:
+            totals[f] += row[f]
+        if include_daily:
+            row["daily"] = r.daily
+        months.append(_rates(row))
+
+        for e in r.per_employee:
+            key = (e["user_id"], e["emp_code"] if not e["user_id"] else None)
+            merged = employees.setdefault(key, {**e, "meals": 0, "cost": 0.0, "opt_out_days": 0})
+            merged["meals"] += e["meals"]
+            merged["cost"] += e["cost"]
+            merged["opt_out_days"] += e["opt_out_days"]
+            merged["name"] = e["name"] or merged["name"]
+
+    return {
+        "months": months,
+        "totals": _rates(totals),
+        "per_employee": sorted(employees.values(), key=lambda e: (e["emp_code"] or "", e["user_id"] or 0)),
+    }
@@ -0,0 +1,115 @@
+# mealreport/services.py
+"""
+CookRecord projections behind the meal report (computed by meal.projection).
+
+The daily report list only reads. refresh_cook_records() — the per-minute
+cron job and the refresh_cook_records command — regenerates the report
+window's dates whose CookRecord is missing or dirty. mark_cook_dates_dirty()
+sets CookRecord.dirty_at when something the snapshot depends on changes:
+
+  - leaves          leave.services.sync_leave_days, leave.bulk, Leave delete
+  - punches         punches_recorded (the cutoff policy reads punch times)
+  - opt-outs, overrides, weekly menu, users, emp_codes    mealreport/signals.py
+
+Records are marked dirty after the change commits, and only marked clean
+again if not marked dirty after their regeneration started. Finalized records are never regenerated here.
+"""
+from datetime import date as date_cls, timedelta
+from django.db import transaction
+from django.utils import timezone
+
+from meal.models import CookRecord
+from meal.projection import project_cook_record, project_cook_records
+
+REPORT_DAYS = 7
+
+
+# -----------------------------------------
+# Core Generator
+# -----------------------------------------
+def generate_cook_record(for_date: date_cls):
+    """CookRecord for a weekday via the meal projection engine; None on weekends."""
+    if for_date.weekday() in (5, 6):  # weekend skip
+        return None
+    return project_cook_record(for_date)
+
+
+# -----------------------------------------
+# Refresh
+# -----------------------------------------
+def report_dates(today=None):
+    """Weekdays among the 7 days from today (from Monday on a weekend)."""
+    today = today or date_cls.today()
+    weekday = today.weekday()
+    if weekday == 5:
+        today += timedelta(days=2)
+    elif weekday == 6:
+        today += timedelta(days=1)
+
+    days = (today + timedelta(days=i) for i in range(REPORT_DAYS))
+    return [d for d in days if d.weekday() < 5]
+
+
+def _as_dates(values):
+    out = set()
+    for v in values:
+        if isinstance(v, date_cls):
+            out.add(v)
+            continue
+        try:
+            out.add(date_cls.fromisoformat(str(v)))
+        except ValueError:
+            continue
+    return out
+
+
+def mark_cook_dates_dirty(dates=None, start=None, end=None):
+    """
+    Flag upcoming CookRecords (today on) for regeneration: 'dates' (date
+    objects or ISO strings), else the start..end range (either side open),
+    else all of them.
+
+    The stamp is written once the current transaction commits (at once in
+    autocommit): stamped earlier, a refresh running meanwhile would rebuild
+    from the uncommitted state, then clear the flag since dirty_at predates
+    its start.
+    """
+    qs = CookRecord.objects.filter(date__gte=date_cls.today())
+    if dates is not None:
+        dates = _as_dates(dates)
+        if not dates:
+            return
+        qs = qs.filter(date__in=dates)
+    else:
+        if start is not None:
+            qs = qs.filter(date__gte=start)
+        if end is not None:
+            qs = qs.filter(date__lte=end)
+    transaction.on_commit(lambda: qs.update(dirty_at=timezone.now()))
+
+
+def refresh_cook_records(today=None, force=False):
+    """
+    Regenerate the report window's CookRecords that are missing or dirty
+    (every unfinalized one with force). Returns the number regenerated.
+    """
+    started = timezone.now()
+    dates = report_dates(today)
+    state = {
+        d: (dirty_at, finalized)
+        for d, dirty_at, finalized in (
+            CookRecord.objects.filter(date__in=dates).values_list("date", "dirty_at", "is_finalized")
+        )
+    }
+    stale = [
+        d for d in dates
+        if d not in state or (not state[d][1] and (force or state[d][0] is not None))
+    ]
+
+    if stale:
+        project_cook_records(stale)
+        CookRecord.objects.filter(date__in=stale, dirty_at__lte=started).update(dirty_at=None)
+
+    if stale:
+        print(f"🍽️ [mealreport] regenerated {len(stale)} cook record(s): {', '.join(map(str, stale))}")
+    return len(stale)
@@ -0,0 +1,121 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from employee.signals import punches_recorded
+from leave.models import Leave
+from meal.models import CookRecord, Meal, MealOptOut, MealOverride
+from meal.signals import cook_records_written
+from profiles.models import Profile
+from .models import MealPayment
+from .rollups import schedule_rollups
+from .services import mark_cook_dates_dirty
+
+User = get_user_model()
+
+
+# Leave saves are covered by leave.services.sync_leave_days; a deleted leave's
+# LeaveDay rows go by CASCADE without it.
+@receiver(post_delete, sender=Leave)
+def dirty_cook_dates_for_leave(sender, instance, **kwargs):
+    mark_cook_dates_dirty(instance.date or [])
+
+
+def _optout_span(scope, date, start_date, end_date):
+    if scope == "date":
+        return {"dates": [date] if date else []}
+    if scope == "range":
+        return {"start": start_date, "end": end_date}
+    return {}  # permanent: every upcoming date
+
+
+@receiver(pre_save, sender=MealOptOut)
+@receiver(pre_save, sender=MealOverride)
+def remember_previous_dates(sender, instance, **kwargs):
+    # An edit can move an opt-out / override away from dates it covered
+    instance._previous = None
+    if instance.pk:
+        fields = ("scope", "date", "start_date", "end_date") if sender is MealOptOut else ("date",)
+        instance._previous = sender.objects.filter(pk=instance.pk).values_list(*fields).first()
+
+
+@receiver(post_save, sender=MealOptOut)
+@receiver(post_delete, sender=MealOptOut)
+def dirty_cook_dates_for_optout(sender, instance, **kwargs):
+    spans = [(instance.scope, instance.date, instance.start_date, instance.end_date)]
+    if getattr(instance, "_previous", None):
+        spans.append(instance._previous)
+    for span in spans:
+        mark_cook_dates_dirty(**_optout_span(*span))
+
+
+@receiver(post_save, sender=MealOverride)
+@receiver(post_delete, sender=MealOverride)
+def dirty_cook_dates_for_override(sender, instance, **kwargs):
+    dates = [instance.date]
+    if getattr(instance, "_previous", None):
+        dates.append(instance._previous[0])
+    mark_cook_dates_dirty(dates)
+
+
+@receiver(post_save, sender=Meal)
+@receiver(post_delete, sender=Meal)
+def dirty_cook_dates_for_menu(sender, instance, **kwargs):
+    mark_cook_dates_dirty()
+
+
+# The cutoff policy includes / excludes by punch time
+@receiver(punches_recorded)
+def dirty_cook_dates_for_punches(sender, keys, **kwargs):
+    mark_cook_dates_dirty(d for _, d in keys)
+
+
+@receiver(pre_save, sender=Profile)
+def remember_previous_emp_code(sender, instance, **kwargs):
+    # Every User save (logins too) re-saves the profile; only a new emp_code
+    # changes which punches are the user's
+    instance._previous_emp_code = None
+    if instance.pk:
+        instance._previous_emp_code = (
+            Profile.objects.filter(pk=instance.pk).values_list("emp_code", flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def dirty_cook_dates_for_profile(sender, instance, signal, **kwargs):
+    if signal is post_save and instance.emp_code == getattr(instance, "_previous_emp_code", None):
+        return
+    mark_cook_dates_dirty()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def dirty_cook_dates_for_user(sender, instance, signal, update_fields=None, **kwargs):
+    # Logins only touch last_login
+    if signal is post_save and update_fields is not None and set(update_fields) == {"last_login"}:
+        return
+    mark_cook_dates_dirty()
+
+
+# -----------------------------------------
+# Monthly rollups
+# -----------------------------------------
+@receiver(post_save, sender=CookRecord)
+def rollup_finalized_cook_record(sender, instance, **kwargs):
+    # Upcoming projections change every minute; only finalized days count
+    if instance.is_finalized:
+        schedule_rollups([instance.date])
+
+
+@receiver(post_delete, sender=CookRecord)
+@receiver(post_save, sender=MealPayment)
+@receiver(post_delete, sender=MealPayment)
+def rollup_cook_record_or_payment(sender, instance, **kwargs):
+    schedule_rollups([instance.date])
+
+
+@receiver(cook_records_written)
+def rollup_written_cook_records(sender, dates, **kwargs):
+    finalized = CookRecord.objects.filter(date__in=dates, is_finalized=True).values_list("date", flat=True)
+    schedule_rollups(list(finalized))
@@ -1,3 +1,115 @@
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from employee.signals import punches_recorded
+from meal.models import CookRecord
+from .models import MealMonthlyRollup, MealPayment
+
+
+# -------------------------------------------------
+# Dirty flags
+# -------------------------------------------------
+class CookRecordDirtyTests(TestCase):
+    def setUp(self):
+        self.today = date.today()
+        self.user = User.objects.create_user("ann", "ann@example.com", "pw")
+        CookRecord.objects.bulk_create([
+            CookRecord(date=self.today + timedelta(days=i), price=50) for i in range(3)
+        ])
+
+    def dirty(self):
+        return sorted(CookRecord.objects.exclude(dirty_at=None).values_list("date", flat=True))
+
+    def test_dirty_stamp_waits_for_commit(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            punches_recorded.send(sender=None, keys=[("101", self.today)])
+            self.assertEqual(self.dirty(), [])
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(self.dirty(), [self.today])
+
+    def test_new_emp_code_marks_the_upcoming_window(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.profile.emp_code = "101"
+            self.user.profile.save()
+        self.assertEqual(len(self.dirty()), 3)
+
+    def test_login_leaves_the_records_alone(self):
+        self.user.profile.emp_code = "101"
+        self.user.profile.save()
+        CookRecord.objects.update(dirty_at=None)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save(update_fields=["last_login"])    # re-saves the profile too
+        self.assertEqual(self.dirty(), [])
+
+    def test_profile_delete_marks_the_upcoming_window(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.profile.delete()
+        self.assertEqual(len(self.dirty()), 3)
+
+
+# -------------------------------------------------
+# Monthly rollups
+# -------------------------------------------------
+class MealRollupTests(TestCase):
+    MAR3, MAR4, MAR5 = date(2025, 3, 3), date(2025, 3, 4), date(2025, 3, 5)
+
+    def setUp(self):
+        eater = lambda user_id, included, opted_out=False: {
+            "emp_code": str(100 + user_id), "user_id": user_id, "name": f"Emp {user_id}",
+            "included": included, "opted_out": opted_out,
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            CookRecord.objects.create(date=self.MAR3, source="weekly", item="Curry", price=60,
+                                      eaters_count=2, opt_out_count=1, is_finalized=True,
+                                      eaters=[eater(1, True), eater(2, True), eater(3, False, True)])
+            CookRecord.objects.create(date=self.MAR4, source="weekly", item="Fish", price=50,
+                                      eaters_count=1, is_finalized=True,
+                                      eaters=[eater(1, True), eater(2, False)])
+            CookRecord.objects.create(date=self.MAR5, source="weekly", item="Dal", price=40,
+                                      eaters_count=1, eaters=[eater(1, True)])
+            MealPayment.objects.create(date=self.MAR3, amount=120, status="success")
+            MealPayment.objects.create(date=self.MAR4, amount=50, status="failed")
+            MealPayment.objects.create(date=self.MAR5, amount=40, status="success")
+
+    def totals(self):
+        return MealMonthlyRollup.objects.filter(month=date(2025, 3, 1)).values(
+            "days", "meals", "cost", "headcount", "opt_outs",
+            "paid_days", "paid_amount", "unpaid_days", "unpaid_amount", "unmatched_paid_amount",
+        ).get()
+
+    def test_paid_unpaid_and_unmatched(self):
+        self.assertEqual(self.totals(), {
+            "days": 2, "meals": 3, "cost": 170.0, "headcount": 5, "opt_outs": 1,
+            "paid_days": 1, "paid_amount": 120.0, "unpaid_days": 1, "unpaid_amount": 50.0,
+            "unmatched_paid_amount": 40.0,
+        })
+        per_employee = MealMonthlyRollup.objects.get().per_employee
+        self.assertEqual([(e["user_id"], e["meals"], e["cost"], e["opt_out_days"]) for e in per_employee],
+                         [(1, 2, 110.0, 0), (2, 1, 60.0, 0), (3, 0, 0.0, 1)])
+
+    def test_finalizing_a_paid_day_moves_its_payment(self):
+        rec = CookRecord.objects.get(date=self.MAR5)
+        rec.is_finalized = True
+        with self.captureOnCommitCallbacks(execute=True):
+            rec.save()
+
+        totals = self.totals()
+        self.assertEqual((totals["days"], totals["paid_days"], totals["paid_amount"]), (3, 2, 160.0))
+        self.assertEqual(totals["unmatched_paid_amount"], 0.0)
+
+    def test_analytics_is_admin_only(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user("ann", "ann@example.com", "pw"))
+        self.assertEqual(client.get("/api/mealreport/analytics/", {"start": "2025-03"}).status_code, 403)
 
-# Create your tests here.
+        client.force_authenticate(User.objects.create_user("frahman", "frahman@example.com", "pw"))
+        response = client.get("/api/mealreport/analytics/", {"start": "2025-03", "end": "2025-04"})
+        self.assertEqual(response.status_code, 200)
+        totals = response.data["totals"]
+        self.assertEqual((totals["cost"], totals["paid_amount"], totals["unmatched_paid_amount"]),
+                         (170.0, 120.0, 40.0))
+        self.assertEqual(totals["paid_rate"], 0.5)
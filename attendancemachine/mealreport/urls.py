@@ -6,6 +6,7 @@ from .views import (
     MealDailyAbsenteesView,
     MealPaymentView,
     MealOptOutSummaryView,
+    MealAnalyticsView,
 )
 
 urlpatterns = [
@@ -26,4 +27,7 @@ urlpatterns = [
 
     # 📊 Opt-out summary (for next 7 weekdays)
     path("optouts/", MealOptOutSummaryView.as_view(), name="optouts"),
+
+    # 📈 Monthly cost / consumption analytics (range of months)
+    path("analytics/", MealAnalyticsView.as_view(), name="analytics"),
 ]
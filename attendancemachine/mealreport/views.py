@@ -1,18 +1,22 @@
-from datetime import date as date_cls, timedelta
-from django.db import connection
+from datetime import datetime
 from django.db.models import Q
-from django.utils.dateparse import parse_date
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from django.contrib.auth import get_user_model
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.views import APIView
 
-from meal.models import CookRecord, Meal, MealOverride, MealOptOut
-from leave.models import Leave
+from meal.models import CookRecord
+from employee.directory import get_directory
+from meal.optouts import get_optout_index
+from meal.projection import eater_user_ids
+from leave.models import LeaveDay
 from .models import MealPayment
 from .serializers import MealPaymentSerializer, DailyReportRowSerializer
+from .rollups import month_start, rollup_range
+from .services import generate_cook_record, report_dates
 
 User = get_user_model()
 
@@ -21,114 +25,10 @@ User = get_user_model()
 # Helper
 # -----------------------------------------
 def _is_admin(user):
-    """Only 'frahman' can mark or delete payments."""
+    """Only 'frahman' can mark or delete payments and view the analytics."""
     return getattr(user, "username", "").lower() == "frahman"
 
 
-# -----------------------------------------
-# Core Generator
-# -----------------------------------------
-def generate_cook_record(for_date: date_cls):
-    """
-    Generate CookRecord for a given date, using raw SQL for opt-out count.
-    """
-    weekday = for_date.weekday()  # 0=Mon, 6=Sun
-    if weekday in (5, 6):  # weekend skip
-        return None
-
-    # --- 1️⃣ Determine source (override / weekly / default) ---
-    override = MealOverride.objects.filter(date=for_date).first()
-    if override:
-        source_type = "override"
-        item = override.item
-        price = override.price
-        notes = f"Override: {override.notes or override.item}"
-    else:
-        weekday_name = [
-            "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"
-        ][weekday]
-        weekly_meal = Meal.objects.filter(day__iexact=weekday_name).first()
-        if weekly_meal:
-            source_type = "weekly"
-            item = weekly_meal.item
-            price = weekly_meal.price
-            notes = "Weekly menu"
-        else:
-            source_type = "weekly"
-            item = "Regular Meal"
-            price = 70
-            notes = "Default menu"
-
-    # --- 2️⃣ Total active users (excluding admin) ---
-    all_users = User.objects.filter(is_active=True).exclude(username__iexact="frahman")
-    total_users = all_users.count()
-
-    # --- 3️⃣ On leave users ---
-    leave_users = Leave.objects.filter(
-        date__contains=for_date.isoformat(),
-        status__in=["approved", "pending"]
-    ).exclude(user__username__iexact="frahman").values_list("user_id", flat=True)
-
-    # --- 4️⃣ Opt-out users using RAW SQL ---
-    with connection.cursor() as cursor:
-        cursor.execute("""
-            SELECT COUNT(DISTINCT user_id)
-            FROM meal_mealoptout
-            WHERE active = 1
-              AND (
-                  (scope = 'date' AND DATE(`date`) = %s)
-                  OR (scope = 'range' AND %s BETWEEN DATE(`start_date`) AND DATE(`end_date`))
-              )
-              AND user_id NOT IN (
-                  SELECT id FROM auth_user WHERE LOWER(username) = 'frahman'
-              );
-        """, [for_date, for_date])
-        opt_out_count = cursor.fetchone()[0] or 0
-
-    # --- 5️⃣ Build sets for eater calculation ---
-    leave_set = set(leave_users)
-
-    # Get list of opt-out users (not just count)
-    with connection.cursor() as cursor:
-        cursor.execute("""
-            SELECT DISTINCT user_id
-            FROM meal_mealoptout
-            WHERE active = 1
-              AND (
-                  (scope = 'date' AND DATE(`date`) = %s)
-                  OR (scope = 'range' AND %s BETWEEN DATE(`start_date`) AND DATE(`end_date`))
-              )
-              AND user_id NOT IN (
-                  SELECT id FROM auth_user WHERE LOWER(username) = 'frahman'
-              );
-        """, [for_date, for_date])
-        optout_users = [row[0] for row in cursor.fetchall()]
-
-    optout_set = set(optout_users)
-
-    eaters = [u.id for u in all_users if u.id not in leave_set and u.id not in optout_set]
-
-    # --- 6️⃣ Save / update CookRecord ---
-    obj, _ = CookRecord.objects.update_or_create(
-        date=for_date,
-        defaults={
-            "source": source_type,
-            "item": item,
-            "price": price,
-            "present_count": total_users,
-            "on_leave_count": len(leave_set),
-            "opt_out_count": opt_out_count,
-            "eaters_count": len(eaters),
-            "notes": notes,
-            "is_finalized": True,
-            "finalized_at": timezone.now(),
-            "eaters": eaters,
-        },
-    )
-
-    return obj
-
-
 # -----------------------------------------
 # Daily Report List
 # -----------------------------------------
@@ -142,24 +42,12 @@ class MealDailyReportListView(APIView):
         end = qp.get("end")
         include_details = str(qp.get("include_details", "")).lower() in ("1", "true", "yes", "y")
 
-        today = date_cls.today()
-        weekday = today.weekday()
-        if weekday == 5:
-            today += timedelta(days=2)
-        elif weekday == 6:
-            today += timedelta(days=1)
-
-        # Generate next 7 weekdays
-        generated_dates = []
-        for i in range(7):
-            d = today + timedelta(days=i)
-            if d.weekday() < 5:
-                generate_cook_record(d)
-                generated_dates.append(d)
+        # Upcoming weekdays, kept fresh by refresh_cook_records (cron)
+        window = report_dates()
 
         # Filter queryset
         if not (date_str or start or end):
-            qs = CookRecord.objects.filter(date__in=generated_dates).order_by("date")
+            qs = CookRecord.objects.filter(date__in=window).order_by("date")
         else:
             qs = CookRecord.objects.all().order_by("-date")
             if date_str:
@@ -227,7 +115,7 @@ class MealDailyUsersView(APIView):
         if not rec:
             return Response({"error": "CookRecord not found."}, status=404)
 
-        eaters = User.objects.filter(id__in=rec.eaters).values(
+        eaters = User.objects.filter(id__in=eater_user_ids(rec)).values(
             "id", "username", "first_name", "last_name", "email"
         )
         return Response(
@@ -251,24 +139,13 @@ class MealDailyAbsenteesView(APIView):
         if not d:
             return Response({"error": "Invalid date."}, status=400)
 
-        with connection.cursor() as cursor:
-            cursor.execute("""
-                SELECT DISTINCT user_id, reason
-                FROM meal_mealoptout
-                WHERE active = 1
-                  AND (
-                      (scope = 'date' AND DATE(`date`) = %s)
-                      OR (scope = 'range' AND %s BETWEEN DATE(`start_date`) AND DATE(`end_date`))
-                  );
-            """, [d, d])
-            opt_out_rows = cursor.fetchall()
-
+        directory = get_directory()
         opt_out_users = []
-        for user_id, reason in opt_out_rows:
-            u = User.objects.filter(id=user_id).first()
+        for user_id, reason in get_optout_index().on_date(d, permanent=False).items():
+            u = directory.by_user_id.get(user_id)
             if u:
                 opt_out_users.append({
-                    "id": u.id,
+                    "id": u.user_id,
                     "username": u.username,
                     "first_name": u.first_name,
                     "last_name": u.last_name,
@@ -276,7 +153,7 @@ class MealDailyAbsenteesView(APIView):
                     "reason": reason,
                 })
 
-        leaves = Leave.objects.filter(date__contains=d.isoformat()).select_related("user")
+        leaves = LeaveDay.objects.filter(date=d).select_related("leave", "user").order_by("leave_id")
         leave_users = [
             {
                 "id": l.user.id,
@@ -284,7 +161,7 @@ class MealDailyAbsenteesView(APIView):
                 "first_name": l.user.first_name,
                 "last_name": l.user.last_name,
                 "email": l.user.email,
-                "reason": getattr(l, "reason", "N/A"),
+                "reason": getattr(l.leave, "reason", "N/A"),
             }
             for l in leaves
         ]
@@ -324,7 +201,7 @@ class MealPaymentView(APIView):
             "invoice_number": request.data.get("invoice_number", f"Meal-{d.isoformat()}"),
             "response_data": request.data.get("response_data"),
             "remarks": request.data.get("remarks", "Paid full"),
-            "paid_by": request.user.id,
+            "paid_by": request.user,
         }
 
         obj, created = MealPayment.objects.update_or_create(date=d, defaults=payload)
@@ -360,31 +237,52 @@ class MealOptOutSummaryView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        today = date_cls.today()
-        weekday = today.weekday()
-        if weekday == 5:
-            today += timedelta(days=2)
-        elif weekday == 6:
-            today += timedelta(days=1)
-
-        dates = [today + timedelta(days=i) for i in range(7) if (today + timedelta(days=i)).weekday() < 5]
+        directory = get_directory()
+        by_date = get_optout_index().by_date(report_dates(), permanent=False)
 
         results = []
-        with connection.cursor() as cursor:
-            for d in dates:
-                cursor.execute("""
-                    SELECT COUNT(DISTINCT user_id)
-                    FROM meal_mealoptout
-                    WHERE active = 1
-                      AND (
-                          (scope = 'date' AND DATE(`date`) = %s)
-                          OR (scope = 'range' AND %s BETWEEN DATE(`start_date`) AND DATE(`end_date`))
-                      )
-                      AND user_id NOT IN (
-                          SELECT id FROM auth_user WHERE LOWER(username) = 'frahman'
-                      );
-                """, [d, d])
-                count = cursor.fetchone()[0]
-                results.append({"date": str(d), "opt_out_count": int(count or 0)})
+        for d, users in sorted(by_date.items()):
+            count = sum(
+                1 for user_id in users
+                if user_id in directory.by_user_id and not _is_admin(directory.by_user_id[user_id])
+            )
+            results.append({"date": str(d), "opt_out_count": count})
 
         return Response(results)
+
+
+# -----------------------------------------
+# Monthly cost / consumption analytics
+# -----------------------------------------
+def _parse_month(value):
+    try:
+        return datetime.strptime(value, "%Y-%m").date()
+    except (TypeError, ValueError):
+        return None
+
+
+class MealAnalyticsView(APIView):
+    """
+    GET /api/mealreport/analytics/?start=YYYY-MM&end=YYYY-MM&include_daily=1
+    → Monthly rollups of finalized days: cost per day / meal / employee,
+      paid vs unpaid, opt-out rates, plus totals for the range.
+      start / end default to the current month. Admin only.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if not _is_admin(request.user):
+            return Response({"error": "Only frahman can view meal analytics."}, status=403)
+
+        qp = request.query_params
+        current = month_start(timezone.localdate())
+        start = _parse_month(qp["start"]) if qp.get("start") else current
+        end = _parse_month(qp["end"]) if qp.get("end") else max(start or current, current)
+        if not start or not end:
+            return Response({"error": "Invalid month format. Use YYYY-MM."}, status=400)
+        if end < start:
+            return Response({"error": "end must not be before start."}, status=400)
+        include_daily = str(qp.get("include_daily", "")).lower() in ("1", "true", "yes", "y")
+
+        data = rollup_range(start, end, include_daily=include_daily)
+        return Response({"start": start.strftime("%Y-%m"), "end": end.strftime("%Y-%m"), **data}, status=200)
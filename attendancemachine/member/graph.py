@@ -0,0 +1,131 @@
+# member/graph.py
+"""
+Team graph: the MemberAssignment pivot loaded once into adjacency maps.
+
+    member_emails(user_id)   emails of the members assigned to the user
+                             (team notices of leave decisions / cancellations)
+    sign_in_emails(user_id)  emails of the user's sign-in recipients
+    co_members(user_id)      users sharing at least one assigned member
+    member_user_ids(user_id, directory)
+                             users whose email is one of member_emails()
+
+Every answer is a dict lookup. Cached like employee.directory: a
+process-local copy reused while the shared version token is unchanged, and
+the Django cache keyed by that token. invalidate_team_graph() (member and
+assignment changes, user deletion; see member/signals.py) writes a new
+token.
+"""
+import threading
+import uuid
+from collections import defaultdict
+
+from django.core.cache import cache
+
+GRAPH_VERSION_KEY = "member:graph:version"
+GRAPH_CACHE_KEY = "member:graph:{version}"
+GRAPH_CACHE_SECONDS = 60 * 60
+
+_lock = threading.Lock()
+_local = {"version": None, "graph": None}
+
+
+def _distinct(values):
+    return tuple(dict.fromkeys(v for v in values if v))
+
+
+class TeamGraph:
+    """
+    Built from (user_id, member_id, sign_in_id) assignment rows and
+    { member_id: email }.
+    """
+
+    def __init__(self, assignments, member_emails):
+        members_of = defaultdict(list)    # user -> [member]
+        users_of = defaultdict(set)       # member -> {user}
+        sign_ins_of = defaultdict(list)   # user -> [sign-in member]
+
+        for user_id, member_id, sign_in_id in assignments:
+            if user_id is None:
+                continue
+            if member_id is not None:
+                members_of[user_id].append(member_id)
+                users_of[member_id].add(user_id)
+            if sign_in_id is not None:
+                sign_ins_of[user_id].append(sign_in_id)
+
+        self._member_emails = {
+            user_id: _distinct(member_emails.get(m) for m in members)
+            for user_id, members in members_of.items()
+        }
+        self._sign_in_emails = {
+            user_id: _distinct(member_emails.get(m) for m in members)
+            for user_id, members in sign_ins_of.items()
+        }
+        self._co_members = {
+            user_id: frozenset().union(*(users_of[m] for m in members))
+            for user_id, members in members_of.items()
+        }
+
+    def member_emails(self, user_id):
+        return list(self._member_emails.get(user_id, ()))
+
+    def sign_in_emails(self, user_id):
+        return list(self._sign_in_emails.get(user_id, ()))
+
+    def co_members(self, user_id):
+        """Users assigned to any member the user is assigned to (the user included)."""
+        return self._co_members.get(user_id, frozenset())
+
+    def member_user_ids(self, user_id, directory):
+        """Users (employee directory) whose email is one of member_emails(user_id)."""
+        ids = set()
+        for email in self._member_emails.get(user_id, ()):
+            ids.update(directory.user_ids_for_email(email))
+        return ids
+
+
+def _load_graph():
+    from .models import Member, MemberAssignment
+
+    assignments = list(MemberAssignment.objects.values_list("user_id", "member_id", "sign_in_id"))
+    member_emails = dict(Member.objects.values_list("id", "email"))
+    return TeamGraph(assignments, member_emails)
+
+
+def _current_version():
+    version = cache.get(GRAPH_VERSION_KEY)
+    if version is None:
+        cache.add(GRAPH_VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(GRAPH_VERSION_KEY)
+    return version
+
+
+def team_graph_version():
+    return _current_version()
+
+
+def get_team_graph():
+    version = _current_version()
+    if _local["version"] == version and _local["graph"] is not None:
+        return _local["graph"]
+
+    with _lock:
+        if _local["version"] == version and _local["graph"] is not None:
+            return _local["graph"]
+
+        key = GRAPH_CACHE_KEY.format(version=version)
+        graph = cache.get(key)
+        if graph is None:
+            graph = _load_graph()
+            cache.set(key, graph, GRAPH_CACHE_SECONDS)
+
+        _local["version"] = version
+        _local["graph"] = graph
+        return graph
+
+
+def invalidate_team_graph():
+    cache.set(GRAPH_VERSION_KEY, uuid.uuid4().hex, None)
+    with _lock:
+        _local["version"] = None
+        _local["graph"] = None
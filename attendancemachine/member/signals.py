@@ -0,0 +1,19 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .graph import invalidate_team_graph
+from .models import Member, MemberAssignment
+
+
+# User / Member deletion nulls assignment FKs with a plain UPDATE (no
+# MemberAssignment signal), so those are listened to as well.
+@receiver(post_save, sender=MemberAssignment)
+@receiver(post_delete, sender=MemberAssignment)
+@receiver(post_save, sender=Member)
+@receiver(post_delete, sender=Member)
+@receiver(post_delete, sender=User)
+def drop_team_graph(sender, instance, **kwargs):
+    # After commit, so no process re-caches the graph from pre-commit rows
+    transaction.on_commit(invalidate_team_graph)
@@ -1,3 +1,60 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 
-# Create your tests here.
+from employee.directory import get_directory, invalidate_directory
+from . import graph as graph_module
+from .graph import TeamGraph, get_team_graph
+from .models import Member, MemberAssignment
+
+
+# -------------------------------------------------
+# Team graph
+# -------------------------------------------------
+class TeamGraphTests(TestCase):
+    def test_adjacency(self):
+        graph = TeamGraph(
+            [(1, 10, 20), (2, 10, None), (1, 11, 20), (3, None, 21), (None, 10, 20)],
+            {10: "lead@example.com", 11: "lead@example.com", 20: "hr@example.com", 21: ""},
+        )
+        self.assertEqual(graph.member_emails(1), ["lead@example.com"])
+        self.assertEqual(graph.sign_in_emails(1), ["hr@example.com"])
+        self.assertEqual(graph.sign_in_emails(3), [])
+        self.assertEqual(graph.co_members(2), {1, 2})
+        self.assertEqual(graph.co_members(3), frozenset())
+        self.assertEqual(graph.member_emails(99), [])
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class TeamGraphCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.ann = User.objects.create_user("ann", "ann@example.com", "pw")
+        cls.lead = User.objects.create_user("lead", "Lead@Example.com", "pw")
+        cls.member = Member.objects.create(name="Lead", email="lead@example.com")
+        MemberAssignment.objects.create(user=cls.ann, member=cls.member, sign_in=cls.member)
+
+    def setUp(self):
+        cache.clear()
+        graph_module.invalidate_team_graph()
+        invalidate_directory()
+
+    def test_member_user_ids_match_emails_case_insensitively(self):
+        self.assertEqual(get_team_graph().member_user_ids(self.ann.pk, get_directory()), {self.lead.pk})
+
+    def test_cached_until_an_assignment_changes(self):
+        get_team_graph()
+        with self.assertNumQueries(0):
+            get_team_graph()
+
+        hr = Member.objects.create(name="HR", email="hr@example.com")
+        with self.captureOnCommitCallbacks(execute=True):
+            MemberAssignment.objects.create(user=self.ann, sign_in=hr)
+            self.assertEqual(get_team_graph().sign_in_emails(self.ann.pk), ["lead@example.com"])
+        self.assertEqual(get_team_graph().sign_in_emails(self.ann.pk), ["lead@example.com", "hr@example.com"])
+
+    def test_user_delete_drops_the_graph(self):
+        self.assertEqual(get_team_graph().co_members(self.ann.pk), {self.ann.pk})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ann.delete()
+        self.assertEqual(get_team_graph().co_members(self.ann.pk), frozenset())
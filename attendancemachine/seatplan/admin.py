@@ -1,3 +1,25 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import Seat, SeatLayout, SeatPlanSnapshot
+
+
+class SeatInline(admin.TabularInline):
+    model = Seat
+    extra = 0
+    fields = ("position", "key", "label", "user", "always_present")
+    raw_id_fields = ("user",)
+
+
+@admin.register(SeatLayout)
+class SeatLayoutAdmin(admin.ModelAdmin):
+    list_display = ("id", "slug", "name", "is_default")
+    prepopulated_fields = {"slug": ("name",)}
+    inlines = [SeatInline]
+
+
+@admin.register(SeatPlanSnapshot)
+class SeatPlanSnapshotAdmin(admin.ModelAdmin):
+    list_display = ("id", "layout", "date", "is_stale", "built_at")
+    list_filter = ("layout", "is_stale")
+    date_hierarchy = "date"
+    readonly_fields = ("plan", "built_at")
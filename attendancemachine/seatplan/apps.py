@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class SeatplanConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'seatplan'
+
+    def ready(self):
+        import seatplan.signals  # noqa: F401  (punches_recorded receivers)
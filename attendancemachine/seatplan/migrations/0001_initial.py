@@ -0,0 +1,60 @@
+# Generated by Django 5.2.4 on 2026-10-16 23:45
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeatLayout',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slug', models.SlugField(unique=True)),
+                ('name', models.CharField(max_length=100)),
+                ('is_default', models.BooleanField(default=False)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Seat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=50)),
+                ('label', models.CharField(max_length=100)),
+                ('always_present', models.BooleanField(default=False)),
+                ('position', models.PositiveIntegerField(default=0)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='seats', to=settings.AUTH_USER_MODEL)),
+                ('layout', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seats', to='seatplan.seatlayout')),
+            ],
+            options={
+                'ordering': ['layout', 'position', 'id'],
+                'constraints': [models.UniqueConstraint(fields=('layout', 'key'), name='uniq_seat_layout_key')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SeatPlanSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('plan', models.JSONField(default=dict)),
+                ('is_stale', models.BooleanField(default=False)),
+                ('built_at', models.DateTimeField(auto_now=True)),
+                ('layout', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='seatplan.seatlayout')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['date'], name='seatplan_se_date_7bcd4e_idx')],
+                'constraints': [models.UniqueConstraint(fields=('layout', 'date'), name='uniq_seatplan_snapshot_layout_date')],
+            },
+        ),
+    ]
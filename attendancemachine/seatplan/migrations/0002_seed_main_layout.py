@@ -0,0 +1,72 @@
+# Seeds the layout that used to be hard-coded as SEATS in seatplan/views.py
+
+from django.conf import settings
+from django.db import migrations
+
+MAIN_SEATS = [
+    # (key, label, user_id, always_present)
+    ("teacher", "Faisal Sir", 4, True),
+
+    ("nazim", "Nazim", 12, False),
+    ("shohel_top", "Shohel", 15, False),
+    ("shafeen", "Shafeen", 14, False),
+
+    ("yunus", "Yunus", 11, False),
+    ("muzahid", "Muzahid", 13, False),
+    ("tonmoy", "Tonmoy", 16, False),
+
+    ("jamil", "Jamil", 1, False),
+    ("imran", "Imran", 2, False),
+    ("mahi", "Mahi", 3, False),
+
+    ("monir", "Monir", 17, False),
+    ("sohel_bottom", "Sohel", 7, False),
+    ("nafisa", "Nafisa", 10, False),
+    ("tasfia", "Tasfia", 8, False),
+
+    ("shawon", "Shawon", 9, False),
+    ("empty", "Empty", None, False),
+    ("rahad", "Rahad", 5, False),
+]
+
+
+def seed_main_layout(apps, schema_editor):
+    SeatLayout = apps.get_model("seatplan", "SeatLayout")
+    Seat = apps.get_model("seatplan", "Seat")
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split("."))
+
+    layout, _ = SeatLayout.objects.get_or_create(
+        slug="main", defaults={"name": "Main office", "is_default": True}
+    )
+    existing_users = set(
+        User.objects.filter(id__in=[uid for _, _, uid, _ in MAIN_SEATS if uid]).values_list("id", flat=True)
+    )
+
+    for position, (key, label, user_id, always_present) in enumerate(MAIN_SEATS):
+        Seat.objects.get_or_create(
+            layout=layout,
+            key=key,
+            defaults={
+                "label": label,
+                # Fresh databases don't have these users yet; assign them in the admin
+                "user_id": user_id if user_id in existing_users else None,
+                "always_present": always_present,
+                "position": position,
+            },
+        )
+
+
+def remove_main_layout(apps, schema_editor):
+    apps.get_model("seatplan", "SeatLayout").objects.filter(slug="main").delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("seatplan", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_main_layout, remove_main_layout),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-17 00:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seatplan', '0002_seed_main_layout'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='seatplansnapshot',
+            name='version',
+            field=models.CharField(blank=True, default='', max_length=65),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.4 on 2026-10-17 00:54
+
+from django.db import migrations, models
+
+
+def restamp_fresh_snapshots(apps, schema_editor):
+    # Snapshots were stamped with cache tokens; with no SeatPlanVersion rows
+    # yet, every current token is "", so keep the fresh ones valid
+    SeatPlanSnapshot = apps.get_model("seatplan", "SeatPlanSnapshot")
+    SeatPlanSnapshot.objects.filter(is_stale=False).update(version=":")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seatplan', '0003_seatplansnapshot_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeatPlanVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=40, unique=True)),
+                ('token', models.CharField(max_length=32)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(restamp_fresh_snapshots, migrations.RunPython.noop),
+    ]
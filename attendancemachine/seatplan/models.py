@@ -1,3 +1,95 @@
+from django.conf import settings
 from django.db import models
 
-# Create your models here.
+
+class SeatLayout(models.Model):
+    """
+    One floor / room. The seat plan API serves the default layout unless
+    ?layout=<slug> is given.
+    """
+
+    slug = models.SlugField(max_length=50, unique=True)
+    name = models.CharField(max_length=100)
+    is_default = models.BooleanField(default=False)
+
+    class Meta:
+        ordering = ["name"]
+
+    def __str__(self):
+        return self.name
+
+
+class Seat(models.Model):
+    """
+    key:            stable id used by the front-end (data-seat="...")
+    user:           who sits here; empty → the seat is always shown as empty (red)
+    always_present: always shown as present (green), whatever the punches say
+    """
+
+    layout = models.ForeignKey(SeatLayout, on_delete=models.CASCADE, related_name="seats")
+    key = models.CharField(max_length=50)
+    label = models.CharField(max_length=100)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="seats",
+    )
+    always_present = models.BooleanField(default=False)
+    position = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["layout", "position", "id"]
+        constraints = [
+            models.UniqueConstraint(fields=["layout", "key"], name="uniq_seat_layout_key"),
+        ]
+
+    def __str__(self):
+        return f"{self.layout.slug}/{self.key}"
+
+
+class SeatPlanSnapshot(models.Model):
+    """
+    Computed seat plan of one layout for one day (the API payload).
+
+    Marked stale when punches, leave or the layout change for that day and
+    rebuilt on the next read; otherwise (e.g. any past date) it is served as is.
+    'version' is the snapshot_version() (SeatPlanVersion tokens) read before
+    the build; a snapshot whose version no longer matches was built from data
+    an invalidation has since replaced and is rebuilt too.
+    """
+
+    layout = models.ForeignKey(SeatLayout, on_delete=models.CASCADE, related_name="snapshots")
+    date = models.DateField()
+    plan = models.JSONField(default=dict)
+    is_stale = models.BooleanField(default=False)
+    version = models.CharField(max_length=65, blank=True, default="")
+    built_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["layout", "date"], name="uniq_seatplan_snapshot_layout_date"),
+        ]
+        indexes = [
+            models.Index(fields=["date"]),
+        ]
+
+    def __str__(self):
+        return f"{self.layout.slug} @ {self.date}{' (stale)' if self.is_stale else ''}"
+
+
+class SeatPlanVersion(models.Model):
+    """
+    Persisted invalidation tokens for SeatPlanSnapshot: scope "date:YYYY-MM-DD"
+    (punches / leave of that day) or "layout:<id>" (its seats). Unlike the cache tokens these
+    never expire, so a snapshot stays valid until its data really changes.
+    No row yet means the token is "".
+    """
+
+    scope = models.CharField(max_length=40, unique=True)
+    token = models.CharField(max_length=32)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.scope}: {self.token}"
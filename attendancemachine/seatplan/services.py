@@ -0,0 +1,319 @@
+# seatplan/services.py
+"""
+Seat plan of a layout (seatplan.models.SeatLayout) for one day.
+
+Read path, cheapest first:
+  1. Django cache, keyed by (layout, date) and tagged with version tokens of
+     that date and of the layouts (expiring: a lost token only costs a
+     snapshot read)
+  2. SeatPlanSnapshot row, unless marked stale or stamped with other
+     SeatPlanVersion tokens than the current ones (which never expire)
+  3. build_seat_plan() from seats, punches and approved leave, saved back
+     to both
+
+invalidate_seat_plan(dates) (punches, leave) and invalidate_seat_layouts()
+(seat / layout edits) change both kinds of tokens and mark the snapshots
+stale.
+"""
+import uuid
+
+from django.core.cache import cache
+
+from employee.directory import get_directory
+from employee.services import punch_summary_queryset, upsert_kwargs
+from leave.models import LeaveDay
+from .models import Seat, SeatLayout, SeatPlanSnapshot, SeatPlanVersion
+
+SEATPLAN_CACHE_KEY = "seatplan:{layout}:{date}"
+SEATPLAN_VERSION_KEY = "seatplan:version:{date}"
+SEATPLAN_LAYOUTS_VERSION_KEY = "seatplan:layouts:version"
+SEATPLAN_LAYOUTS_KEY = "seatplan:layouts:{version}"
+SEATPLAN_CACHE_SECONDS = 10 * 60
+SEATPLAN_VERSION_SECONDS = 2 * 24 * 60 * 60
+SNAPSHOT_DATE_SCOPE = "date:{date}"
+SNAPSHOT_LAYOUT_SCOPE = "layout:{layout}"
+
+
+def _token(key, timeout=SEATPLAN_VERSION_SECONDS):
+    token = cache.get(key)
+    if token is None:
+        cache.add(key, uuid.uuid4().hex, timeout)
+        token = cache.get(key)
+    return token
+
+
+# -------------------------------------------------
+# Layouts
+# -------------------------------------------------
+
+def seat_layouts():
+    """
+    { slug: (layout_id, is_default) } for every layout, cached until a
+    layout or seat changes.
+    """
+    key = SEATPLAN_LAYOUTS_KEY.format(version=_token(SEATPLAN_LAYOUTS_VERSION_KEY, None))
+    layouts = cache.get(key)
+    if layouts is None:
+        layouts = {
+            slug: (pk, is_default)
+            for pk, slug, is_default in SeatLayout.objects.order_by("id").values_list("id", "slug", "is_default")
+        }
+        cache.set(key, layouts, SEATPLAN_VERSION_SECONDS)
+    return layouts
+
+
+def resolve_layout(slug=None):
+    """
+    (layout_id, slug) of the requested layout, or of the default one
+    (is_default, else the oldest) when slug is empty.
+    Raises SeatLayout.DoesNotExist for an unknown slug / no layouts at all.
+    """
+    layouts = seat_layouts()
+    if slug:
+        if slug not in layouts:
+            raise SeatLayout.DoesNotExist(f"Unknown seat layout '{slug}'.")
+        return layouts[slug][0], slug
+
+    for s, (pk, is_default) in layouts.items():
+        if is_default:
+            return pk, s
+    if layouts:
+        s, (pk, _) = next(iter(layouts.items()))
+        return pk, s
+    raise SeatLayout.DoesNotExist("No seat layout configured.")
+
+
+# -------------------------------------------------
+# Build / read
+# -------------------------------------------------
+
+def build_seat_plan(layout_id, layout_slug, d):
+    """
+    { layout, date, summary, seats } for one day, straight from the database.
+    """
+    iso = d.isoformat()
+
+    # -----------------------------
+    # 2) Seats + their user_ids
+    # -----------------------------
+    seats = list(
+        Seat.objects.filter(layout_id=layout_id)
+        .order_by("position", "id")
+        .values("key", "label", "user_id", "always_present")
+    )
+    seat_user_ids = sorted({s["user_id"] for s in seats if s["user_id"]})
+
+    # -----------------------------
+    # 3) Users + emp codes (employee directory)
+    # -----------------------------
+    user_to_emp = {}    # user_id -> emp_code
+    user_to_name = {}   # user_id -> display name
+
+    by_user_id = get_directory().by_user_id
+
+    for uid in seat_user_ids:
+        e = by_user_id.get(uid)
+        if e is None:
+            continue
+
+        if e.emp_code is not None:
+            user_to_emp[uid] = e.emp_code
+
+        user_to_name[uid] = e.name
+
+    emp_codes = sorted(set(user_to_emp.values()))
+
+    # -----------------------------
+    # 4) Attendance (punch summary of the logs DB)
+    # attendance_logs.user_id == emp_code
+    # -----------------------------
+    present_emp_codes = set()
+
+    if emp_codes:
+        present_emp_codes = set(
+            punch_summary_queryset(d, d, emp_codes).values_list("emp_code", flat=True)
+        )
+
+    # -----------------------------
+    # 5) Approved Leave
+    # -----------------------------
+    leave_user_ids = set(
+        LeaveDay.objects.filter(
+            user_id__in=seat_user_ids,
+            status="approved",
+            date=d,
+        ).values_list("user_id", flat=True)
+    )
+
+    # -----------------------------
+    # 6) Build seat results
+    # -----------------------------
+    results = []
+    counts = {"green": 0, "red": 0, "yellow": 0}
+
+    for s in seats:
+        uid = s["user_id"]
+
+        # -----------------
+        # EMPTY SEAT → RED
+        # -----------------
+        if uid is None:
+            results.append({
+                "id": s["key"],
+                "label": s["label"],
+                "user_id": None,
+                "emp_code": None,
+                "display_name": s["label"],
+                "status": "empty",
+                "color": "red",
+            })
+            counts["red"] += 1
+            continue
+
+        # -----------------
+        # ALWAYS PRESENT (e.g. Faisal Sir) → GREEN
+        # -----------------
+        if s["always_present"]:
+            results.append({
+                "id": s["key"],
+                "label": s["label"],
+                "user_id": uid,
+                "emp_code": user_to_emp.get(uid),
+                "display_name": user_to_name.get(uid, s["label"]),
+                "status": "present",
+                "color": "green",
+            })
+            counts["green"] += 1
+            continue
+
+        emp = user_to_emp.get(uid)
+
+        # -----------------
+        # NORMAL USERS
+        # -----------------
+        if emp and emp in present_emp_codes:
+            status = "present"
+            color = "green"
+            counts["green"] += 1
+
+        elif uid in leave_user_ids:
+            status = "leave"
+            color = "red"
+            counts["red"] += 1
+
+        else:
+            status = "absent"
+            color = "yellow"
+            counts["yellow"] += 1
+
+        results.append({
+            "id": s["key"],
+            "label": s["label"],
+            "user_id": uid,
+            "emp_code": emp,
+            "display_name": user_to_name.get(uid, s["label"]),
+            "status": status,
+            "color": color,
+        })
+
+    return {
+        "layout": layout_slug,
+        "date": iso,
+        "summary": counts,
+        "seats": results,
+    }
+
+
+def seat_plan_version(d):
+    """
+    Opaque cache token that changes whenever punches, approved leave or the
+    layouts change for 'd' (and whenever the cache loses it).
+    """
+    return f"{_token(SEATPLAN_VERSION_KEY.format(date=d.isoformat()))}:{_token(SEATPLAN_LAYOUTS_VERSION_KEY, None)}"
+
+
+def snapshot_version(layout_id, d):
+    """
+    Persisted counterpart of seat_plan_version() that SeatPlanSnapshot rows
+    are stamped with: only changes when the day's data or the layout does.
+    """
+    date_scope = SNAPSHOT_DATE_SCOPE.format(date=d.isoformat())
+    layout_scope = SNAPSHOT_LAYOUT_SCOPE.format(layout=layout_id)
+    tokens = dict(
+        SeatPlanVersion.objects
+        .filter(scope__in=[date_scope, layout_scope])
+        .values_list("scope", "token")
+    )
+    return f"{tokens.get(date_scope, '')}:{tokens.get(layout_scope, '')}"
+
+
+def _bump_snapshot_versions(scopes):
+    SeatPlanVersion.objects.bulk_create(
+        [SeatPlanVersion(scope=scope, token=uuid.uuid4().hex) for scope in sorted(scopes)],
+        **upsert_kwargs(SeatPlanVersion, unique_fields=["scope"], update_fields=["token", "updated_at"]),
+    )
+
+
+def seat_plan(d, layout=None):
+    """
+    Seat plan of 'layout' (slug; default layout when empty) for day 'd'.
+    Built at most once per change, then served from cache / snapshot.
+    Raises SeatLayout.DoesNotExist for an unknown layout.
+    """
+    layout_id, layout_slug = resolve_layout(layout)
+    version = seat_plan_version(d)
+    key = SEATPLAN_CACHE_KEY.format(layout=layout_id, date=d.isoformat())
+
+    cached = cache.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    stamp = snapshot_version(layout_id, d)
+    plan = (SeatPlanSnapshot.objects
+            .filter(layout_id=layout_id, date=d, is_stale=False, version=stamp)
+            .values_list("plan", flat=True)
+            .first())
+    if plan is None:
+        # Stamped with the tokens read before the build: if an invalidation
+        # lands meanwhile, they move on and the next read rebuilds
+        plan = build_seat_plan(layout_id, layout_slug, d)
+        SeatPlanSnapshot.objects.update_or_create(
+            layout_id=layout_id, date=d,
+            defaults={"plan": plan, "is_stale": False, "version": stamp},
+        )
+
+    cache.set(key, (version, plan), SEATPLAN_CACHE_SECONDS)
+    return plan
+
+
+# -------------------------------------------------
+# Invalidation
+# -------------------------------------------------
+
+def invalidate_seat_plan(dates):
+    """
+    Punches / leave changed on these dates (date objects or ISO strings).
+    """
+    isos = {d if isinstance(d, str) else d.isoformat() for d in dates}
+    if not isos:
+        return
+    _bump_snapshot_versions(SNAPSHOT_DATE_SCOPE.format(date=iso) for iso in isos)
+    SeatPlanSnapshot.objects.filter(date__in=sorted(isos), is_stale=False).update(is_stale=True)
+    cache.set_many(
+        {SEATPLAN_VERSION_KEY.format(date=iso): uuid.uuid4().hex for iso in isos},
+        SEATPLAN_VERSION_SECONDS,
+    )
+
+
+def invalidate_seat_layouts(layout_id=None):
+    """
+    A layout or its seats changed: every snapshot of it (all of them when
+    layout_id is None) is rebuilt on its next read.
+    """
+    layout_ids = [layout_id] if layout_id is not None else SeatLayout.objects.values_list("id", flat=True)
+    _bump_snapshot_versions(SNAPSHOT_LAYOUT_SCOPE.format(layout=pk) for pk in layout_ids)
+    snapshots = SeatPlanSnapshot.objects.filter(is_stale=False)
+    if layout_id is not None:
+        snapshots = snapshots.filter(layout_id=layout_id)
+    snapshots.update(is_stale=True)
+    cache.set(SEATPLAN_LAYOUTS_VERSION_KEY, uuid.uuid4().hex, None)
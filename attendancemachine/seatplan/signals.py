@@ -0,0 +1,34 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from employee.signals import punches_recorded
+from leave.models import Leave
+from .models import Seat, SeatLayout
+from .services import invalidate_seat_layouts, invalidate_seat_plan
+
+
+@receiver(punches_recorded)
+def drop_seat_plan_cache(sender, keys, **kwargs):
+    invalidate_seat_plan(d for _, d in keys)
+
+
+@receiver(post_save, sender=Leave)
+@receiver(post_delete, sender=Leave)
+def drop_seat_plan_cache_for_leave(sender, instance, signal, **kwargs):
+    # Saves that leave user/status/type/dates alone (e.g. email_body) don't matter
+    if signal is post_save and not instance._dates_changed():
+        return
+    # Before and after: a cancel drops days that must stop showing "leave"
+    dates = instance.touched_dates()
+    if dates:
+        transaction.on_commit(lambda: invalidate_seat_plan(dates))
+
+
+@receiver(post_save, sender=Seat)
+@receiver(post_delete, sender=Seat)
+@receiver(post_save, sender=SeatLayout)
+@receiver(post_delete, sender=SeatLayout)
+def drop_seat_plan_cache_for_layout(sender, instance, **kwargs):
+    layout_id = instance.layout_id if sender is Seat else instance.pk
+    transaction.on_commit(lambda: invalidate_seat_layouts(layout_id))
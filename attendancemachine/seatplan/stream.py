@@ -0,0 +1,103 @@
+# seatplan/stream.py
+"""
+Server-sent events for the seat plan.
+
+Every connected screen reads the shared cached plan (seatplan.services.seat_plan)
+every STREAM_POLL_SECONDS and only sends something when it changed:
+
+    event: snapshot   full { date, summary, seats } (first message, new day)
+    event: delta      { date, summary, seats: [only the seats that changed] }
+    : keep-alive      comment every STREAM_HEARTBEAT_SECONDS otherwise
+
+The plan is rebuilt once per change (punch / leave invalidation) no matter how
+many screens are connected. A stream ends after STREAM_MAX_SECONDS and the
+browser's EventSource reconnects on its own (after 'retry' ms).
+
+Streams are only served under ASGI, where a connected screen holds no thread
+between polls, and at most STREAM_MAX_CLIENTS at a time per process. Under
+WSGI (Passenger) every stream would pin a worker for minutes, so the view
+answers 503 and screens poll SeatPlanView every STREAM_FALLBACK_POLL_SECONDS
+instead.
+"""
+import asyncio
+import json
+import time
+from datetime import date as date_cls
+
+from asgiref.sync import sync_to_async
+
+from .services import seat_plan
+
+STREAM_POLL_SECONDS = 2
+STREAM_HEARTBEAT_SECONDS = 15
+STREAM_MAX_SECONDS = 5 * 60
+STREAM_RETRY_MS = 3000
+STREAM_MAX_CLIENTS = 200
+STREAM_FALLBACK_POLL_SECONDS = 30
+
+_open_streams = {"count": 0}
+
+
+def streams_full():
+    return _open_streams["count"] >= STREAM_MAX_CLIENTS
+
+
+def sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+def seat_deltas(before, after):
+    """Seats of 'after' that differ from the same seat in 'before'."""
+    old = {s["id"]: s for s in before["seats"]}
+    return [s for s in after["seats"] if old.get(s["id"]) != s]
+
+
+class SeatPlanStream:
+    """
+    d=None follows the current day (and sends a new snapshot at midnight).
+    layout: SeatLayout slug, default layout when empty.
+    """
+
+    def __init__(self, d=None, layout=None):
+        self.fixed_date = d
+        self.layout = layout
+        self.plan = None
+        self.last_sent = 0.0
+
+    def tick(self):
+        """Next SSE chunk, or None when there is nothing to send yet."""
+        d = self.fixed_date or date_cls.today()
+        plan = seat_plan(d, self.layout)
+        now = time.monotonic()
+
+        if self.plan is None or self.plan["date"] != plan["date"]:
+            chunk = sse("snapshot", plan)
+        elif plan != self.plan:
+            chunk = sse("delta", {
+                "date": plan["date"],
+                "summary": plan["summary"],
+                "seats": seat_deltas(self.plan, plan),
+            })
+        elif now - self.last_sent >= STREAM_HEARTBEAT_SECONDS:
+            chunk = ": keep-alive\n\n"
+        else:
+            return None
+
+        self.plan = plan
+        self.last_sent = now
+        return chunk
+
+    async def __aiter__(self):
+        # ASGI only: no thread is held between polls
+        _open_streams["count"] += 1
+        try:
+            yield f"retry: {STREAM_RETRY_MS}\n\n"
+            tick = sync_to_async(self.tick)
+            deadline = time.monotonic() + STREAM_MAX_SECONDS
+            while time.monotonic() < deadline:
+                chunk = await tick()
+                if chunk:
+                    yield chunk
+                await asyncio.sleep(STREAM_POLL_SECONDS)
+        finally:
+            _open_streams["count"] -= 1
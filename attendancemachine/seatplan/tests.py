@@ -1,3 +1,104 @@
-from django.test import TestCase
+from datetime import date
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from leave.models import Leave
+from .models import SeatLayout
+from .services import invalidate_seat_layouts, invalidate_seat_plan, seat_plan
+
+
+# -------------------------------------------------
+# Leave changes → seat plan invalidation
+# -------------------------------------------------
+class LeaveInvalidationTests(TestCase):
+    DATES = ["2025-03-10", "2025-03-11", "2025-03-12"]
+
+    def setUp(self):
+        user = User.objects.create_user("ann", "ann@example.com", "pw")
+        self.leave = Leave.objects.create(
+            user=user, leave_type="full_day", reason="sick",
+            date=list(self.DATES), status="approved", is_approved=True,
+        )
+        self.leave = Leave.objects.get(pk=self.leave.pk)
+
+    def invalidated(self, change):
+        with mock.patch("seatplan.signals.invalidate_seat_plan") as invalidate:
+            with self.captureOnCommitCallbacks(execute=True):
+                change()
+        return sorted(d for call in invalidate.call_args_list for d in call.args[0])
+
+    def test_full_cancel_invalidates_the_cancelled_dates(self):
+        def cancel():
+            self.leave.date = []
+            self.leave.status = "cancelled"
+            self.leave.is_approved = False
+            self.leave.save(update_fields=["date", "status", "is_approved", "updated_at"])
+
+        self.assertEqual(self.invalidated(cancel), self.DATES)
+
+    def test_partial_cancel_invalidates_remaining_and_cancelled_dates(self):
+        def cancel():
+            self.leave.date = self.DATES[:1]
+            self.leave.save(update_fields=["date", "updated_at"])
+
+        self.assertEqual(self.invalidated(cancel), self.DATES)
+
+    def test_delete_invalidates_the_leave_dates(self):
+        self.assertEqual(self.invalidated(self.leave.delete), self.DATES)
+
+    def test_unrelated_save_invalidates_nothing(self):
+        def touch():
+            self.leave.email_body = "updated"
+            self.leave.save(update_fields=["email_body", "updated_at"])
+
+        self.assertEqual(self.invalidated(touch), [])
+
+
+# -------------------------------------------------
+# Snapshot validity
+# -------------------------------------------------
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class SeatPlanSnapshotTests(TestCase):
+    DAY = date(2025, 3, 10)
+
+    def setUp(self):
+        cache.clear()
+        self.builds = 0
+
+    def build(self, layout_id, slug, d):
+        self.builds += 1
+        return {"layout": slug, "date": d.isoformat(), "build": self.builds}
+
+    def read(self, build=None):
+        with mock.patch("seatplan.services.build_seat_plan", side_effect=build or self.build):
+            return seat_plan(self.DAY)
+
+    def test_snapshot_survives_losing_the_cache_tokens(self):
+        self.read()
+        cache.clear()       # tokens expired / culled
+        self.assertEqual(self.read()["build"], 1)
+        self.assertEqual(self.builds, 1)
+
+    def test_invalidation_during_the_build_forces_a_rebuild(self):
+        def build_then_invalidate(*args):
+            plan = self.build(*args)
+            invalidate_seat_plan([self.DAY])    # e.g. a leave committed meanwhile
+            return plan
+
+        self.read(build_then_invalidate)
+        cache.clear()
+        self.assertEqual(self.read()["build"], 2)
+        self.assertEqual(self.read()["build"], 2)
+
+    def test_layout_change_rebuilds_only_that_layout(self):
+        other = SeatLayout.objects.create(slug="annex", name="Annex")
+        self.read()
+        with mock.patch("seatplan.services.build_seat_plan", side_effect=self.build):
+            seat_plan(self.DAY, "annex")
+            invalidate_seat_layouts(other.pk)
+            cache.clear()
+            self.assertEqual(seat_plan(self.DAY)["build"], 1)
+            self.assertEqual(seat_plan(self.DAY, "annex")["build"], 3)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class SigninMailConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'signin_mail'
+
+    def ready(self):
+        import signin_mail.signals  # noqa: F401  (punches_recorded receivers)
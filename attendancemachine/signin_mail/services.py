@@ -1,27 +1,46 @@
+import logging
+import time
+from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 
+from django.core.cache import cache
 from django.utils import timezone
-from django.db import connections
 from django.core.mail import EmailMessage, get_connection
-from django.contrib.auth import get_user_model
 from django.conf import settings
+from django.db import connections
 
-from member.models import MemberAssignment
+from employee.directory import get_directory
+from employee.services import refresh_daily_punch_summary, punch_summary_queryset
+from member.graph import get_team_graph
 from .models import DailySignInMailLog
 
-User = get_user_model()
+logger = logging.getLogger(__name__)
 
+# Timezones (DB time is Dhaka time)
+SYDNEY_TZ = ZoneInfo("Australia/Sydney")
+HONGKONG_TZ = ZoneInfo("Asia/Hong_Kong")
+DHAKA_TZ = ZoneInfo("Asia/Dhaka")
 
-def send_first_signin_emails():
-    today = timezone.localdate()
+# Summary rows touched since the previous run are re-read with some overlap,
+# so a refresh that committed while the last run was reading is not missed.
+# Re-reads are harmless: users already in DailySignInMailLog are skipped.
+LAST_RUN_KEY = "signin_mail:last_run"
+LAST_RUN_OVERLAP = timedelta(minutes=5)
+
+
+class _QueryCounter:
+    """connection.execute_wrapper() that only counts the queries run."""
 
-    # Timezones (DB time is Dhaka time)
-    SYDNEY_TZ = ZoneInfo("Australia/Sydney")
-    HONGKONG_TZ = ZoneInfo("Asia/Hong_Kong")
-    DHAKA_TZ = ZoneInfo("Asia/Dhaka")
+    def __init__(self):
+        self.count = 0
 
-    # SMTP connection
-    connection = get_connection(
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def _signin_connection():
+    return get_connection(
         backend=settings.SIGNIN_EMAIL_BACKEND,
         host=settings.SIGNIN_EMAIL_HOST,
         port=settings.SIGNIN_EMAIL_PORT,
@@ -31,56 +50,20 @@ def send_first_signin_emails():
         use_tls=settings.SIGNIN_EMAIL_USE_TLS,
     )
 
-    # Get first check-in per user (logs DB)
-    with connections["logs"].cursor() as cursor:
-        cursor.execute(
-            """
-            SELECT user_id, MIN(timestamp)
-            FROM attendance_logs
-            WHERE DATE(timestamp) = %s
-            GROUP BY user_id
-            """,
-            [today],
-        )
-        rows = cursor.fetchall()
-
-    for emp_code, first_time in rows:
-        # emp_code here is coming from attendance_logs.user_id (as per your original code)
-        try:
-            user = User.objects.get(profile__emp_code=emp_code)
-        except User.DoesNotExist:
-            continue
-
-        # Avoid duplicate mail per day
-        if DailySignInMailLog.objects.filter(user=user, date=today).exists():
-            continue
-
-        # Find recipients
-        sign_in_members = (
-            MemberAssignment.objects.filter(user=user, sign_in__isnull=False)
-            .select_related("sign_in")
-        )
-
-        emails = [
-            ma.sign_in.email
-            for ma in sign_in_members
-            if ma.sign_in and ma.sign_in.email
-        ]
-        if not emails:
-            continue
-
-        # ✅ DB time is already Dhaka time
-        # If it's naive, just attach Dhaka tzinfo (does NOT change 08:03 -> something else)
-        if timezone.is_naive(first_time):
-            first_time = first_time.replace(tzinfo=DHAKA_TZ)
-
-        # Convert only for display
-        sydney_time = first_time.astimezone(SYDNEY_TZ)
-        hongkong_time = first_time.astimezone(HONGKONG_TZ)
-
-        subject = f"{user.first_name} Available"
-        body = f"""
-        <p><strong>{user.first_name}</strong> checked in on <strong>{today}</strong>.</p>
+
+def _signin_message(first_name, today, first_time, emails, connection):
+    # ✅ DB time is already Dhaka time
+    # If it's naive, just attach Dhaka tzinfo (does NOT change 08:03 -> something else)
+    if timezone.is_naive(first_time):
+        first_time = first_time.replace(tzinfo=DHAKA_TZ)
+
+    # Convert only for display
+    sydney_time = first_time.astimezone(SYDNEY_TZ)
+    hongkong_time = first_time.astimezone(HONGKONG_TZ)
+
+    subject = f"{first_name} Available"
+    body = f"""
+        <p><strong>{first_name}</strong> checked in on <strong>{today}</strong>.</p>
 
         <ul>
             <li><strong>Sydney Time:</strong> {sydney_time.strftime('%I:%M %p')}</li>
@@ -93,17 +76,109 @@ def send_first_signin_emails():
         </p>
         """
 
-        msg = EmailMessage(
-            subject=subject,
-            body=body,
-            from_email=settings.SIGNIN_MAIL_FROM,
-            to=emails,
-            connection=connection,
-        )
-        msg.content_subtype = "html"
+    msg = EmailMessage(
+        subject=subject,
+        body=body,
+        from_email=settings.SIGNIN_MAIL_FROM,
+        to=emails,
+        connection=connection,
+    )
+    msg.content_subtype = "html"
+    return msg
+
+
+def send_first_signin_emails(refresh=True):
+    """
+    Mail each employee's sign-in recipients once per day, on their first punch.
 
-        # Send (do not silence errors)
-        msg.send()
+    Incremental: only today's DailyPunchSummary rows updated since the last
+    run are considered. Users and recipients come from the cached directory
+    and team graph. The DailySignInMailLog rows are claimed with one bulk
+    insert before sending, so concurrent runs never mail a user twice, and
+    all mails go over one SMTP connection.
 
-        # Log sent mail
-        DailySignInMailLog.objects.create(user=user, date=today)
+    refresh=False skips folding attendance_logs first (the punch watcher has
+    just done it).
+
+    Returns { candidates, sent, queries, ms } and logs the same line.
+    """
+    started = time.monotonic()
+    run_at = timezone.now()
+    today = timezone.localdate()
+
+    counter = _QueryCounter()
+    with connections["default"].execute_wrapper(counter), connections["logs"].execute_wrapper(counter):
+        sent = 0
+        if refresh:
+            refresh_daily_punch_summary()
+
+        # 1) Punches since the last run (first punch per employee, today)
+        last_run = cache.get(LAST_RUN_KEY)
+        rows = punch_summary_queryset(today, today)
+        if last_run is not None:
+            rows = rows.filter(updated_at__gte=last_run - LAST_RUN_OVERLAP)
+        first_punch = dict(rows.values_list("emp_code", "first_punch"))
+
+        # 2) Users (employee directory, cached) and their sign-in recipients
+        directory = get_directory()
+        graph = get_team_graph()
+        users = {}
+        recipients = {}
+        for emp_code in first_punch:
+            e = directory.get(emp_code)
+            if e is None:
+                continue
+            emails = graph.sign_in_emails(e.user_id)
+            if emails:
+                users[e.user_id] = (e, emp_code)
+                recipients[e.user_id] = emails
+
+        # 3) Claim today's log rows before sending. The watcher and the cron
+        #    job can both see the same punches; only the run whose insert
+        #    created a user's row (stamped with its run_at) mails that user.
+        claimed = set()
+        if recipients:
+            DailySignInMailLog.objects.bulk_create(
+                [DailySignInMailLog(user_id=user_id, date=today, sent_at=run_at) for user_id in recipients],
+                ignore_conflicts=True,
+            )
+            claimed = set(
+                DailySignInMailLog.objects
+                .filter(date=today, user_id__in=list(recipients), sent_at=run_at)
+                .values_list("user_id", flat=True)
+            )
+
+        # 4) Send over one SMTP connection; release the claims of mails that
+        #    did not go out so the next run retries them
+        if claimed:
+            delivered = set()
+            connection = _signin_connection()
+            try:
+                connection.open()
+                for user_id in claimed:
+                    e, emp_code = users[user_id]
+                    first_time = datetime.combine(today, first_punch[emp_code])
+                    # Send (do not silence errors)
+                    _signin_message(e.first_name, today, first_time, recipients[user_id], connection).send()
+                    delivered.add(user_id)
+            finally:
+                connection.close()
+                if claimed - delivered:
+                    DailySignInMailLog.objects.filter(
+                        date=today, user_id__in=list(claimed - delivered), sent_at=run_at
+                    ).delete()
+                sent = len(delivered)
+
+        cache.set(LAST_RUN_KEY, run_at, None)
+
+    stats = {
+        "candidates": len(first_punch),
+        "sent": sent,
+        "queries": counter.count,
+        "ms": round((time.monotonic() - started) * 1000, 1),
+    }
+    logger.info(
+        "[signin_mail] %s: %s sent / %s new punches, %s queries, %s ms",
+        today, stats["sent"], stats["candidates"], stats["queries"], stats["ms"],
+    )
+    return stats
@@ -0,0 +1,12 @@
+from django.dispatch import receiver
+from django.utils import timezone
+
+from employee.signals import punches_recorded
+from .services import send_first_signin_emails
+
+
+@receiver(punches_recorded)
+def mail_first_signins(sender, keys, **kwargs):
+    today = timezone.localdate()
+    if any(d == today for _, d in keys):
+        send_first_signin_emails(refresh=False)
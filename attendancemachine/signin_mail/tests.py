@@ -1,3 +1,81 @@
-from django.test import TestCase
+from datetime import time
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from employee.models import DailyPunchSummary
+from member.models import Member, MemberAssignment
+from . import services
+from .models import DailySignInMailLog
+from .services import send_first_signin_emails
+
+
+# -------------------------------------------------
+# Claim / dedup
+# -------------------------------------------------
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    SIGNIN_EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+)
+class SendFirstSigninEmailsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.today = timezone.localdate()
+        boss = Member.objects.create(name="Boss", email="boss@example.com")
+        self.users = []
+        for i, name in enumerate(["Ann", "Bob", "Cat"]):
+            user = User.objects.create_user(name.lower(), f"{name.lower()}@example.com", "pw", first_name=name)
+            user.profile.emp_code = str(101 + i)
+            user.profile.save()
+            MemberAssignment.objects.create(user=user, sign_in=boss)
+            DailyPunchSummary.objects.create(
+                emp_code=str(101 + i), date=self.today,
+                first_punch=time(7, 5 + i), last_punch=time(7, 5 + i), punch_count=1,
+            )
+            self.users.append(user)
+
+    def run_again(self):
+        cache.delete(services.LAST_RUN_KEY)
+        return send_first_signin_emails(refresh=False)
+
+    def logged(self):
+        return sorted(DailySignInMailLog.objects.filter(date=self.today).values_list("user__username", flat=True))
+
+    def test_each_user_is_mailed_once(self):
+        stats = send_first_signin_emails(refresh=False)
+        self.assertEqual(stats["sent"], 3)
+        self.assertEqual(sorted(m.subject for m in mail.outbox), ["Ann Available", "Bob Available", "Cat Available"])
+        self.assertEqual(mail.outbox[0].to, ["boss@example.com"])
+
+        self.assertEqual(self.run_again()["sent"], 0)
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_rows_claimed_by_another_run_are_skipped(self):
+        DailySignInMailLog.objects.create(user=self.users[0], date=self.today)
+
+        stats = send_first_signin_emails(refresh=False)
+        self.assertEqual(stats["sent"], 2)
+        self.assertNotIn("Ann Available", [m.subject for m in mail.outbox])
+
+    def test_failed_send_releases_the_claim(self):
+        original = services._signin_message
+
+        def flaky(first_name, *args):
+            if first_name == "Cat":
+                raise RuntimeError("smtp down")
+            return original(first_name, *args)
+
+        with mock.patch.object(services, "_signin_message", flaky):
+            with self.assertRaises(RuntimeError):
+                send_first_signin_emails(refresh=False)
+        self.assertNotIn("cat", self.logged())
+        self.assertEqual(len(self.logged()), len(mail.outbox))
+
+        self.run_again()
+        subjects = [m.subject for m in mail.outbox]
+        self.assertEqual(sorted(subjects), ["Ann Available", "Bob Available", "Cat Available"])
+        self.assertEqual(self.logged(), ["ann", "bob", "cat"])